@@ -0,0 +1,24 @@
+import threading
+from typing import Any, Dict, List, Tuple, Type, TypeVar
+
+T = TypeVar("T")
+
+# 그래프 노드에서 매 실행마다 에이전트를 새로 만들지 않도록 (클래스, 생성 인자) 조합별 인스턴스를 보관합니다.
+# 에이전트는 실행 중 자신의 속성을 변경하지 않으므로 여러 워커 스레드에서 공유해도 안전합니다.
+# 생성 인자 객체를 항목에 함께 보관하고 `is`로 비교하므로, 해제된 객체의 id가 다른 객체에 재사용되어 잘못된 인스턴스를 돌려주는 일이 없습니다.
+_agents: Dict[Type, List[Tuple[Dict[str, Any], Any]]] = {}
+_registry_lock = threading.Lock()
+
+def _same_kwargs(stored: Dict[str, Any], init_kwargs: Dict[str, Any]) -> bool:
+    return stored.keys() == init_kwargs.keys() and all(stored[name] is value for name, value in init_kwargs.items())
+
+def get_agent(agent_cls: Type[T], **init_kwargs) -> T:
+    """공유 에이전트 인스턴스를 반환합니다. 생성 인자는 객체 동일성(is) 기준으로 구분합니다."""
+    with _registry_lock:
+        entries = _agents.setdefault(agent_cls, [])
+        for stored_kwargs, agent in entries:
+            if _same_kwargs(stored_kwargs, init_kwargs):
+                return agent
+        agent = agent_cls(**init_kwargs)
+        entries.append((dict(init_kwargs), agent))
+        return agent
@@ -11,6 +11,8 @@ from langchain.tools import tool
 from core import config
 from ai.graphs.state_definition import LangGraphState
 from ai.tools.wbs_data_retriever import WBSDataRetriever
+from ai.utils.llm_registry import get_chat_openai, load_prompt_text
+from ai.utils.rate_limiter import ainvoke_chain, invoke_chain, PROVIDER_OPENAI
 from pydantic import BaseModel
 from typing import Any
 
@@ -20,17 +22,11 @@ class DailyReportGenerator:
     - Agent를 사용하여 단일 프로세스로 활동 내역을 분석하고 WBS Task와 매핑하여 최종 보고서를 생성합니다.
     """
     def __init__(self, wbs_retriever_tool_instance: WBSDataRetriever = None):
-        # LLM 설정
-        self.llm = ChatOpenAI(
-            model=config.DEFAULT_MODEL,
-            temperature=0.3,
-            openai_api_key=config.OPENAI_API_KEY
-        )
+        # LLM 설정 (프로세스 공유 클라이언트)
+        self.llm = get_chat_openai(model=config.DEFAULT_MODEL, temperature=0.3)
         
-        # 프롬프트 템플릿 로드
-        prompt_file_path = os.path.join(config.PROMPTS_BASE_DIR, "daily_report_prompt.md")
-        with open(prompt_file_path, "r", encoding="utf-8") as f:
-            prompt_content = f.read()
+        # 프롬프트 템플릿 로드 (파일 내용은 프로세스당 한 번만 읽음)
+        prompt_content = load_prompt_text("daily_report_prompt.md")
         
         self.prompt = PromptTemplate(
             template=prompt_content,
@@ -78,12 +74,7 @@ class DailyReportGenerator:
                 "tasks": parsed_results
             }
 
-    def generate_daily_report(self, state: LangGraphState) -> LangGraphState:
-        """
-        Agent를 호출하여 일일 보고서를 생성하고 LangGraph 상태를 업데이트합니다.
-        """
-        print(f"DailyReportGenerator: {state.get('user_name')} 님의 보고서 생성을 시작합니다.")
-    
+    def _build_report_input(self, state: LangGraphState) -> Dict[str, Any]:
         exclude_key = "daily_reflection"
         target_keys = [
             "documents_analysis_result",
@@ -101,43 +92,90 @@ class DailyReportGenerator:
             else:
                 filtered_results[key] = {}
         
+        # state에서 직접 데이터 추출
+        return {
+            "user_name": state.get("user_name"),
+            "user_id": state.get("user_id"),
+            "target_date": state.get("target_date", datetime.now().strftime("%Y-%m-%d")),
+            "projects": str(state.get("projects", [])),
+            "wbs_data": state.get("wbs_data", []), # 전체 WBS 데이터도 컨텍스트로 제공
+            "docs_analysis": str(filtered_results.get("documents_analysis_result") or "Docs 결과 없음"),
+            "teams_analysis": str(filtered_results.get("teams_analysis_result") or "Teams 결과 없음"),
+            "git_analysis": str(filtered_results.get("git_analysis_result") or "Git 결과 없음"),
+            "email_analysis": str(filtered_results.get("email_analysis_result") or "Email 결과 없음"),
+            "docs_daily_reflection": state.get("documents_analysis_result", {}).get("daily_reflection", ""),
+            "teams_daily_reflection": state.get("teams_analysis_result", {}).get("daily_reflection", ""),
+            "git_daily_reflection": state.get("git_analysis_result", {}).get("daily_reflection", ""),
+            "email_daily_reflection": state.get("email_analysis_result", {}).get("daily_reflection", ""),
+        }
+
+    def _record_error(self, state: LangGraphState, e: Exception) -> Dict[str, Any]:
+        """오류 보고서를 state에 기록하고 노드가 반환할 상태 업데이트를 돌려줍니다."""
+        print(f"DailyReportGenerator: 보고서 생성 중 오류 발생: {e}")
+        state["comprehensive_report"] = {
+            "error": "보고서 생성 실패",
+            "message": str(e)
+        }
+        
+        # 에러를 state의 error_message에도 추가
+        current_error = state.get("error_message") or ""
+        state["error_message"] = (current_error + f"\n DailyReportGenerator 오류: {e}").strip()
+        return {"comprehensive_report": state["comprehensive_report"], "error_message": state["error_message"]}
+
+    def build_no_activity_report(self, state: LangGraphState) -> Dict[str, Any]:
+        """모든 소스의 활동이 0건인 날의 보고서. LLM 출력과 같은 형식의 템플릿으로 만듭니다."""
+        user_name = state.get("user_name")
+        target_date = state.get("target_date", datetime.now().strftime("%Y-%m-%d"))
+        return {
+            "report_title": f"{user_name}님의 {target_date} 업무보고서",
+            "daily_report": {
+                "summary": "총 0개의 WBS에 기여 (GIT 0건, TEAMS 0건, EMAIL 0건, DOCS 0건). 해당 날짜에 수집된 업무 활동이 없습니다.",
+                "contents": []
+            },
+            "daily_reflection": {
+                "summary": "해당 날짜에 수집된 업무 활동이 없어 회고 내용이 없습니다.",
+                "contents": []
+            },
+            "daily_short_review": "오늘은 기록된 활동이 없네요. 내일의 활약을 기대할게요! 🌱"
+        }
+
+    def generate_daily_report(self, state: LangGraphState) -> LangGraphState:
+        """
+        Agent를 호출하여 일일 보고서를 생성하고 LangGraph 상태를 업데이트합니다.
+        """
+        print(f"DailyReportGenerator: {state.get('user_name')} 님의 보고서 생성을 시작합니다.")
+        
         try:
-            # state에서 직접 데이터 추출
-            input_data = {
-                "user_name": state.get("user_name"),
-                "user_id": state.get("user_id"),
-                "target_date": state.get("target_date", datetime.now().strftime("%Y-%m-%d")),
-                "projects": str(state.get("projects", [])),
-                "wbs_data": state.get("wbs_data", []), # 전체 WBS 데이터도 컨텍스트로 제공
-                "docs_analysis": str(filtered_results.get("documents_analysis_result") or "Docs 결과 없음"),
-                "teams_analysis": str(filtered_results.get("teams_analysis_result") or "Teams 결과 없음"),
-                "git_analysis": str(filtered_results.get("git_analysis_result") or "Git 결과 없음"),
-                "email_analysis": str(filtered_results.get("email_analysis_result") or "Email 결과 없음"),
-                "docs_daily_reflection": state.get("documents_analysis_result", {}).get("daily_reflection", ""),
-                "teams_daily_reflection": state.get("teams_analysis_result", {}).get("daily_reflection", ""),
-                "git_daily_reflection": state.get("git_analysis_result", {}).get("daily_reflection", ""),
-                "email_daily_reflection": state.get("email_analysis_result", {}).get("daily_reflection", ""),
-            }
+            input_data = self._build_report_input(state)
             
             # 체인 구성 및 실행
             chain = self.prompt | self.llm | self.parser
             
             print("DailyReportGenerator: LLM을 통한 보고서 생성 중...")
-            report_result = chain.invoke(input_data)
+            report_result = invoke_chain(chain, input_data, PROVIDER_OPENAI)
             
             # 성공적인 보고서 생성 결과를 state에 직접 저장
             print(f"DailyReportGenerator: 보고서 생성 완료 - 제목: {report_result.get('report_title', '제목 없음')}")
             
         except Exception as e:
-            print(f"DailyReportGenerator: 보고서 생성 중 오류 발생: {e}")
-            state["comprehensive_report"] = {
-                "error": "보고서 생성 실패",
-                "message": str(e)
-            }
+            return self._record_error(state, e)
+        
+        return {"comprehensive_report": report_result}
+
+    async def agenerate_daily_report(self, state: LangGraphState) -> LangGraphState:
+        """generate_daily_report의 비동기 버전 (chain.ainvoke)"""
+        print(f"DailyReportGenerator: {state.get('user_name')} 님의 보고서 생성을 시작합니다.")
+        
+        try:
+            input_data = self._build_report_input(state)
+            chain = self.prompt | self.llm | self.parser
             
-            # 에러를 state의 error_message에도 추가
-            current_error = state.get("error_message", "")
-            state["error_message"] = (current_error + f"\n DailyReportGenerator 오류: {e}").strip()
+            print("DailyReportGenerator: LLM을 통한 보고서 생성 중...")
+            report_result = await ainvoke_chain(chain, input_data, PROVIDER_OPENAI)
+            print(f"DailyReportGenerator: 보고서 생성 완료 - 제목: {report_result.get('report_title', '제목 없음')}")
+            
+        except Exception as e:
+            return self._record_error(state, e)
         
         return {"comprehensive_report": report_result}
 
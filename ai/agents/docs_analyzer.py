@@ -1,6 +1,7 @@
 # agents/docs_analyzer.py
+import asyncio
 import os
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 
 from qdrant_client import QdrantClient
 from langchain_openai import ChatOpenAI
@@ -9,30 +10,25 @@ from langchain.prompts import PromptTemplate
 
 from core import config 
 from ai.graphs.state_definition import LangGraphState 
+from ai.tools.activity_census import SOURCE_DOCS, is_source_inactive
 from ai.tools.vector_db_retriever import retrieve_documents
+from ai.utils.llm_registry import get_chat_openai, get_prompt_template
+from ai.utils.rate_limiter import ainvoke_chain, invoke_chain, PROVIDER_OPENAI
 from schemas.project_info import ProjectInfo
 
 class DocsAnalyzer:
     def __init__(self, qdrant_client: QdrantClient):
         self.qdrant_client = qdrant_client
             
-        self.llm = ChatOpenAI(
-            model=config.DEFAULT_MODEL,
-            temperature=0.2,
-            max_tokens=2000,
-            openai_api_key=config.OPENAI_API_KEY
-        )
+        self.llm = get_chat_openai(model=config.DEFAULT_MODEL, temperature=0.2, max_tokens=2000)
         
         self._load_prompt()
         self.parser = JsonOutputParser()
 
     def _load_prompt(self):
         """프롬프트 파일 로드"""
-        prompt_file_path = os.path.join(config.PROMPTS_BASE_DIR, "docs_analyze_prompt.md")
         try:
-            with open(prompt_file_path, "r", encoding="utf-8") as f:
-                prompt_template_str = f.read()
-            self.prompt = PromptTemplate.from_template(prompt_template_str)
+            self.prompt = get_prompt_template("docs_analyze_prompt.md")
         except FileNotFoundError:
             # 기본 프롬프트 설정
             self.prompt = PromptTemplate.from_template(
@@ -46,6 +42,10 @@ class DocsAnalyzer:
         if retrieved_docs_list:
             print(f"DocsAnalyzer: state에서 {len(retrieved_docs_list)}개 문서 재사용")
             return retrieved_docs_list
+
+        # 사전 점검에서 0건으로 확인된 경우 다시 검색하지 않음
+        if is_source_inactive(state, SOURCE_DOCS):
+            return []
         
         # state에 없으면 직접 검색
         user_id = state.get("user_id")
@@ -88,7 +88,7 @@ class DocsAnalyzer:
 
         return "\n\n".join(documents_text_parts)
     
-    def _analyze_docs_data_internal(
+    def _build_docs_llm_input(
         self,
         user_id: str,
         user_name: Optional[str],
@@ -97,8 +97,8 @@ class DocsAnalyzer:
         retrieved_docs_list: List[Dict],
         docs_quality_result: Optional[dict] = None,
         projects: List[ProjectInfo] = None,
-    ) -> Dict[str, Any]:
-        """내부 문서 분석 로직"""
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """(바로 반환할 결과, LLM 입력) 중 하나를 채워 반환합니다. 문서가 없으면 LLM을 호출하지 않습니다."""
         print(f"DocsAnalyzer: 사용자 ID '{user_id}'의 문서 {len(retrieved_docs_list)}개 분석 시작")
         
         # Unique 문서 개수 계산
@@ -121,39 +121,44 @@ class DocsAnalyzer:
                     ]
                 },
                 "total_tasks": 0
-            }
+            }, None
 
         # 문서 내용을 텍스트로 정리
         documents_text = self._format_documents_for_analysis(retrieved_docs_list, user_id)
         wbs_data_str = str(wbs_data) if wbs_data else "WBS 정보 없음"
 
-        # LLM Chain 구성
-        chain = self.prompt | self.llm | self.parser
+        llm_input = {
+            "user_id": user_id,
+            "user_name": user_name or user_id,
+            "target_date": target_date,
+            "documents": documents_text,           # 프롬프트의 {documents} 변수
+            "wbs_data": wbs_data_str,             # 프롬프트의 {wbs_data} 변수
+            "docs_quality_result": docs_quality_result or {},
+            "total_tasks": unique_count,
+            "projects": projects
+        }
+        return None, llm_input
+
+    def _check_result(self, result: Any) -> Dict[str, Any]:
+        # 결과 검증 및 기본값 설정
+        if not isinstance(result, dict):
+            raise ValueError("LLM이 올바른 JSON을 반환하지 않았습니다.")
+        return result
+
+    def _run_llm(self, llm_input: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        try:
+            return self._check_result(invoke_chain(self.prompt | self.llm | self.parser, llm_input, PROVIDER_OPENAI))
+        except Exception as e:
+            print(f"DocsAnalyzer: LLM 분석 중 오류 발생: {e}")
 
+    async def _arun_llm(self, llm_input: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         try:
-            llm_input = {
-                "user_id": user_id,
-                "user_name": user_name or user_id,
-                "target_date": target_date,
-                "documents": documents_text,           # 프롬프트의 {documents} 변수
-                "wbs_data": wbs_data_str,             # 프롬프트의 {wbs_data} 변수
-                "docs_quality_result": docs_quality_result or {},
-                "total_tasks": unique_count,
-                "projects": projects
-            }
-            result = chain.invoke(llm_input)
-            
-            # 결과 검증 및 기본값 설정
-            if not isinstance(result, dict):
-                raise ValueError("LLM이 올바른 JSON을 반환하지 않았습니다.")
-            
-            return result
-        
+            return self._check_result(await ainvoke_chain(self.prompt | self.llm | self.parser, llm_input, PROVIDER_OPENAI))
         except Exception as e:
             print(f"DocsAnalyzer: LLM 분석 중 오류 발생: {e}")
 
-    def analyze_documents(self, state: LangGraphState) -> LangGraphState:
-        """메인 문서 분석 메서드"""
+    def _prepare_analysis(self, state: LangGraphState) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """입력 검증과 문서 검색 후 (바로 반환할 결과, LLM 입력)을 반환합니다."""
         user_id = state.get("user_id")
         user_name = state.get("user_name")
         target_date = state.get("target_date")
@@ -165,18 +170,17 @@ class DocsAnalyzer:
         if not user_id:
             error_msg = "DocsAnalyzer: user_id가 State에 제공되지 않아 분석을 건너뜁니다."
             print(error_msg)
-            return {"documents_analysis_result": {"error": error_msg, "type": "docs"}}
+            return {"error": error_msg, "type": "docs"}, None
         
         if not target_date:
             error_msg = "DocsAnalyzer: target_date가 State에 제공되지 않아 분석을 건너뜁니다."
             print(error_msg)
-            return {"documents_analysis_result": {"error": error_msg, "type": "docs"}}
+            return {"error": error_msg, "type": "docs"}, None
 
         # retrieved_docs_list 가져오기 (state에서 재사용 또는 직접 검색)
         retrieved_docs_list = self._get_retrieved_docs_list(state)
 
-        # 문서 분석 실행
-        analysis_result = self._analyze_docs_data_internal(
+        return self._build_docs_llm_input(
             user_id=user_id,
             user_name=user_name,
             target_date=target_date,
@@ -185,7 +189,19 @@ class DocsAnalyzer:
             docs_quality_result=quality_result,
             projects=projects
         )
-        
+
+    def analyze_documents(self, state: LangGraphState) -> LangGraphState:
+        """메인 문서 분석 메서드"""
+        analysis_result, llm_input = self._prepare_analysis(state)
+        if llm_input is not None:
+            analysis_result = self._run_llm(llm_input)
+        return {"documents_analysis_result": analysis_result}
+
+    async def aanalyze_documents(self, state: LangGraphState) -> LangGraphState:
+        """analyze_documents의 비동기 버전. 문서 검색은 스레드에서 실행하고 LLM 호출은 ainvoke로 기다립니다."""
+        analysis_result, llm_input = await asyncio.to_thread(self._prepare_analysis, state)
+        if llm_input is not None:
+            analysis_result = await self._arun_llm(llm_input)
         return {"documents_analysis_result": analysis_result}
 
     def __call__(self, state: LangGraphState) -> LangGraphState:
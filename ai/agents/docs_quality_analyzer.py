@@ -1,6 +1,7 @@
 # agents/docs_quality_analyzer.py
+import asyncio
 import os
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 from qdrant_client import QdrantClient
 from langchain_openai import ChatOpenAI
@@ -9,18 +10,16 @@ from langchain_core.output_parsers import JsonOutputParser
 
 from core import config 
 from ai.graphs.state_definition import LangGraphState 
-from ai.tools.vector_db_retriever import retrieve_documents, retrieve_documents_content
+from ai.tools.activity_census import SOURCE_DOCS, is_source_inactive
+from ai.tools.vector_db_retriever import retrieve_documents, retrieve_documents_content_by_file
+from ai.utils.llm_registry import get_chat_openai, get_prompt_template
+from ai.utils.rate_limiter import ainvoke_chain, invoke_chain, PROVIDER_OPENAI
 
 
 class DocsQualityAnalyzer:
     def __init__(self, qdrant_client: QdrantClient):
         self.qdrant_client = qdrant_client
-        self.llm = ChatOpenAI(
-            model=config.DEFAULT_MODEL,
-            temperature=0.2,
-            max_tokens=2000,
-            openai_api_key=config.OPENAI_API_KEY
-        )
+        self.llm = get_chat_openai(model=config.DEFAULT_MODEL, temperature=0.2, max_tokens=2000)
         
         self.json_parser = JsonOutputParser()
         self._load_prompts()
@@ -29,24 +28,15 @@ class DocsQualityAnalyzer:
         """프롬프트 .md 파일들을 PromptTemplate 객체로 로드"""
         try:
             # 중요도 평가 프롬프트
-            importance_path = os.path.join(config.PROMPTS_BASE_DIR, "docs_importance_evaluation_prompt.md")
-            with open(importance_path, "r", encoding="utf-8") as f:
-                importance_content = f.read()
-            
+            self.importance_prompt = get_prompt_template("docs_importance_evaluation_prompt.md")
             # 품질 평가 프롬프트
-            quality_path = os.path.join(config.PROMPTS_BASE_DIR, "docs_quality_analyze_prompt.md")
-            with open(quality_path, "r", encoding="utf-8") as f:
-                quality_content = f.read()
-            
-            # PromptTemplate 객체 생성
-            self.importance_prompt = PromptTemplate.from_template(importance_content)
-            self.quality_prompt = PromptTemplate.from_template(quality_content)
+            self.quality_prompt = get_prompt_template("docs_quality_analyze_prompt.md")
             
         except FileNotFoundError as e:
             print(f"DocsQualityAnalyzer: 프롬프트 파일을 찾을 수 없음: {e}")
 
-    def analyze_document_quality(self, state: LangGraphState) -> LangGraphState:
-        """메인 문서 품질 분석 파이프라인"""
+    def _retrieve_documents(self, state: LangGraphState) -> Tuple[Optional[LangGraphState], List[Dict]]:
+        """(바로 반환할 state, 검색된 문서 목록)을 반환합니다."""
         user_id = state.get("user_id")
         target_date = state.get("target_date")
                 
@@ -54,10 +44,10 @@ class DocsQualityAnalyzer:
             return {
                 "documents_quality_result": {"error": "user_id가 제공되지 않았습니다"},
                 "retrieved_docs_list": []
-            }
+            }, []
 
-        # 문서 검색 (한 번만 실행)
-        retrieved_docs_list = retrieve_documents(
+        # 문서 검색 (한 번만 실행, 사전 점검에서 0건으로 확인된 경우 생략)
+        retrieved_docs_list = [] if is_source_inactive(state, SOURCE_DOCS) else retrieve_documents(
             qdrant_client=self.qdrant_client,
             user_id=user_id,
             target_date_str=target_date,
@@ -68,9 +58,16 @@ class DocsQualityAnalyzer:
             return {
                 "documents_quality_result": {"error": "분석할 관련 문서를 찾지 못했습니다"},
                 "retrieved_docs_list": []
-            }
+            }, []
 
         print(f"DocsQualityAnalyzer: {len(retrieved_docs_list)}개 문서 발견")
+        return None, retrieved_docs_list
+
+    def analyze_document_quality(self, state: LangGraphState) -> LangGraphState:
+        """메인 문서 품질 분석 파이프라인"""
+        early_state, retrieved_docs_list = self._retrieve_documents(state)
+        if early_state is not None:
+            return early_state
 
         # 품질 분석 실행
         quality_results = self._analyze_quality_internal(retrieved_docs_list)
@@ -81,6 +78,18 @@ class DocsQualityAnalyzer:
             "retrieved_docs_list": retrieved_docs_list  # docs_analyzer에서 재사용
         }
 
+    async def aanalyze_document_quality(self, state: LangGraphState) -> LangGraphState:
+        """analyze_document_quality의 비동기 버전. 파일별 품질 평가 LLM 호출을 동시에 실행합니다."""
+        early_state, retrieved_docs_list = await asyncio.to_thread(self._retrieve_documents, state)
+        if early_state is not None:
+            return early_state
+
+        quality_results = await self._aanalyze_quality_internal(retrieved_docs_list)
+        return {
+            "documents_quality_result": quality_results,
+            "retrieved_docs_list": retrieved_docs_list  # docs_analyzer에서 재사용
+        }
+
     def _analyze_quality_internal(self, retrieved_docs_list: List[Dict]) -> Dict[str, Any]:
         """내부 품질 분석 로직"""
         try:
@@ -111,8 +120,35 @@ class DocsQualityAnalyzer:
             print(f"DocsQualityAnalyzer: 품질 분석 오류: {e}")
             return {"error": f"분석 중 오류 발생: {str(e)}"}
 
-    def _get_important_documents_and_contents(self, retrieved_docs_list: List[Dict]) -> tuple[Optional[List[str]], Optional[Dict[str, List[str]]]]:
-        """중요 문서와 포함할 내용 선별 (JSON parser 사용)"""
+    async def _aanalyze_quality_internal(self, retrieved_docs_list: List[Dict]) -> Dict[str, Any]:
+        """_analyze_quality_internal의 비동기 버전"""
+        try:
+            important_docs, required_contents = await self._aget_important_documents_and_contents(retrieved_docs_list)
+            
+            if not important_docs:
+                return {"error": "중요한 문서가 선별되지 않았습니다"}
+            
+            print(f"DocsQualityAnalyzer: 중요 문서: {important_docs}")
+            print(f"DocsQualityAnalyzer: 필요 내용: {required_contents}")
+            
+            search_results = await asyncio.to_thread(self._hybrid_search_for_quality, important_docs, required_contents)
+            
+            if not search_results:
+                return {"error": "hybrid search 결과가 없습니다"}
+            
+            print(f"DocsQualityAnalyzer: hybrid search: {len(search_results)}개 chunk")
+            
+            quality_results = await self._aevaluate_quality_by_file(search_results)
+            print(f"DocsQualityAnalyzer: 품질 평가: {len(quality_results)}개 문서")
+
+            return {"evaluations": quality_results, "total_evaluated": len(quality_results)}
+            
+        except Exception as e:
+            print(f"DocsQualityAnalyzer: 품질 분석 오류: {e}")
+            return {"error": f"분석 중 오류 발생: {str(e)}"}
+
+    def _build_doc_list(self, retrieved_docs_list: List[Dict]) -> Optional[str]:
+        """중요도 평가 프롬프트에 넣을 고유 문서 목록 텍스트. 지원되는 문서가 없으면 None."""
         
         # 지원되는 확장자 정의
         valid_extensions = {".docx", ".xlsx"}
@@ -127,74 +163,88 @@ class DocsQualityAnalyzer:
         
         if not unique_docs:
             print("DocsQualityAnalyzer: 지원되는 확장자(.docx, .xlsx)의 문서가 없습니다.")
-            return None, None
+            return None
 
         # 문서 목록 텍스트 생성
-        doc_list = "\n".join([f"{i}. {filename} ({file_type})" 
-                             for i, (filename, file_type) in enumerate(unique_docs.items(), 1)])
+        return "\n".join([f"{i}. {filename} ({file_type})" 
+                          for i, (filename, file_type) in enumerate(unique_docs.items(), 1)])
+
+    def _importance_chain(self):
+        return (
+            {
+                "doc_list": lambda x: x["input_doc_list"]
+            }
+            | self.importance_prompt
+            | self.llm
+            | self.json_parser
+        )
+
+    def _parse_importance_result(self, result: Dict[str, Any]) -> tuple[Optional[List[str]], Optional[Dict[str, List[str]]]]:
+        print(f"DocsQualityAnalyzer: 중요도 분석 결과: {result}")
+        
+        # JSON에서 데이터 추출
+        important_docs = result.get("important_docs", [])
+        contents_dict = result.get("contents", {})
+        
+        # 결과 검증
+        if not important_docs:
+            print("DocsQualityAnalyzer: 중요 문서가 선별되지 않았습니다.")
+            return None, None
+        
+        return important_docs, contents_dict
+
+    def _get_important_documents_and_contents(self, retrieved_docs_list: List[Dict]) -> tuple[Optional[List[str]], Optional[Dict[str, List[str]]]]:
+        """중요 문서와 포함할 내용 선별 (JSON parser 사용)"""
+        doc_list = self._build_doc_list(retrieved_docs_list)
+        if doc_list is None:
+            return None, None
         
         try:
-            # Chain 구성
-            chain = (
-                {
-                    "doc_list": lambda x: x["input_doc_list"]
-                }
-                | self.importance_prompt
-                | self.llm
-                | self.json_parser
-            )
-            
-            # Chain 실행
-            result = chain.invoke({
-                "input_doc_list": doc_list
-            })
-            
-            print(f"DocsQualityAnalyzer: 중요도 분석 결과: {result}")
-            
-            # JSON에서 데이터 추출
-            important_docs = result.get("important_docs", [])
-            contents_dict = result.get("contents", {})
-            
-            # 결과 검증
-            if not important_docs:
-                print("DocsQualityAnalyzer: 중요 문서가 선별되지 않았습니다.")
-                return None, None
-            
-            return important_docs, contents_dict
+            result = invoke_chain(self._importance_chain(), {"input_doc_list": doc_list}, PROVIDER_OPENAI)
+            return self._parse_importance_result(result)
+        except Exception as e:
+            print(f"DocsQualityAnalyzer: 중요도 분석 JSON 파싱 오류: {e}")
+            return None, None
 
+    async def _aget_important_documents_and_contents(self, retrieved_docs_list: List[Dict]) -> tuple[Optional[List[str]], Optional[Dict[str, List[str]]]]:
+        """_get_important_documents_and_contents의 비동기 버전"""
+        doc_list = self._build_doc_list(retrieved_docs_list)
+        if doc_list is None:
+            return None, None
+        
+        try:
+            result = await ainvoke_chain(self._importance_chain(), {"input_doc_list": doc_list}, PROVIDER_OPENAI)
+            return self._parse_importance_result(result)
         except Exception as e:
             print(f"DocsQualityAnalyzer: 중요도 분석 JSON 파싱 오류: {e}")
             return None, None
 
     def _hybrid_search_for_quality(self, important_docs: List[str], required_contents: Dict[str, List[str]]) -> List[Dict]:
-        """hybrid search로 품질 평가용 content 가져오기"""
+        """hybrid search로 품질 평가용 content 가져오기 (모든 파일의 쿼리를 한 번의 배치 검색으로 처리)"""
         
+        file_queries = {
+            filename: required_contents.get(filename, ["문서 완성도"])
+            for filename in important_docs
+        }
+
+        try:
+            results_by_file = retrieve_documents_content_by_file(
+                qdrant_client=self.qdrant_client,
+                file_queries=file_queries,
+                top_k=3  # 각 쿼리당 3개
+            )
+        except Exception as e:
+            print(f"DocsQualityAnalyzer: 배치 검색 오류: {e}")
+            return []
+
         all_results = []
-        
-        for filename in important_docs:
-            contents = required_contents.get(filename, ["문서 완성도"])
-            
-            try:
-                # retrieve_documents_content 사용
-                results = retrieve_documents_content(
-                    qdrant_client=self.qdrant_client,
-                    document_list=[{"filename": filename}],
-                    queries=contents,
-                    top_k=3  # 각 쿼리당 3개
-                )
-                
-                all_results.extend(results)
-                print(f"DocsQualityAnalyzer: {filename}: {len(results)}개 chunk 검색됨 (쿼리: {contents})")
-                
-            except Exception as e:
-                print(f"DocsQualityAnalyzer: {filename} 검색 오류: {e}")
-                continue
+        for filename, results in results_by_file.items():
+            all_results.extend(results)
+            print(f"DocsQualityAnalyzer: {filename}: {len(results)}개 chunk 검색됨 (쿼리: {file_queries[filename]})")
         
         return all_results
 
-    def _evaluate_quality_by_file(self, search_results: List[Dict]) -> List[Dict]:
-        """파일별로 chunk를 종합하여 품질 평가"""
-        
+    def _group_chunks_by_file(self, search_results: List[Dict]) -> Dict[str, List[Dict]]:
         # 파일별로 chunk 그룹화
         file_chunks = {}
         for chunk in search_results:
@@ -202,50 +252,68 @@ class DocsQualityAnalyzer:
             if filename not in file_chunks:
                 file_chunks[filename] = []
             file_chunks[filename].append(chunk)
-        
+        return file_chunks
+
+    def _quality_chain(self):
+        return (
+            {
+                "filename": lambda x: x["filename"],
+                "combined_content": lambda x: x["combined_content"]
+            }
+            | self.quality_prompt 
+            | self.llm
+            | self.json_parser 
+        )
+
+    def _quality_input(self, filename: str, chunks: List[Dict]) -> Dict[str, str]:
+        # 파일의 모든 chunk content 합치기
+        combined_content = "\n\n".join([
+            f"[Chunk {i+1}]: {chunk.get('page_content', '')[:400]}"
+            for i, chunk in enumerate(chunks)
+        ])
+        return {"filename": filename, "combined_content": combined_content}
+
+    def _file_evaluation(self, filename: str, chunks: List[Dict], result_json: Dict[str, Any]) -> Dict[str, Any]:
+        print(f"DocsQualityAnalyzer: {filename} 품질 평가 완료")
+        return {
+            "filename": filename,
+            "evaluation": result_json,
+            "chunks_analyzed": len(chunks)
+        }
+
+    def _file_evaluation_error(self, filename: str, chunks: List[Dict], e: Exception) -> Dict[str, Any]:
+        print(f"DocsQualityAnalyzer: {filename} 평가 오류: {e}")
+        return {
+            "filename": filename,
+            "evaluation": {"error": f"평가 중 오류 발생: {str(e)}"},
+            "chunks_analyzed": len(chunks)
+        }
+
+    def _evaluate_quality_by_file(self, search_results: List[Dict]) -> List[Dict]:
+        """파일별로 chunk를 종합하여 품질 평가"""
         file_evaluations = []
         
-        for filename, chunks in file_chunks.items():
+        for filename, chunks in self._group_chunks_by_file(search_results).items():
             try:
-                # 파일의 모든 chunk content 합치기
-                combined_content = "\n\n".join([
-                    f"[Chunk {i+1}]: {chunk.get('page_content', '')[:400]}"
-                    for i, chunk in enumerate(chunks)
-                ])
-                
-                # 품질 평가 Chain
-                quality_evaluation_chain = (
-                    {
-                        "filename": lambda x: x["filename"],
-                        "combined_content": lambda x: x["combined_content"]
-                    }
-                    | self.quality_prompt 
-                    | self.llm
-                    | self.json_parser 
-                )
-
-                result_json = quality_evaluation_chain.invoke({
-                    "filename": filename,
-                    "combined_content": combined_content
-                })
-
-                file_evaluations.append({
-                    "filename": filename,
-                    "evaluation": result_json,
-                    "chunks_analyzed": len(chunks)
-                })
-                
-                print(f"DocsQualityAnalyzer: {filename} 품질 평가 완료")
-                
+                result_json = invoke_chain(self._quality_chain(), self._quality_input(filename, chunks), PROVIDER_OPENAI)
+                file_evaluations.append(self._file_evaluation(filename, chunks, result_json))
             except Exception as e:
-                print(f"DocsQualityAnalyzer: {filename} 평가 오류: {e}")
-                file_evaluations.append({
-                    "filename": filename,
-                    "evaluation": {"error": f"평가 중 오류 발생: {str(e)}"},
-                    "chunks_analyzed": len(chunks)
-                })
+                file_evaluations.append(self._file_evaluation_error(filename, chunks, e))
 
         return file_evaluations
 
+    async def _aevaluate_quality_by_file(self, search_results: List[Dict]) -> List[Dict]:
+        """파일별 품질 평가를 동시에 실행합니다. (공급자 호출 예산 안에서 대기, 결과는 파일 순서 유지)"""
+
+        async def evaluate(filename: str, chunks: List[Dict]) -> Dict[str, Any]:
+            try:
+                result_json = await ainvoke_chain(self._quality_chain(), self._quality_input(filename, chunks), PROVIDER_OPENAI)
+                return self._file_evaluation(filename, chunks, result_json)
+            except Exception as e:
+                return self._file_evaluation_error(filename, chunks, e)
+
+        file_chunks = self._group_chunks_by_file(search_results)
+        return list(await asyncio.gather(*(evaluate(filename, chunks) for filename, chunks in file_chunks.items())))
+
     def __call__(self, state: LangGraphState) -> LangGraphState:
         return self.analyze_document_quality(state)
\ No newline at end of file
@@ -1,7 +1,8 @@
 # agents/email_analyzer.py
+import asyncio
 import os
 import json
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 
 from qdrant_client import QdrantClient
 from langchain_anthropic import ChatAnthropic
@@ -11,16 +12,16 @@ from langchain.prompts import PromptTemplate
 
 from core import config
 from ai.graphs.state_definition import LangGraphState
+from ai.tools.activity_census import SOURCE_EMAIL, is_source_inactive
 from ai.tools.vector_db_retriever import retrieve_emails
+from ai.utils.llm_registry import get_chat_anthropic, get_prompt_template
+from ai.utils.rate_limiter import ainvoke_chain, invoke_chain, PROVIDER_ANTHROPIC
 from schemas.project_info import ProjectInfo
 
 class EmailAnalyzerAgent:
     def __init__(self, qdrant_client: QdrantClient):
         self.qdrant_client = qdrant_client
-        self.llm_client = ChatAnthropic(
-            model = config.CLAUDE_MODEL, temperature=0.1,
-            api_key=config.CLAUDE_API_KEY, max_tokens=10000
-        )
+        self.llm_client = get_chat_anthropic(model=config.CLAUDE_MODEL, temperature=0.1, max_tokens=10000)
 
         # self.llm_client = ChatOpenAI(
         #     model=config.DEFAULT_MODEL, temperature=0.1,
@@ -30,10 +31,8 @@ class EmailAnalyzerAgent:
 
         prompt_file_path = os.path.join(config.PROMPTS_BASE_DIR, "email_analyze_prompt.md")
         try:
-            with open(prompt_file_path, 'r', encoding='utf-8') as f: 
-                prompt_template_str = f.read()
             # 예상 프롬프트 변수: {user_id}, {user_name}, {target_date}, {email_data}, {wbs_data}
-            self.prompt = PromptTemplate.from_template(prompt_template_str)
+            self.prompt = get_prompt_template("email_analyze_prompt.md")
         except FileNotFoundError:
             print(f"EmailAnalyzerAgent: 오류 - 프롬프트 파일을 찾을 수 없습니다: {prompt_file_path}")
             self.prompt_template_str = "사용자 ID {user_id} (이름: {user_name})의 {target_date} 이메일 내역({email_data})과 WBS 업무({wbs_data})를 분석하여, 업무 매칭 결과와 진행 상황을 JSON 형식으로 요약해줘."
@@ -58,7 +57,7 @@ class EmailAnalyzerAgent:
             parts.append(f"- 제목: {subject}\n  발신: {from_addr}\n  수신: {to_addrs_str}\n  날짜: {timestamp}\n  내용 일부: {content}...\n---")
         return "\n".join(parts)
 
-    def _analyze_emails_internal(
+    def _build_email_llm_input(
         self, 
         user_id: str, 
         user_email: str,
@@ -67,36 +66,45 @@ class EmailAnalyzerAgent:
         target_date: str, # target_date는 필수
         retrieved_emails_list: List[Dict],
         projects: List[ProjectInfo]
-    ) -> Dict[str, Any]:
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """(바로 반환할 결과, LLM 입력) 중 하나를 채워 반환합니다. 분석할 이메일이 없으면 LLM을 호출하지 않습니다."""
         print(f"EmailAnalyzerAgent: 사용자 ID '{user_id}'의 이메일 {len(retrieved_emails_list)}개 분석 시작 (대상일: {target_date}).")
 
         if not retrieved_emails_list:
             print(f"EmailAnalyzerAgent: 사용자 ID '{user_id}'에 대한 분석할 이메일이 없습니다 (대상일: {target_date}).")
-            return {"summary": "분석할 관련 이메일을 찾지 못했습니다.", "matched_tasks": [], "unmatched_tasks": [], "error": "No emails to analyze"}
+            return {"summary": "분석할 관련 이메일을 찾지 못했습니다.", "matched_tasks": [], "unmatched_tasks": [], "error": "No emails to analyze"}, None
             
         wbs_data_str = json.dumps(wbs_data, ensure_ascii=False, indent=2) if wbs_data else "WBS 정보 없음"
         email_data_str = self._prepare_email_data_for_llm(retrieved_emails_list, target_date)
         
-        chain = self.prompt | self.llm_client | self.parser
-        
+        llm_input = {
+            "user_id": user_id,
+            "user_name": user_name,
+            "user_email": user_email,
+            "target_date": target_date,
+            "email_data": email_data_str, # 프롬프트의 {email_data} 변수
+            "wbs_data": wbs_data_str,     # 프롬프트의 {wbs_data} 변수
+            "total_tasks": len(retrieved_emails_list),
+            "projects": projects
+        }
+        return None, llm_input
+
+    def _run_llm(self, llm_input: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            llm_input = {
-                "user_id": user_id,
-                "user_name": user_name,
-                "user_email": user_email,
-                "target_date": target_date,
-                "email_data": email_data_str, # 프롬프트의 {email_data} 변수
-                "wbs_data": wbs_data_str,     # 프롬프트의 {wbs_data} 변수
-                "total_tasks": len(retrieved_emails_list),
-                "projects": projects
-            }
-            analysis_result = chain.invoke(llm_input)
-            return analysis_result # LLM 순수 결과만 반환
+            return invoke_chain(self.prompt | self.llm_client | self.parser, llm_input, PROVIDER_ANTHROPIC) # LLM 순수 결과만 반환
         except Exception as e:
             print(f"EmailAnalyzerAgent: LLM 이메일 분석 중 오류: {e}")
             return {"summary": "이메일 분석 중 오류 발생", "error": str(e)}
 
-    def analyze_emails(self, state: LangGraphState) -> LangGraphState:
+    async def _arun_llm(self, llm_input: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return await ainvoke_chain(self.prompt | self.llm_client | self.parser, llm_input, PROVIDER_ANTHROPIC)
+        except Exception as e:
+            print(f"EmailAnalyzerAgent: LLM 이메일 분석 중 오류: {e}")
+            return {"summary": "이메일 분석 중 오류 발생", "error": str(e)}
+
+    def _prepare_analysis(self, state: LangGraphState) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """입력 검증과 이메일 검색 후 (바로 반환할 결과, LLM 입력)을 반환합니다."""
         print(f"EmailAnalyzerAgent: 사용자 ID '{state.get('user_id')}'의 이메일 분석 시작 (날짜: {state.get('target_date')})...")
         
         user_id = state.get("user_id")
@@ -106,30 +114,43 @@ class EmailAnalyzerAgent:
         wbs_data = state.get("wbs_data")
         projects = state.get("projects")
         
-        analysis_result = {} # 기본값 초기화
         if not user_id:
             error_msg = "EmailAnalyzerAgent: user_id가 State에 제공되지 않아 분석을 건너뜁니다."
             print(error_msg)
-            analysis_result = {"error": error_msg, "summary": "사용자 ID 누락"}
-        elif not target_date: # Emails는 날짜 필터링 필수
+            return {"error": error_msg, "summary": "사용자 ID 누락"}, None
+        if not target_date: # Emails는 날짜 필터링 필수
             error_msg = "EmailAnalyzerAgent: target_date가 State에 제공되지 않아 분석을 건너뜁니다."
             print(error_msg)
-            analysis_result = {"error": error_msg, "summary": "대상 날짜 누락"}
-        else:
-            retrieved_list = retrieve_emails(
-                qdrant_client=self.qdrant_client, 
-                user_id=user_id, 
-                target_date_str=target_date
-            )
-
-            analysis_result = self._analyze_emails_internal(
-                user_id, user_email, user_name, wbs_data, target_date, retrieved_list, projects
-            )
-            
-            analysis_result = {k: v for k, v in analysis_result.items() if k != "excluded_emails"}
-            
+            return {"error": error_msg, "summary": "대상 날짜 누락"}, None
+
+        # 사전 점검에서 0건으로 확인된 소스는 조회하지 않음
+        retrieved_list = [] if is_source_inactive(state, SOURCE_EMAIL) else retrieve_emails(
+            qdrant_client=self.qdrant_client, 
+            user_id=user_id, 
+            target_date_str=target_date
+        )
+        return self._build_email_llm_input(
+            user_id, user_email, user_name, wbs_data, target_date, retrieved_list, projects
+        )
+
+    @staticmethod
+    def _to_state(analysis_result: Dict[str, Any]) -> LangGraphState:
+        analysis_result = {k: v for k, v in analysis_result.items() if k != "excluded_emails"}
         return {"email_analysis_result": analysis_result}
 
+    def analyze_emails(self, state: LangGraphState) -> LangGraphState:
+        analysis_result, llm_input = self._prepare_analysis(state)
+        if llm_input is not None:
+            analysis_result = self._run_llm(llm_input)
+        return self._to_state(analysis_result)
+
+    async def aanalyze_emails(self, state: LangGraphState) -> LangGraphState:
+        """analyze_emails의 비동기 버전. Qdrant 검색은 스레드에서 실행하고 LLM 호출은 ainvoke로 기다립니다."""
+        analysis_result, llm_input = await asyncio.to_thread(self._prepare_analysis, state)
+        if llm_input is not None:
+            analysis_result = await self._arun_llm(llm_input)
+        return self._to_state(analysis_result)
+
     def __call__(self, state: LangGraphState) -> LangGraphState:
         return self.analyze_emails(state)
 
@@ -1,7 +1,8 @@
+import asyncio
 import os
 import json
 import pandas as pd
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 
 from qdrant_client import QdrantClient
 from langchain_anthropic import ChatAnthropic
@@ -11,16 +12,16 @@ from langchain.prompts import PromptTemplate
 
 from core import config
 from ai.graphs.state_definition import LangGraphState
+from ai.tools.activity_census import SOURCE_GIT, is_source_inactive
 from ai.tools.vector_db_retriever import retrieve_git_activities
+from ai.utils.llm_registry import get_chat_anthropic, get_prompt_template
+from ai.utils.rate_limiter import ainvoke_chain, invoke_chain, PROVIDER_ANTHROPIC
 from schemas.project_info import ProjectInfo
 
 class GitAnalyzerAgent:
     def __init__(self, qdrant_client: QdrantClient):
         self.qdrant_client = qdrant_client
-        self.llm_client = ChatAnthropic(
-            model = config.CLAUDE_MODEL, temperature=0.1,
-            api_key=config.CLAUDE_API_KEY, max_tokens=10000
-        )
+        self.llm_client = get_chat_anthropic(model=config.CLAUDE_MODEL, temperature=0.1, max_tokens=10000)
         # self.llm_client = ChatOpenAI(
         #     model=config.DEFAULT_MODEL, temperature=0.1,
         #     openai_api_key=config.OPENAI_API_KEY, max_tokens=2500
@@ -29,10 +30,8 @@ class GitAnalyzerAgent:
 
         prompt_file_path = os.path.join(config.PROMPTS_BASE_DIR, "git_analyze_prompt.md")
         try:
-            with open(prompt_file_path, 'r', encoding='utf-8') as f: 
-                prompt_template_str = f.read()
             # 예상 프롬프트 변수: {user_id}, {user_name}, {target_date}, {git_info}, {wbs_data}
-            self.prompt = PromptTemplate.from_template(prompt_template_str)
+            self.prompt = get_prompt_template("git_analyze_prompt.md")
         except FileNotFoundError:
             print(f"GitAnalyzerAgent: 오류 - 프롬프트 파일을 찾을 수 없습니다: {prompt_file_path}")
             self.prompt_template_str = """
@@ -121,7 +120,7 @@ class GitAnalyzerAgent:
 
         return "\n".join(parts)
 
-    def _analyze_git_internal(
+    def _build_git_llm_input(
     self, 
     user_id: str, # Teams 분석 대상 user_id
     user_name: Optional[str], # LLM 프롬프트용 user_name 
@@ -130,7 +129,8 @@ class GitAnalyzerAgent:
     retrieved_activities: List[Dict],
     projects: List[ProjectInfo],
     readme_info: str = "",
-    ) -> Dict[str, Any]:
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """(바로 반환할 결과, LLM 입력) 중 하나를 채워 반환합니다. 분석할 Git 활동이 없으면 LLM을 호출하지 않습니다."""
         total_count = len(retrieved_activities)
         print(f"GitAnalyzerAgent: 사용자 식별자 '{user_id}' Git 활동 분석. 총 {total_count}건 (대상일: {target_date}).")
         
@@ -142,7 +142,7 @@ class GitAnalyzerAgent:
                 "unmatched_tasks": [],
                 "unassigned_git_activities": [],
                 "error": "No Git activities to analyze"
-            }
+            }, None
         # 1. Python으로 Git 활동 통계 사전 분석
         git_stats = self._calculate_git_stats(retrieved_activities)
         git_stats_str = git_stats["summary_str"]
@@ -150,26 +150,34 @@ class GitAnalyzerAgent:
         wbs_data_str = json.dumps(wbs_data, ensure_ascii=False, indent=2) if wbs_data else "WBS 정보 없음"
         git_data_str = self._prepare_git_data_for_llm(retrieved_activities, target_date)
 
-        chain = self.prompt | self.llm_client | self.parser
+        llm_input = {
+            "user_id": user_id,
+            "user_name": user_name or user_id,
+            "target_date": target_date,
+            "git_info": git_data_str,
+            "wbs_data": wbs_data_str,
+            "git_stats": git_stats_str,
+            "readme_info": readme_info,
+            "projects": projects
+        }
+        return None, llm_input
 
+    def _run_llm(self, llm_input: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            llm_input = {
-                "user_id": user_id,
-                "user_name": user_name or user_id,
-                "target_date": target_date,
-                "git_info": git_data_str,
-                "wbs_data": wbs_data_str,
-                "git_stats": git_stats_str,
-                "readme_info": readme_info,
-                "projects": projects
-            }
-            analysis_result = chain.invoke(llm_input)
-            return analysis_result
+            return invoke_chain(self.prompt | self.llm_client | self.parser, llm_input, PROVIDER_ANTHROPIC)
         except Exception as e:
             print(f"GitAnalyzerAgent: LLM Git 분석 중 오류: {e}")
             return {"summary": "Git 활동 분석 중 오류 발생", "error": str(e)}
 
-    def analyze_git(self, state: LangGraphState) -> LangGraphState:
+    async def _arun_llm(self, llm_input: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return await ainvoke_chain(self.prompt | self.llm_client | self.parser, llm_input, PROVIDER_ANTHROPIC)
+        except Exception as e:
+            print(f"GitAnalyzerAgent: LLM Git 분석 중 오류: {e}")
+            return {"summary": "Git 활동 분석 중 오류 발생", "error": str(e)}
+
+    def _prepare_analysis(self, state: LangGraphState) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """입력 검증과 Git 활동/README 검색 후 (바로 반환할 결과, LLM 입력)을 반환합니다."""
         git_identifier = state.get("user_id")
         print(f"GitAnalyzerAgent: 사용자 식별자 '{git_identifier}' Git 활동 분석 시작 (날짜: {state.get('target_date')})...")
         
@@ -178,14 +186,17 @@ class GitAnalyzerAgent:
         wbs_data = state.get("wbs_data")
         projects = state.get("projects")
 
-        analysis_result = {} # 기본값 초기화
         if not git_identifier:
             error_msg = "Git 분석용 식별자(user_id) 누락"; print(f"GitAnalyzerAgent: {error_msg}")
-            analysis_result = {"error": error_msg, "summary": "사용자 식별자 누락"}
-        elif not target_date: # Git 활동은 날짜 필터링 필수
+            return {"error": error_msg, "summary": "사용자 식별자 누락"}, None
+        if not target_date: # Git 활동은 날짜 필터링 필수
             error_msg = "GitAnalyzerAgent: target_date가 State에 제공되지 않아 분석을 건너뜁니다."
             print(error_msg)
-            analysis_result = {"error": error_msg, "summary": "대상 날짜 누락"}
+            return {"error": error_msg, "summary": "대상 날짜 누락"}, None
+
+        if is_source_inactive(state, SOURCE_GIT):
+            # 사전 점검에서 0건으로 확인된 소스는 조회하지 않음
+            git_activities, readme_info = [], ""
         else:
             retrieved_dict = retrieve_git_activities(
                 qdrant_client=self.qdrant_client, 
@@ -197,10 +208,21 @@ class GitAnalyzerAgent:
             # 반환값이 튜플이므로 분리
             git_activities, readme_info = retrieved_dict
 
-            analysis_result = self._analyze_git_internal(
-                git_identifier, user_name_for_context, target_date, wbs_data, git_activities, projects, readme_info
-            )
-        
+        return self._build_git_llm_input(
+            git_identifier, user_name_for_context, target_date, wbs_data, git_activities, projects, readme_info
+        )
+
+    def analyze_git(self, state: LangGraphState) -> LangGraphState:
+        analysis_result, llm_input = self._prepare_analysis(state)
+        if llm_input is not None:
+            analysis_result = self._run_llm(llm_input)
+        return {"git_analysis_result": analysis_result}
+
+    async def aanalyze_git(self, state: LangGraphState) -> LangGraphState:
+        """analyze_git의 비동기 버전. Qdrant 검색은 스레드에서 실행하고 LLM 호출은 ainvoke로 기다립니다."""
+        analysis_result, llm_input = await asyncio.to_thread(self._prepare_analysis, state)
+        if llm_input is not None:
+            analysis_result = await self._arun_llm(llm_input)
         return {"git_analysis_result": analysis_result}
 
     def __call__(self, state: LangGraphState) -> LangGraphState:
@@ -1,7 +1,8 @@
 # agents/teams_analyzer.py
+import asyncio
 import os
 import json
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 
 from qdrant_client import QdrantClient
 from langchain_openai import ChatOpenAI
@@ -11,16 +12,16 @@ from langchain.prompts import PromptTemplate
 
 from core import config
 from ai.graphs.state_definition import LangGraphState
+from ai.tools.activity_census import SOURCE_TEAMS, is_source_inactive
 from ai.tools.vector_db_retriever import retrieve_teams_posts
+from ai.utils.llm_registry import get_chat_anthropic, get_prompt_template
+from ai.utils.rate_limiter import ainvoke_chain, invoke_chain, PROVIDER_ANTHROPIC
 from schemas.project_info import ProjectInfo
 
 class TeamsAnalyzer:
     def __init__(self, qdrant_client: QdrantClient):
         self.qdrant_client = qdrant_client
-        self.llm = ChatAnthropic(
-            model = config.CLAUDE_MODEL, temperature=0.1,
-            api_key=config.CLAUDE_API_KEY, max_tokens=10000
-        )
+        self.llm = get_chat_anthropic(model=config.CLAUDE_MODEL, temperature=0.1, max_tokens=10000)
 
         # self.llm = ChatOpenAI(
         #     model=config.FAST_MODEL, temperature=0.2,
@@ -30,10 +31,8 @@ class TeamsAnalyzer:
         
         prompt_file_path = os.path.join(config.PROMPTS_BASE_DIR, "teams_analyzer_prompt.md")
         try:
-            with open(prompt_file_path, "r", encoding="utf-8") as f: 
-                prompt_template_str = f.read()
             # 예상 프롬프트 변수: {user_id}, {user_name}, {target_date}, {posts}, {wbs_data}
-            self.prompt = PromptTemplate.from_template(prompt_template_str)
+            self.prompt = get_prompt_template("teams_analyzer_prompt.md")
         except FileNotFoundError:
             print(f"TeamsAnalyzer: 오류 - 프롬프트 파일을 찾을 수 없습니다: {prompt_file_path}")
             self.prompt_template_str = """
@@ -61,7 +60,7 @@ class TeamsAnalyzer:
             parts.append(f"- 작성자: {author_display}\n  유형: {type}\n  시간: {timestamp}\n  내용: {content}...\n---")
         return "\n".join(parts)
 
-    def _analyze_teams_data_internal(
+    def _build_teams_llm_input(
             self, 
             user_id: str, # Teams 분석 대상 user_id
             user_name: Optional[str], # LLM 프롬프트용 user_name 
@@ -69,7 +68,8 @@ class TeamsAnalyzer:
             wbs_data: Optional[dict],
             projects: List[ProjectInfo],
             retrieved_posts_list: List[Dict]
-        ) -> Dict[str, Any]:
+        ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """(바로 반환할 결과, LLM 입력) 중 하나를 채워 반환합니다. 분석할 게시물이 없으면 LLM을 호출하지 않습니다."""
         print(f"TeamsAnalyzer: 사용자 ID '{user_id}'의 Teams 게시물 {len(retrieved_posts_list)}개 분석 시작 (대상일: {target_date}).")
 
         if not retrieved_posts_list:
@@ -88,30 +88,38 @@ class TeamsAnalyzer:
                     }
                 },
                 "error": "No Teams posts to analyze"
-            }
+            }, None
 
         wbs_data_str = json.dumps(wbs_data, ensure_ascii=False, indent=2) if wbs_data else "WBS 정보 없음"
         posts_data_str = self._prepare_teams_posts_for_llm(retrieved_posts_list, target_date)
 
-        chain = self.prompt | self.llm | self.parser
-        
+        llm_input = {
+            "user_id": user_id,
+            "user_name": user_name or user_id,
+            "target_date": target_date,
+            "posts": posts_data_str, # 프롬프트의 {posts} 변수
+            "wbs_data": wbs_data_str, # 프롬프트의 {wbs_data} 변수
+            "total_tasks": len(retrieved_posts_list),
+            "projects": projects,
+        }
+        return None, llm_input
+
+    def _run_llm(self, llm_input: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            llm_input = {
-                "user_id": user_id,
-                "user_name": user_name or user_id,
-                "target_date": target_date,
-                "posts": posts_data_str, # 프롬프트의 {posts} 변수
-                "wbs_data": wbs_data_str, # 프롬프트의 {wbs_data} 변수
-                "total_tasks": len(retrieved_posts_list),
-                "projects": projects,
-            }
-            result = chain.invoke(llm_input)
-            return result # LLM 순수 결과만 반환
+            return invoke_chain(self.prompt | self.llm | self.parser, llm_input, PROVIDER_ANTHROPIC) # LLM 순수 결과만 반환
         except Exception as e:
             print(f"TeamsAnalyzer: LLM Teams 분석 중 오류: {e}")
             return {"summary": "Teams 활동 분석 중 오류 발생", "error": str(e)}
 
-    def analyze_teams(self, state: LangGraphState) -> LangGraphState:
+    async def _arun_llm(self, llm_input: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return await ainvoke_chain(self.prompt | self.llm | self.parser, llm_input, PROVIDER_ANTHROPIC)
+        except Exception as e:
+            print(f"TeamsAnalyzer: LLM Teams 분석 중 오류: {e}")
+            return {"summary": "Teams 활동 분석 중 오류 발생", "error": str(e)}
+
+    def _prepare_analysis(self, state: LangGraphState) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """입력 검증과 게시물 검색 후 (바로 반환할 결과, LLM 입력)을 반환합니다."""
         print(f"TeamsAnalyzer: 사용자 ID '{state.get('user_id')}' Teams 활동 분석 시작 (날짜: {state.get('target_date')})...")
         
         user_id = state.get("user_id")
@@ -120,27 +128,37 @@ class TeamsAnalyzer:
         wbs_data = state.get("wbs_data")
         projects = state.get("projects")
 
-        analysis_result = {} # 기본값 초기화
         if not user_id:
             error_msg = "TeamsAnalyzer: user_id가 State에 제공되지 않아 분석을 건너뜁니다."
             print(error_msg)
-            analysis_result = {"error": error_msg, "summary": "사용자 ID 누락"}
-        elif not target_date: # Teams는 날짜 필터링 필수
+            return {"error": error_msg, "summary": "사용자 ID 누락"}, None
+        if not target_date: # Teams는 날짜 필터링 필수
             error_msg = "TeamsAnalyzer: target_date가 State에 제공되지 않아 분석을 건너뜁니다."
             print(error_msg)
-            analysis_result = {"error": error_msg, "summary": "대상 날짜 누락"}
-        else:
-            retrieved_list = retrieve_teams_posts(
-                qdrant_client=self.qdrant_client, 
-                user_id=user_id, 
-                target_date_str=target_date
-                # scroll_limit은 retriever 내부 기본값 사용 또는 여기서 지정
-            )
-
-            analysis_result = self._analyze_teams_data_internal(
-                user_id, user_name, target_date, wbs_data, projects, retrieved_list
-            )
-        
+            return {"error": error_msg, "summary": "대상 날짜 누락"}, None
+
+        # 사전 점검에서 0건으로 확인된 소스는 조회하지 않음
+        retrieved_list = [] if is_source_inactive(state, SOURCE_TEAMS) else retrieve_teams_posts(
+            qdrant_client=self.qdrant_client, 
+            user_id=user_id, 
+            target_date_str=target_date
+            # scroll_limit은 retriever 내부 기본값 사용 또는 여기서 지정
+        )
+        return self._build_teams_llm_input(
+            user_id, user_name, target_date, wbs_data, projects, retrieved_list
+        )
+
+    def analyze_teams(self, state: LangGraphState) -> LangGraphState:
+        analysis_result, llm_input = self._prepare_analysis(state)
+        if llm_input is not None:
+            analysis_result = self._run_llm(llm_input)
+        return {"teams_analysis_result": analysis_result}
+
+    async def aanalyze_teams(self, state: LangGraphState) -> LangGraphState:
+        """analyze_teams의 비동기 버전. Qdrant 검색은 스레드에서 실행하고 LLM 호출은 ainvoke로 기다립니다."""
+        analysis_result, llm_input = await asyncio.to_thread(self._prepare_analysis, state)
+        if llm_input is not None:
+            analysis_result = await self._arun_llm(llm_input)
         return {"teams_analysis_result": analysis_result}
 
     def __call__(self, state: LangGraphState) -> LangGraphState:
@@ -1,13 +1,17 @@
 import os
+from typing import Any, Dict, List, Optional, Tuple
 
+from core import config
 from core.settings import Settings
-from ai.utils import file_processor
+from ai.utils import file_processor, wbs_diff
 from ai.utils.llm_interface import LLMInterface
 from ai.utils.vector_db import VectorDBHandler
+from ai.tools.wbs_retriever_tool import clear_wbs_task_cache
 
 class WBSAnalysisAgent:
 
-    def __init__(self, project_id: int, wbs_file_path: str, prompt_file_path: str):
+    def __init__(self, project_id: int, wbs_file_path: str, prompt_file_path: str, wbs_file_hash: Optional[str] = None,
+                 llm_interface: Optional[LLMInterface] = None):
 
         if not all([project_id, wbs_file_path, prompt_file_path]):
             raise ValueError("project_id, wbs_file_path, prompt_file_path는 필수 인자입니다.")
@@ -15,17 +19,20 @@ class WBSAnalysisAgent:
         self.project_id = project_id
         self.wbs_file_path = os.path.abspath(wbs_file_path) # 절대 경로로 변환
         self.prompt_file_path = os.path.abspath(prompt_file_path) # 절대 경로로 변환
+        self.wbs_file_hash = wbs_file_hash # 다운로드 중 계산된 해시가 있으면 파일을 다시 읽지 않음
 
         # 설정 로드 (API 키 등)
         self.settings = Settings() # Settings 클래스 인스턴스화 시 API 키 등 유효성 검사
 
-        # LLM 인터페이스 초기화
-        prompt_template_string = LLMInterface.load_prompt_from_file(self.prompt_file_path)
-        self.llm_interface = LLMInterface(
-            api_key=self.settings.OPENAI_API_KEY,
-            model_name=self.settings.OPENAI_MODEL_NAME,
-            prompt_template_str=prompt_template_string
-        )
+        # LLM 인터페이스 초기화 (여러 파일을 연속 적재할 때는 공유 인스턴스를 전달받음)
+        if llm_interface is None:
+            prompt_template_string = LLMInterface.load_prompt_from_file(self.prompt_file_path)
+            llm_interface = LLMInterface(
+                api_key=self.settings.OPENAI_API_KEY,
+                model_name=self.settings.OPENAI_MODEL_NAME,
+                prompt_template_str=prompt_template_string
+            )
+        self.llm_interface = llm_interface
 
         # vector_db_base_path 아래에 프로젝트별/컬렉션별로 실제 DB 파일이 생성됨
         self.db_handler = VectorDBHandler(
@@ -34,7 +41,7 @@ class WBSAnalysisAgent:
         
         print(f"WBSAnalysisAgent 초기화 완료: Project ID '{self.project_id}', WBS File '{self.wbs_file_path}'")
 
-    def run_ingestion_pipeline(self):
+    def run_ingestion_pipeline(self, force_full: bool = False):
         print(f"\n=== WBS 데이터 적재 파이프라인 시작: 프로젝트 '{self.project_id}' ===")
         
         # 1. WBS 파일 존재 여부 확인
@@ -44,7 +51,7 @@ class WBSAnalysisAgent:
 
         try:
             # 2. 현재 WBS 파일의 해시 계산
-            current_wbs_hash = file_processor.calculate_file_hash(self.wbs_file_path)
+            current_wbs_hash = self.wbs_file_hash or file_processor.calculate_file_hash(self.wbs_file_path)
             print(f"현재 WBS 파일 해시: {current_wbs_hash[:10]}...")
 
             # 3. DB에 저장된 이전 해시 조회
@@ -52,41 +59,31 @@ class WBSAnalysisAgent:
             print(f"DB에 저장된 이전 해시: {stored_hash[:10] if stored_hash else '없음'}")
 
             # 4. 해시 비교하여 변경 여부 확인
-            if current_wbs_hash == stored_hash and stored_hash is not None:
+            if current_wbs_hash == stored_hash and stored_hash is not None and not force_full:
                 print(f"WBS 데이터 변경 없음 (해시 동일). 프로젝트 '{self.project_id}' 적재 작업을 건너뜁니다.")
                 print("=== 파이프라인 완료 (변경 없음) ===")
                 return True # 성공 (변경 없음)
 
-            # 5. 변경되었거나 첫 실행 시, 기존 데이터 삭제 (해당 프로젝트에 대해서만)
-            print(f"WBS 데이터 변경 감지 또는 첫 실행. 프로젝트 '{self.project_id}'의 기존 VectorDB 데이터 삭제 중...")
-            self.db_handler.clear_project_data()
-            
-            # 6. 임베딩 모델 초기화 (WBS 변경이 있을 때만)
-            print(f"WBS 데이터 변경 감지로 임베딩 모델을 초기화합니다.")
-            self.db_handler.initialize_embedding_model()
-
-            # 7. WBS 파일 읽고 JSON으로 변환
-            print(f"WBS 파일 '{self.wbs_file_path}' 읽고 JSON으로 변환 중...")
-            wbs_json_content = file_processor.read_wbs_to_json_text(self.wbs_file_path)
-            # print(f"WBS JSON 내용 (일부): {wbs_json_content[:300]}...") # 디버깅 시
-
-            # 8. LLM으로 분석 요청
-            print("LLM을 통해 WBS 데이터 분석 중...")
-            llm_analysis_result = self.llm_interface.analyze_wbs_with_llm(wbs_json_content)
-
-            if not llm_analysis_result or not isinstance(llm_analysis_result, dict) or \
-               not any(llm_analysis_result.get(key) for key in ["project_summary", "task_list"]):
-                print("오류: LLM으로부터 유효한 분석 결과를 받지 못했습니다. 파이프라인을 중단합니다.")
-                # print(f"LLM 응답 내용: {llm_analysis_result}") # 디버깅 시
-                return False # 실패
-
-            # 9. 분석 결과를 VectorDB에 저장
-            print("LLM 분석 결과를 VectorDB에 저장 중...")
-            self.db_handler.store_llm_analysis_results(llm_analysis_result, current_wbs_hash)
-            
-            print(f"프로젝트 '{self.project_id}'의 WBS 데이터 분석 및 적재 성공!")
-            print("=== 파이프라인 성공적으로 완료 ===")
-            return True # 성공
+            # 5. 행 단위 레코드와 행 해시 준비
+            print(f"WBS 파일 '{self.wbs_file_path}' 읽고 행 단위 레코드로 변환 중...")
+            rows = wbs_diff.build_rows(file_processor.stream_wbs_records(self.wbs_file_path))
+            if not rows:
+                print("오류: WBS 파일에서 읽을 수 있는 행이 없습니다.")
+                return False
+
+            # 6. 저장된 행 해시와 비교하여 증분 적재 가능 여부 판단
+            plan = self._choose_incremental_plan(rows, stored_hash, force_full)
+            if plan is not None:
+                success = self._run_incremental_update(plan, current_wbs_hash)
+            else:
+                success = self._run_full_ingestion(rows, current_wbs_hash)
+
+            if success:
+                # 같은 프로세스의 WBS 작업 캐시가 이전 해시의 작업 목록을 반환하지 않도록 비웁니다.
+                clear_wbs_task_cache(self.project_id)
+                print(f"프로젝트 '{self.project_id}'의 WBS 데이터 분석 및 적재 성공!")
+                print("=== 파이프라인 성공적으로 완료 ===")
+            return success
 
         except FileNotFoundError as e_fnf:
             print(f"파일 관련 오류 발생: {e_fnf}")
@@ -102,3 +99,95 @@ class WBSAnalysisAgent:
             print(f"WBS 적재 파이프라인 실행 중 예상치 못한 오류 발생: {e}")
             print(traceback.format_exc()) # 상세 스택 트레이스 출력
             return False
+
+    def _choose_incremental_plan(self, rows: List[Dict[str, Any]], stored_hash: Optional[str], force_full: bool) -> Optional["wbs_diff.WBSDiffPlan"]:
+        """증분 적재 계획을 반환합니다. 첫 적재, 강제 전체 적재, 행 해시 없는 이전 데이터, 변경 비율 초과이면 None (전체 재적재)."""
+        if stored_hash is None or force_full:
+            return None
+        plan = wbs_diff.plan_incremental_update(rows, self.db_handler.get_stored_row_hashes())
+        if plan is None:
+            print("기존 데이터에 행 해시가 없어 전체 재적재를 진행합니다.")
+        elif plan.change_ratio > config.WBS_INCREMENTAL_MAX_CHANGE_RATIO:
+            print(f"변경 비율 {plan.change_ratio:.0%}가 기준({config.WBS_INCREMENTAL_MAX_CHANGE_RATIO:.0%})을 넘어 전체 재적재를 진행합니다.")
+            plan = None
+        return plan
+
+    def _analyze_rows(self, rows: List[Dict[str, Any]]) -> Optional[Tuple[Dict[str, Any], List[List[str]]]]:
+        """
+        행 레코드를 토큰 예산 단위 청크로 나누어 LLM으로 분석하고,
+        병합된 각 작업의 출처 행 해시(해당 작업을 추출한 청크의 행 기준)를 함께 반환합니다.
+        """
+        print(f"LLM을 통해 WBS 데이터 분석 중... ({len(rows)}행)")
+        analyzed = self.llm_interface.analyze_wbs_records_chunked([row["record"] for row in rows])
+        if analyzed is None:
+            print("오류: LLM으로부터 유효한 분석 결과를 받지 못했습니다. 파이프라인을 중단합니다.")
+            return None
+        llm_analysis_result, chunks, task_chunk_indexes = analyzed
+
+        if not any(llm_analysis_result.get(key) for key in ["project_summary", "task_list"]):
+            print("오류: LLM으로부터 유효한 분석 결과를 받지 못했습니다. 파이프라인을 중단합니다.")
+            return None
+
+        # 청크별로 해당 청크에서 나온 작업들을 그 청크의 행에 연결합니다.
+        row_by_record_id = {id(row["record"]): row for row in rows}
+        task_list = llm_analysis_result["task_list"]
+        task_row_hashes: List[List[str]] = [[] for _ in task_list]
+        for chunk_index, chunk_records in enumerate(chunks):
+            task_positions = [i for i, ci in enumerate(task_chunk_indexes) if ci == chunk_index]
+            if not task_positions:
+                continue
+            chunk_rows = [row_by_record_id[id(record)] for record in chunk_records]
+            attributed = wbs_diff.attribute_tasks_to_rows([task_list[i] for i in task_positions], chunk_rows)
+            for position, row_hashes in zip(task_positions, attributed):
+                task_row_hashes[position] = row_hashes
+        return llm_analysis_result, task_row_hashes
+
+    def _run_full_ingestion(self, rows: List[Dict[str, Any]], current_wbs_hash: str) -> bool:
+        """전체 행을 분석하여 프로젝트 데이터를 교체합니다. (첫 적재, 이전 방식 데이터, 변경이 많은 경우)"""
+        print(f"WBS 데이터 변경 감지 또는 첫 실행. 프로젝트 '{self.project_id}' 전체 적재를 진행합니다.")
+        self.db_handler.initialize_embedding_model()
+
+        analyzed = self._analyze_rows(rows)
+        if analyzed is None:
+            return False
+        llm_analysis_result, task_row_hashes = analyzed
+
+        # 결정적 ID로 먼저 제자리 업서트한 뒤 이전 해시의 포인트만 정리하므로, 적재 중에도 프로젝트 데이터가 비지 않습니다.
+        print("LLM 분석 결과를 VectorDB에 저장 중...")
+        if self.db_handler.store_llm_analysis_results(llm_analysis_result, current_wbs_hash, task_row_hashes) is None:
+            print("오류: VectorDB 저장에 실패하여 이전 데이터를 유지합니다.")
+            return False
+        self.db_handler.sweep_stale_points(current_wbs_hash)
+        return True
+
+    def _run_incremental_update(self, plan: "wbs_diff.WBSDiffPlan", current_wbs_hash: str) -> bool:
+        """변경된 행만 LLM으로 재분석하고, 수정/삭제된 행의 작업만 교체합니다."""
+        print(f"증분 적재: {plan.summary()}")
+
+        if plan.rows_to_analyze:
+            self.db_handler.initialize_embedding_model()
+            analyzed = self._analyze_rows(plan.rows_to_analyze)
+            if analyzed is None:
+                return False
+            llm_analysis_result, task_row_hashes = analyzed
+        else:
+            llm_analysis_result, task_row_hashes = None, None
+
+        written_ids: List[str] = []
+        if llm_analysis_result is not None:
+            print("변경된 행의 LLM 분석 결과를 VectorDB에 저장 중...")
+            # 유지하는 포인트의 ID는 예약하여, 변경된 행의 작업이 같은 task_id를 가져도 유지할 포인트를 덮어쓰지 않도록 합니다.
+            written_ids = self.db_handler.store_llm_analysis_results(
+                llm_analysis_result, current_wbs_hash, task_row_hashes, reserved_ids=plan.kept_point_ids
+            )
+            if written_ids is None:
+                print("오류: VectorDB 저장에 실패하여 이전 데이터를 유지합니다.")
+                return False
+
+        # 같은 task_id로 제자리 갱신된 포인트는 남기고, 더 이상 존재하지 않는 작업의 포인트만 삭제합니다.
+        written = set(written_ids)
+        self.db_handler.delete_points([point_id for point_id in plan.stale_point_ids if point_id not in written])
+
+        # 유지된 포인트도 현재 파일 해시를 갖도록 갱신 (다음 실행의 파일 해시 비교 및 WBS 작업 캐시 키)
+        self.db_handler.update_wbs_hash(current_wbs_hash)
+        return True
@@ -7,6 +7,8 @@ from langchain_core.output_parsers import JsonOutputParser
 
 from ai.graphs.state_definition import WeeklyLangGraphState
 from core import config
+from ai.utils.llm_registry import get_chat_openai, get_prompt_template
+from ai.utils.rate_limiter import ainvoke_chain, invoke_chain, PROVIDER_OPENAI
 # from core.state_definition import LangGraphState # LangGraph와 직접 연동 시 필요
 
 class WeeklyReportGenerator:
@@ -20,32 +22,24 @@ class WeeklyReportGenerator:
         WeeklyReportGenerator를 초기화합니다.
         LLM, 프롬프트 템플릿, 출력 파서를 설정합니다.
         """
-        self.llm = ChatOpenAI(
-            model=config.DEFAULT_MODEL,
-            temperature=0.2,
-            openai_api_key=config.OPENAI_API_KEY
-        )
+        self.llm = get_chat_openai(model=config.DEFAULT_MODEL, temperature=0.2)
         
         # 주간 보고서 프롬프트 템플릿 파일 경로 설정
         prompt_file_path = os.path.join(config.PROMPTS_BASE_DIR,"weekly_report_prompt.md")
         
         # 프롬프트 템플릿 파일 로드
         try:
-            with open(prompt_file_path, "r", encoding="utf-8") as f:
-                prompt_template_str = f.read()
+            self.prompt = get_prompt_template("weekly_report_prompt.md")
         except FileNotFoundError:
             print(f"오류: 프롬프트 파일을 찾을 수 없습니다. 경로: {prompt_file_path}")
             # 프롬프트 파일이 없으면 실행이 불가능하므로 예외 발생
             raise
             
         # 예상 프롬프트 변수: {user_name}, {user_id}, {start_date}, {end_date}, {daily_reports}
-        self.prompt = PromptTemplate.from_template(prompt_template_str)
         self.parser = JsonOutputParser()
 
-    def generate_weekly_report(self, state: WeeklyLangGraphState) -> WeeklyLangGraphState:
-        """
-        일일 보고서 목록을 기반으로 주간 보고서를 생성합니다.
-        """
+    def _build_prompt_data(self, state: WeeklyLangGraphState):
+        """(바로 반환할 결과, LLM 입력) 중 하나를 채워 반환합니다."""
         user_name = state.get("user_name")
         user_id = state.get("user_id")
         projects = state.get("projects")
@@ -61,35 +55,62 @@ class WeeklyReportGenerator:
             return {
                 "error": "보고서 생성 실패",
                 "message": "분석할 일일 보고서 데이터가 없습니다."
-            }
+            }, None
             
+        # LLM에 전달할 프롬프트 데이터 구성
+        return None, {
+            "user_name": user_name,
+            "user_id": user_id,
+            "start_date": start_date,
+            "end_date": end_date,
+            "projects": projects,
+            "daily_reports": json.dumps(daily_reports or [], ensure_ascii=False, indent=2),
+            "wbs_data": json.dumps(wbs_data, ensure_ascii=False, indent=2),
+        }
+
+    def _error_result(self, e: Exception):
+        print(f"WeeklyReportGenerator: 주간 보고서 생성 중 오류 발생: {e}")
+        return {
+            "error": "주간 보고서 생성 실패",
+            "message": str(e)
+        }
+
+    def _apply_result(self, state: WeeklyLangGraphState, report_result) -> WeeklyLangGraphState:
+        print(f"WeeklyReportGenerator: 주간 보고서 생성 완료 - 제목: {report_result.get('report_title', '제목 없음')}")
+        state["weekly_report_result"] = report_result
+        return state
+
+    def generate_weekly_report(self, state: WeeklyLangGraphState) -> WeeklyLangGraphState:
+        """
+        일일 보고서 목록을 기반으로 주간 보고서를 생성합니다.
+        """
         try:
-            # LLM에 전달할 프롬프트 데이터 구성
-            prompt_data = {
-                "user_name": user_name,
-                "user_id": user_id,
-                "start_date": start_date,
-                "end_date": end_date,
-                "projects": projects,
-                "daily_reports": json.dumps(daily_reports or [], ensure_ascii=False, indent=2),
-                "wbs_data": json.dumps(wbs_data, ensure_ascii=False, indent=2),
-            }
+            early_result, prompt_data = self._build_prompt_data(state)
+            if prompt_data is None:
+                return early_result
             
             # LangChain 체인 구성 및 실행
             chain = self.prompt | self.llm | self.parser
             
             print("WeeklyReportGenerator: LLM을 통한 주간 보고서 생성 중...")
-            report_result = chain.invoke(prompt_data)
+            report_result = invoke_chain(chain, prompt_data, PROVIDER_OPENAI)
+            return self._apply_result(state, report_result)
             
-            print(f"WeeklyReportGenerator: 주간 보고서 생성 완료 - 제목: {report_result.get('report_title', '제목 없음')}")
+        except Exception as e:
+            return self._error_result(e)
+
+    async def agenerate_weekly_report(self, state: WeeklyLangGraphState) -> WeeklyLangGraphState:
+        """generate_weekly_report의 비동기 버전 (chain.ainvoke)"""
+        try:
+            early_result, prompt_data = self._build_prompt_data(state)
+            if prompt_data is None:
+                return early_result
             
-            state["weekly_report_result"] = report_result
+            chain = self.prompt | self.llm | self.parser
             
-            return state
+            print("WeeklyReportGenerator: LLM을 통한 주간 보고서 생성 중...")
+            report_result = await ainvoke_chain(chain, prompt_data, PROVIDER_OPENAI)
+            return self._apply_result(state, report_result)
             
         except Exception as e:
-            print(f"WeeklyReportGenerator: 주간 보고서 생성 중 오류 발생: {e}")
-            return {
-                "error": "주간 보고서 생성 실패",
-                "message": str(e)
-            }
+            return self._error_result(e)
@@ -1,11 +1,15 @@
-from qdrant_client import QdrantClient
+import asyncio
+from ai.utils.qdrant_client_factory import get_qdrant_client
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 from typing import List
 
 from core import config
 from ai.graphs.state_definition import LangGraphState
 
+from ai.tools.activity_census import has_no_activity, record_avoided_llm_calls, take_activity_census
 from ai.tools.wbs_data_retriever import WBSDataRetriever
+from ai.agents.agent_registry import get_agent
 from ai.agents.docs_analyzer import DocsAnalyzer
 from ai.agents.docs_quality_analyzer import DocsQualityAnalyzer
 from ai.agents.email_analyzer import EmailAnalyzerAgent
@@ -19,16 +23,28 @@ def initialize_global_clients():
     global qdrant_client_instance
     if qdrant_client_instance is None:
         try:
-            qdrant_client_instance = QdrantClient(
-                host=config.QDRANT_HOST, 
-                port=config.QDRANT_PORT
-            )
-            print("Qdrant 클라이언트 초기화 성공.")
+            # VectorDBHandler, WBS 도구와 같은 프로세스 공유 클라이언트를 사용합니다.
+            qdrant_client_instance = get_qdrant_client()
         except Exception as e:
             print(f"Qdrant 클라이언트 초기화 실패: {e}")
             raise 
     return qdrant_client_instance
 
+def activity_census_node(state: LangGraphState) -> LangGraphState:
+    print("\n--- 활동 사전 점검 노드 실행 ---")
+    if not qdrant_client_instance:
+        return {"activity_counts": None}
+    return {"activity_counts": take_activity_census(qdrant_client_instance, state.get("user_id"), state.get("target_date"))}
+
+def no_activity_report_node(state: LangGraphState) -> LangGraphState:
+    print("\n--- 활동 없음 보고서 노드 실행 (WBS 로딩/분석/보고서 생성 생략) ---")
+    report_generator = get_agent(DailyReportGenerator, wbs_retriever_tool_instance=get_agent(WBSDataRetriever, qdrant_client=qdrant_client_instance))
+    record_avoided_llm_calls() # 보고서 생성 LLM 호출 1회 (빈 소스의 분석 에이전트는 원래도 LLM을 호출하지 않음)
+    return {"comprehensive_report": report_generator.build_no_activity_report(state)}
+
+def route_after_census(state: LangGraphState) -> str:
+    return "no_activity_report" if has_no_activity(state.get("activity_counts")) else "load_wbs"
+
 def load_wbs_node(state: LangGraphState) -> LangGraphState:
     print("\n--- WBS 데이터 로딩 노드 실행 (WBSDataRetrieverAgent) ---")
     if not qdrant_client_instance:
@@ -40,7 +56,7 @@ def load_wbs_node(state: LangGraphState) -> LangGraphState:
     # WBSDataRetrieverAgent는 __init__에서 qdrant_client를 받지만,
     # tools/wbs_retriever_tools.py의 함수들은 자체적으로 DB 핸들러를 생성함.
     # 따라서 여기서 전달하는 qdrant_client_instance는 현재 WBS 조회에는 직접 사용되지 않을 수 있음.
-    wbs_retriever_agent = WBSDataRetriever(qdrant_client=qdrant_client_instance)
+    wbs_retriever_agent = get_agent(WBSDataRetriever, qdrant_client=qdrant_client_instance)
     updated_state = wbs_retriever_agent(state) 
     if updated_state.get("wbs_data") and updated_state.get("wbs_data", {}).get("task_list"):
         print("WBS 데이터 로딩 완료.")
@@ -55,7 +71,7 @@ def analyze_docs_node(state: LangGraphState) -> LangGraphState:
         state["error_message"] = (state.get("error_message","") + "\n 문서 분석 실패: Qdrant 클라이언트 미초기화").strip()
         state["documents_analysis_result"] = {"error": "Qdrant client not initialized"}
         return state
-    docs_analyzer = DocsAnalyzer(qdrant_client=qdrant_client_instance)
+    docs_analyzer = get_agent(DocsAnalyzer, qdrant_client=qdrant_client_instance)
     return docs_analyzer(state)
 
 def analyze_emails_node(state: LangGraphState) -> LangGraphState:
@@ -64,7 +80,7 @@ def analyze_emails_node(state: LangGraphState) -> LangGraphState:
         state["error_message"] = (state.get("error_message","") + "\n 이메일 분석 실패: Qdrant 클라이언트 미초기화").strip()
         state["email_analysis_result"] = {"error": "Qdrant client not initialized"}
         return state
-    email_analyzer = EmailAnalyzerAgent(qdrant_client=qdrant_client_instance)
+    email_analyzer = get_agent(EmailAnalyzerAgent, qdrant_client=qdrant_client_instance)
     return email_analyzer(state)
 
 def analyze_git_node(state: LangGraphState) -> LangGraphState:
@@ -73,7 +89,7 @@ def analyze_git_node(state: LangGraphState) -> LangGraphState:
         state["error_message"] = (state.get("error_message","") + "\n Git 분석 실패: Qdrant 클라이언트 미초기화").strip()
         state["git_analysis_result"] = {"error": "Qdrant client not initialized"}
         return state
-    git_analyzer = GitAnalyzerAgent(qdrant_client=qdrant_client_instance)
+    git_analyzer = get_agent(GitAnalyzerAgent, qdrant_client=qdrant_client_instance)
     return git_analyzer(state)
 
 def analyze_teams_node(state: LangGraphState) -> LangGraphState:
@@ -82,7 +98,7 @@ def analyze_teams_node(state: LangGraphState) -> LangGraphState:
         state["error_message"] = (state.get("error_message","") + "\n Teams 분석 실패: Qdrant 클라이언트 미초기화").strip()
         state["teams_analysis_result"] = {"error": "Qdrant client not initialized"}
         return state
-    teams_analyzer = TeamsAnalyzer(qdrant_client=qdrant_client_instance)
+    teams_analyzer = get_agent(TeamsAnalyzer, qdrant_client=qdrant_client_instance)
     return teams_analyzer(state)
 
 
@@ -92,7 +108,7 @@ def analyze_docs_quality_node(state: LangGraphState) -> LangGraphState:
         state["error_message"] = (state.get("error_message","") + "\n 문서 품질 분석 실패: Qdrant 클라이언트 미초기화").strip()
         state["documents_quality_result"] = {"error": "Qdrant client not initialized"}
         return state
-    docs_quality_analyzer = DocsQualityAnalyzer(qdrant_client=qdrant_client_instance)
+    docs_quality_analyzer = get_agent(DocsQualityAnalyzer, qdrant_client=qdrant_client_instance)
     return docs_quality_analyzer.analyze_document_quality(state)
 
 def generate_report_node(state: LangGraphState) -> LangGraphState:
@@ -110,9 +126,10 @@ def generate_report_node(state: LangGraphState) -> LangGraphState:
 
         # WBSDataRetriever 인스턴스를 DailyReportGenerator에 전달
         # DailyReportGenerator는 이 인스턴스를 통해 Qdrant 클라이언트에 직접 접근합니다.
-        wbs_retriever_tool_instance = WBSDataRetriever(qdrant_client=qdrant_client_instance)
+        # 두 인스턴스 모두 프로세스 공유 인스턴스를 재사용합니다.
+        wbs_retriever_tool_instance = get_agent(WBSDataRetriever, qdrant_client=qdrant_client_instance)
 
-        report_generator = DailyReportGenerator(wbs_retriever_tool_instance=wbs_retriever_tool_instance) 
+        report_generator = get_agent(DailyReportGenerator, wbs_retriever_tool_instance=wbs_retriever_tool_instance) 
         
         updated_state = report_generator.generate_daily_report(state)
         print("Daily 보고서 생성 완료.")
@@ -127,6 +144,74 @@ def generate_report_node(state: LangGraphState) -> LangGraphState:
         return state
 
 
+# 비동기 노드: app.ainvoke로 실행하면 분석 노드들의 LLM 호출이 한 이벤트 루프에서 겹쳐 실행됩니다.
+# Qdrant 검색 등 동기 I/O는 에이전트 내부에서 스레드로 넘기며, 클라이언트 미초기화 처리는 동기 노드와 같습니다.
+async def aactivity_census_node(state: LangGraphState) -> LangGraphState:
+    return await asyncio.to_thread(activity_census_node, state)
+
+async def aload_wbs_node(state: LangGraphState) -> LangGraphState:
+    return await asyncio.to_thread(load_wbs_node, state)
+
+async def aanalyze_docs_node(state: LangGraphState) -> LangGraphState:
+    if not qdrant_client_instance:
+        return analyze_docs_node(state)
+    print("\n--- 문서 분석 노드 실행 (async) ---")
+    docs_analyzer = get_agent(DocsAnalyzer, qdrant_client=qdrant_client_instance)
+    return await docs_analyzer.aanalyze_documents(state)
+
+async def aanalyze_emails_node(state: LangGraphState) -> LangGraphState:
+    if not qdrant_client_instance:
+        return analyze_emails_node(state)
+    print("\n--- 이메일 분석 노드 실행 (async) ---")
+    email_analyzer = get_agent(EmailAnalyzerAgent, qdrant_client=qdrant_client_instance)
+    return await email_analyzer.aanalyze_emails(state)
+
+async def aanalyze_git_node(state: LangGraphState) -> LangGraphState:
+    if not qdrant_client_instance:
+        return analyze_git_node(state)
+    print("\n--- Git 활동 분석 노드 실행 (async) ---")
+    git_analyzer = get_agent(GitAnalyzerAgent, qdrant_client=qdrant_client_instance)
+    return await git_analyzer.aanalyze_git(state)
+
+async def aanalyze_teams_node(state: LangGraphState) -> LangGraphState:
+    if not qdrant_client_instance:
+        return analyze_teams_node(state)
+    print("\n--- Teams 활동 분석 노드 실행 (async) ---")
+    teams_analyzer = get_agent(TeamsAnalyzer, qdrant_client=qdrant_client_instance)
+    return await teams_analyzer.aanalyze_teams(state)
+
+async def aanalyze_docs_quality_node(state: LangGraphState) -> LangGraphState:
+    if not qdrant_client_instance:
+        return analyze_docs_quality_node(state)
+    print("\n--- 문서 품질 분석 노드 실행 (async) ---")
+    docs_quality_analyzer = get_agent(DocsQualityAnalyzer, qdrant_client=qdrant_client_instance)
+    return await docs_quality_analyzer.aanalyze_document_quality(state)
+
+async def agenerate_report_node(state: LangGraphState) -> LangGraphState:
+    if not qdrant_client_instance:
+        return generate_report_node(state)
+    print("\n--- Daily 보고서 생성 노드 실행 (async) ---")
+    try:
+        wbs_retriever_tool_instance = get_agent(WBSDataRetriever, qdrant_client=qdrant_client_instance)
+        report_generator = get_agent(DailyReportGenerator, wbs_retriever_tool_instance=wbs_retriever_tool_instance) 
+        
+        updated_state = await report_generator.agenerate_daily_report(state)
+        print("Daily 보고서 생성 완료.")
+        return updated_state
+    except Exception as e:
+        print(f"Daily 보고서 생성 실패: {e}")
+        state["error_message"] = (state.get("error_message","") + f"\n 보고서 생성 실패: {e}").strip()
+        state["comprehensive_report"] = {
+            "report_metadata": {"success": False, "error": str(e)},
+            "report_content": {"error": "보고서 생성 실패"}
+        }
+        return state
+
+def _node(func, afunc, name: str) -> RunnableLambda:
+    """app.invoke에서는 func, app.ainvoke에서는 afunc를 실행하는 노드"""
+    return RunnableLambda(func, afunc=afunc, name=name)
+
+
 def fan_out(_: LangGraphState) -> List[str]:
     return ["analyze_git", "analyze_emails", "analyze_teams", "analyze_docs_quality"]
 
@@ -137,15 +222,21 @@ def create_analysis_graph():
 
     workflow = StateGraph(LangGraphState)
 
-    workflow.add_node("load_wbs", load_wbs_node)
-    workflow.add_node("analyze_docs_quality", analyze_docs_quality_node)
-    workflow.add_node("analyze_docs", analyze_docs_node)
-    workflow.add_node("analyze_git", analyze_git_node)
-    workflow.add_node("analyze_emails", analyze_emails_node)
-    workflow.add_node("analyze_teams", analyze_teams_node)
-    workflow.add_node("generate_report", generate_report_node)
+    workflow.add_node("activity_census", _node(activity_census_node, aactivity_census_node, "activity_census"))
+    workflow.add_node("no_activity_report", no_activity_report_node)
+    workflow.add_node("load_wbs", _node(load_wbs_node, aload_wbs_node, "load_wbs"))
+    workflow.add_node("analyze_docs_quality", _node(analyze_docs_quality_node, aanalyze_docs_quality_node, "analyze_docs_quality"))
+    workflow.add_node("analyze_docs", _node(analyze_docs_node, aanalyze_docs_node, "analyze_docs"))
+    workflow.add_node("analyze_git", _node(analyze_git_node, aanalyze_git_node, "analyze_git"))
+    workflow.add_node("analyze_emails", _node(analyze_emails_node, aanalyze_emails_node, "analyze_emails"))
+    workflow.add_node("analyze_teams", _node(analyze_teams_node, aanalyze_teams_node, "analyze_teams"))
+    workflow.add_node("generate_report", _node(generate_report_node, agenerate_report_node, "generate_report"))
+
+    workflow.set_entry_point("activity_census")
 
-    workflow.set_entry_point("load_wbs")
+    # 모든 소스의 활동이 0건이면 분석과 보고서 생성 LLM 호출 없이 템플릿 보고서로 종료
+    workflow.add_conditional_edges("activity_census", route_after_census, ["load_wbs", "no_activity_report"])
+    workflow.add_edge("no_activity_report", END)
 
     workflow.add_conditional_edges("load_wbs", fan_out, ["analyze_git", "analyze_emails", "analyze_teams", "analyze_docs_quality"])
     workflow.add_edge("analyze_docs_quality", "analyze_docs")
@@ -0,0 +1,69 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from ai.graphs.daily_graph import create_analysis_graph
+from ai.graphs.weekly_graph import create_weekly_graph
+from ai.graphs.team_weekly_graph import create_team_weekly_graph
+
+GRAPH_DAILY = "daily"
+GRAPH_WEEKLY = "weekly"
+GRAPH_TEAM_WEEKLY = "team_weekly"
+
+_GRAPH_FACTORIES: Dict[str, Callable[[], Any]] = {
+    GRAPH_DAILY: create_analysis_graph,
+    GRAPH_WEEKLY: create_weekly_graph,
+    GRAPH_TEAM_WEEKLY: create_team_weekly_graph,
+}
+
+# 컴파일된 LangGraph 앱은 체크포인터 없이 상태를 갖지 않으므로 여러 스레드에서 동시에 invoke 해도 안전합니다.
+_compiled_graphs: Dict[str, Any] = {}
+_compile_seconds: Dict[str, float] = {}
+_reuse_counts: Dict[str, int] = {}
+_registry_lock = threading.Lock()
+
+def get_compiled_graph(name: str) -> Any:
+    """이름에 해당하는 컴파일된 그래프를 반환합니다. 프로세스당 한 번만 컴파일합니다."""
+    if name not in _GRAPH_FACTORIES:
+        raise ValueError(f"알 수 없는 그래프 이름입니다: {name}")
+
+    with _registry_lock:
+        app = _compiled_graphs.get(name)
+        if app is None:
+            started_at = time.perf_counter()
+            app = _GRAPH_FACTORIES[name]()
+            _compile_seconds[name] = time.perf_counter() - started_at
+            _compiled_graphs[name] = app
+            _reuse_counts[name] = 0
+            print(f"GraphRegistry: '{name}' 그래프 컴파일 완료 ({_compile_seconds[name] * 1000:.1f}ms)")
+        else:
+            _reuse_counts[name] += 1
+        return app
+
+def warmup_graphs(names: Optional[Iterable[str]] = None) -> Dict[str, float]:
+    """애플리케이션 시작 시 그래프를 미리 컴파일하고 그래프별 컴파일 시간(초)을 출력합니다."""
+    target_names = list(names) if names else list(_GRAPH_FACTORIES.keys())
+    print("\n--- LangGraph 그래프 사전 컴파일 ---")
+    for name in target_names:
+        try:
+            get_compiled_graph(name)
+        except Exception as e:
+            print(f"GraphRegistry: '{name}' 그래프 사전 컴파일 실패 (첫 요청 시 재시도): {e}")
+
+    with _registry_lock:
+        timings = {name: _compile_seconds[name] for name in target_names if name in _compile_seconds}
+    for name, seconds in timings.items():
+        print(f"  - {name}: {seconds * 1000:.1f}ms (사용자/팀 실행마다 절약되는 컴파일 시간)")
+    return timings
+
+def get_graph_reuse_report() -> Dict[str, Dict[str, float]]:
+    """그래프별 컴파일 시간, 재사용 횟수, 재사용으로 절약된 누적 시간을 반환합니다."""
+    with _registry_lock:
+        return {
+            name: {
+                "compile_ms": round(seconds * 1000, 1),
+                "reuse_count": _reuse_counts.get(name, 0),
+                "saved_seconds": round(seconds * _reuse_counts.get(name, 0), 2),
+            }
+            for name, seconds in _compile_seconds.items()
+        }
@@ -17,6 +17,7 @@ class LangGraphState(Dict):
     project_id: Optional[int] = None # 분석 대상 프로젝트 ID (WBS 등)
 
     # --- 데이터 조회 및 분석 결과 ---
+    activity_counts: Optional[Dict[str, Optional[int]]] = None # 사전 점검한 소스별(git/email/teams/docs) 활동 건수
     wbs_data: Optional[Dict] = None 
 
     documents_analysis_result: Optional[Dict] = None
@@ -1,8 +1,11 @@
-from qdrant_client import QdrantClient
+import asyncio
+from ai.utils.qdrant_client_factory import get_qdrant_client
 from ai.agents.team_weekly_report_generator import TeamWeeklyReportGenerator
 from ai.tools.wbs_data_retriever import WBSDataRetriever
+from ai.agents.agent_registry import get_agent
 from core import config
 from ai.graphs.state_definition import TeamWeeklyLangGraphState
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 
 qdrant_client_instance = None
@@ -11,11 +14,8 @@ def initialize_global_clients():
     global qdrant_client_instance
     if qdrant_client_instance is None:
         try:
-            qdrant_client_instance = QdrantClient(
-                host=config.QDRANT_HOST, 
-                port=config.QDRANT_PORT
-            )
-            print("Qdrant 클라이언트 초기화 성공.")
+            # VectorDBHandler, WBS 도구와 같은 프로세스 공유 클라이언트를 사용합니다.
+            qdrant_client_instance = get_qdrant_client()
         except Exception as e:
             print(f"Qdrant 클라이언트 초기화 실패: {e}")
             raise 
@@ -32,7 +32,7 @@ def load_wbs_node(state: TeamWeeklyLangGraphState) -> TeamWeeklyLangGraphState:
     # WBSDataRetrieverAgent는 __init__에서 qdrant_client를 받지만,
     # tools/wbs_retriever_tools.py의 함수들은 자체적으로 DB 핸들러를 생성함.
     # 따라서 여기서 전달하는 qdrant_client_instance는 현재 WBS 조회에는 직접 사용되지 않을 수 있음.
-    wbs_retriever_agent = WBSDataRetriever(qdrant_client=qdrant_client_instance)
+    wbs_retriever_agent = get_agent(WBSDataRetriever, qdrant_client=qdrant_client_instance)
     updated_state = wbs_retriever_agent(state) 
     if updated_state.get("wbs_data") and updated_state.get("wbs_data", {}).get("task_list"):
         print("WBS 데이터 로딩 완료.")
@@ -44,7 +44,7 @@ def load_wbs_node(state: TeamWeeklyLangGraphState) -> TeamWeeklyLangGraphState:
 def generate_team_weekly_report_node(state: TeamWeeklyLangGraphState) -> TeamWeeklyLangGraphState:
     print("\n--- 주간 보고서 생성 및 저장 노드 실행 ---")
     try:
-        generator = TeamWeeklyReportGenerator()
+        generator = get_agent(TeamWeeklyReportGenerator)
 
         weekly_reports_data = state.get("weekly_reports_data")
         if not weekly_reports_data:
@@ -64,6 +64,29 @@ def generate_team_weekly_report_node(state: TeamWeeklyLangGraphState) -> TeamWee
 
     return state
 
+async def aload_wbs_node(state: TeamWeeklyLangGraphState) -> TeamWeeklyLangGraphState:
+    return await asyncio.to_thread(load_wbs_node, state)
+
+async def agenerate_team_weekly_report_node(state: TeamWeeklyLangGraphState) -> TeamWeeklyLangGraphState:
+    print("\n--- 주간 보고서 생성 및 저장 노드 실행 (async) ---")
+    try:
+        generator = get_agent(TeamWeeklyReportGenerator)
+
+        if not state.get("weekly_reports_data"):
+            raise ValueError("주간 보고서 데이터가 없습니다.")
+
+        return await generator.agenerate_team_weekly_report(state)
+
+    except Exception as e:
+        print(f"주간 보고서 생성 실패: {e}")
+        state["error_message"] = (state.get("error_message", "") + f"\n주간 보고서 생성 실패: {e}").strip()
+        state["weekly_report_result"] = {
+            "report_metadata": {"success": False, "error": str(e)},
+            "report_content": {"error": "주간 보고서 생성 실패"}
+        }
+
+    return state
+
 def create_team_weekly_graph():
     initialize_global_clients()
     if not qdrant_client_instance:
@@ -71,8 +94,8 @@ def create_team_weekly_graph():
 
     workflow = StateGraph(TeamWeeklyLangGraphState)
 
-    workflow.add_node("load_wbs", load_wbs_node)
-    workflow.add_node("generate_report", generate_team_weekly_report_node)
+    workflow.add_node("load_wbs", RunnableLambda(load_wbs_node, afunc=aload_wbs_node, name="load_wbs"))
+    workflow.add_node("generate_report", RunnableLambda(generate_team_weekly_report_node, afunc=agenerate_team_weekly_report_node, name="generate_report"))
 
     workflow.set_entry_point("load_wbs")
     workflow.add_edge("load_wbs", "generate_report")
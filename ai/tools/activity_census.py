@@ -0,0 +1,60 @@
+import threading
+from typing import Any, Dict, Mapping, Optional
+
+from qdrant_client import QdrantClient
+
+from core import config
+from ai.tools.vector_db_retriever import count_user_activities
+
+# Daily 그래프 실행 전 사용자의 소스별 활동 건수를 세어(사전 점검) 빈 소스의 분석을 생략합니다.
+# - 모든 소스가 0건이면 그래프가 WBS 로딩/분석/보고서 생성 LLM 호출 없이 템플릿 보고서로 바로 종료합니다.
+# - 일부 소스만 0건이면 해당 분석 에이전트가 Qdrant 조회 없이 "활동 없음" 결과를 반환합니다.
+# - 건수를 알 수 없는 소스(None)는 활동이 있는 것으로 보고 평소대로 분석합니다.
+
+SOURCE_GIT = "git"
+SOURCE_EMAIL = "email"
+SOURCE_TEAMS = "teams"
+SOURCE_DOCS = "docs"
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Any] = {
+    "users": 0,
+    "inactive_users": 0,
+    "skipped_sources": {SOURCE_GIT: 0, SOURCE_EMAIL: 0, SOURCE_TEAMS: 0, SOURCE_DOCS: 0},
+    "avoided_llm_calls": 0,
+}
+
+def take_activity_census(qdrant_client: QdrantClient, user_id: int, target_date: Optional[str]) -> Optional[Dict[str, Optional[int]]]:
+    """소스별 활동 건수를 반환합니다. ACTIVITY_CENSUS_ENABLED=false이면 None (모든 소스를 분석)."""
+    if not config.ACTIVITY_CENSUS_ENABLED:
+        return None
+    counts = count_user_activities(qdrant_client, user_id, target_date)
+    _record_census(counts)
+    return counts
+
+def is_source_inactive(state: Mapping[str, Any], source: str) -> bool:
+    """사전 점검 결과 해당 소스의 활동이 0건으로 확인된 경우에만 True"""
+    counts = state.get("activity_counts")
+    return bool(counts) and counts.get(source) == 0
+
+def has_no_activity(counts: Optional[Dict[str, Optional[int]]]) -> bool:
+    """모든 소스가 0건으로 확인된 경우에만 True"""
+    return bool(counts) and all(count == 0 for count in counts.values())
+
+def _record_census(counts: Dict[str, Optional[int]]):
+    with _stats_lock:
+        _stats["users"] += 1
+        for source, count in counts.items():
+            if count == 0:
+                _stats["skipped_sources"][source] = _stats["skipped_sources"].get(source, 0) + 1
+        if has_no_activity(counts):
+            _stats["inactive_users"] += 1
+
+def record_avoided_llm_calls(count: int = 1):
+    """사전 점검으로 생략된 LLM 호출 수를 기록합니다."""
+    with _stats_lock:
+        _stats["avoided_llm_calls"] += count
+
+def get_activity_census_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        return {**_stats, "skipped_sources": dict(_stats["skipped_sources"])}
@@ -1,13 +1,184 @@
+import json
+import threading
+import time
 from datetime import datetime, timezone
-from typing import List, Dict, Optional, Any, Union, Set, Tuple
+from typing import List, Dict, Optional, Any, Union, Set, Tuple, Iterator, Callable
 
 from qdrant_client import QdrantClient
-from qdrant_client.models import Filter, FieldCondition, MatchValue, DatetimeRange
-from ai.utils.embed_query import embed_query 
+from qdrant_client.models import (
+    Filter, FieldCondition, MatchValue, MatchAny, DatetimeRange, SearchRequest, SearchParams,
+    PayloadSelectorInclude, PayloadSelectorExclude
+)
+from ai.utils.embed_query import embed_query, embed_texts
+from ai.utils.qdrant_client_factory import get_qdrant_client
 from core import config 
 
-# scroll API 사용 시 한 번에 가져올 기본 최대 문서 수
-DEFAULT_SCROLL_LIMIT = 50
+# scroll API 사용 시 한 페이지(요청 1회)에 가져올 기본 포인트 수
+DEFAULT_SCROLL_LIMIT = config.QDRANT_SCROLL_PAGE_SIZE
+# 한 번의 조회에서 가져올 최대 포인트 수 (None = 제한 없이 끝까지 페이지네이션)
+DEFAULT_SCROLL_MAX_POINTS = config.QDRANT_SCROLL_MAX_POINTS or None
+
+PayloadSelector = Union[bool, List[str], PayloadSelectorInclude, PayloadSelectorExclude]
+
+# --- Payload projection ---
+# 각 retriever 결과를 소비하는 에이전트가 실제로 읽는 필드만 전송받도록 기본 projection을 선언합니다.
+# DocsAnalyzer / DocsQualityAnalyzer는 filename, title, author, type 등 메타데이터만 사용하므로 본문만 제외합니다.
+DOCUMENTS_PAYLOAD_EXCLUDE = ["page_content"]
+# EmailAnalyzerAgent._prepare_email_data_for_llm
+EMAILS_PAYLOAD_FIELDS = ["page_content", "subject", "title", "sender", "receivers", "recipients", "date"]
+# GitAnalyzerAgent._prepare_git_data_for_llm / _calculate_git_stats
+GIT_PAYLOAD_FIELDS = ["page_content", "message", "repo_name", "user_id", "date", "type", "title"]
+# TeamsAnalyzer._prepare_teams_data_for_llm
+TEAMS_PAYLOAD_FIELDS = ["page_content", "author", "date", "type"]
+
+_payload_bytes_by_collection: Dict[str, Dict[str, int]] = {}
+_payload_stats_lock = threading.Lock()
+
+def _build_payload_selector(
+    payload_fields: Optional[List[str]],
+    default_include: Optional[List[str]] = None,
+    default_exclude: Optional[List[str]] = None
+) -> PayloadSelector:
+    """호출 시 지정한 필드 목록이 있으면 우선 사용하고, 없으면 retriever별 기본 projection을 사용합니다."""
+    if payload_fields:
+        return PayloadSelectorInclude(include=list(payload_fields))
+    if default_include:
+        return PayloadSelectorInclude(include=list(default_include))
+    if default_exclude:
+        return PayloadSelectorExclude(exclude=list(default_exclude))
+    return True
+
+def _approx_payload_bytes(points: List[Any]) -> int:
+    """수신한 payload의 대략적인 크기(JSON 직렬화 기준 바이트 수)를 계산합니다."""
+    total = 0
+    for point in points:
+        if point.payload:
+            total += len(json.dumps(point.payload, ensure_ascii=False, default=str).encode("utf-8"))
+    return total
+
+def _record_payload_bytes(collection_name: str, points_count: int, payload_bytes: int):
+    with _payload_stats_lock:
+        stats = _payload_bytes_by_collection.setdefault(collection_name, {"calls": 0, "points": 0, "bytes": 0})
+        stats["calls"] += 1
+        stats["points"] += points_count
+        stats["bytes"] += payload_bytes
+
+def get_payload_transfer_stats() -> Dict[str, Dict[str, int]]:
+    """컬렉션별 scroll 호출 수, 수신 포인트 수, 수신 payload 바이트 누적치를 반환합니다."""
+    with _payload_stats_lock:
+        return {name: dict(stats) for name, stats in _payload_bytes_by_collection.items()}
+
+class ReadmeCache:
+    """저장소 이름을 키로 하는 README 내용의 스레드 안전 TTL 캐시 (README는 하루 단위로 거의 바뀌지 않음)"""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = max(0, ttl_seconds)
+        self._entries: Dict[str, Tuple[float, Optional[str]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, repo_names: List[str]) -> Tuple[Dict[str, Optional[str]], List[str]]:
+        """캐시에 있는 README와 다시 조회해야 하는 저장소 목록을 함께 반환합니다."""
+        found: Dict[str, Optional[str]] = {}
+        missing: List[str] = []
+        now = time.monotonic()
+        with self._lock:
+            for repo_name in repo_names:
+                entry = self._entries.get(repo_name)
+                if entry is not None and now - entry[0] < self.ttl_seconds:
+                    found[repo_name] = entry[1]
+                    self.hits += 1
+                else:
+                    missing.append(repo_name)
+                    self.misses += 1
+        return found, missing
+
+    def put(self, repo_name: str, content: Optional[str]):
+        if not self.ttl_seconds:
+            return
+        with self._lock:
+            self._entries[repo_name] = (time.monotonic(), content)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+_readme_cache = ReadmeCache(config.README_CACHE_TTL_SECONDS)
+
+def scroll_pages(
+    qdrant_client: QdrantClient,
+    collection_name: str,
+    scroll_filter: Filter,
+    page_size: int = DEFAULT_SCROLL_LIMIT,
+    max_points: Optional[int] = DEFAULT_SCROLL_MAX_POINTS,
+    with_payload: PayloadSelector = True
+) -> Iterator[List[Any]]:
+    """
+    scroll API를 next_offset이 None이 될 때까지 반복 호출하며 포인트를 페이지 단위로 yield 합니다.
+    전체 결과를 한 번에 메모리에 올리지 않고, 호출 측에서 페이지마다 가공할 수 있습니다.
+    
+    Args:
+        page_size: 요청 1회당 가져올 포인트 수
+        max_points: 가져올 최대 포인트 수 (None이면 제한 없음)
+        with_payload: payload projection (True, 필드 목록, PayloadSelectorInclude/Exclude)
+    """
+    next_offset = None
+    fetched = 0
+
+    while True:
+        limit = page_size if not max_points else min(page_size, max_points - fetched)
+        if limit <= 0:
+            print(f"VectorDBRetriever: 경고 - '{collection_name}' 조회가 최대 {max_points}건에서 중단되었습니다. 남은 포인트가 더 있습니다.")
+            return
+
+        points, next_offset = qdrant_client.scroll(
+            collection_name=collection_name,
+            scroll_filter=scroll_filter,
+            limit=limit,
+            offset=next_offset,
+            with_payload=with_payload,
+            with_vectors=False  # 벡터는 제외하여 성능 향상
+        )
+        if points:
+            fetched += len(points)
+            yield points
+
+        if next_offset is None:
+            return
+
+def _scroll_and_format(
+    qdrant_client: QdrantClient,
+    collection_name: str,
+    scroll_filter: Filter,
+    formatter: Callable[[List[Any]], List[Dict]],
+    page_size: int,
+    max_points: Optional[int],
+    with_payload: PayloadSelector = True
+) -> List[Dict]:
+    """페이지 단위로 scroll 하면서 각 페이지를 즉시 포맷팅하여 누적하고, 수신 payload 크기를 기록합니다."""
+    formatted: List[Dict] = []
+    points_count = 0
+    payload_bytes = 0
+    for page in scroll_pages(qdrant_client, collection_name, scroll_filter, page_size, max_points, with_payload):
+        points_count += len(page)
+        payload_bytes += _approx_payload_bytes(page)
+        formatted.extend(formatter(page))
+
+    _record_payload_bytes(collection_name, points_count, payload_bytes)
+    print(f"VectorDBRetriever: '{collection_name}' payload 수신 {points_count}건, 약 {payload_bytes / 1024:.1f}KB")
+    return formatted
 
 def _format_qdrant_points(points: List[Any], field_name: str = "page_content") -> List[Dict]:
     """구조 변환: Qdrant PointStruct 리스트를 Dict 리스트로 변환"""
@@ -69,17 +240,21 @@ def retrieve_documents(
     qdrant_client: QdrantClient,
     user_id: int,
     target_date_str: Optional[str] = None,
-    scroll_limit: int = DEFAULT_SCROLL_LIMIT
+    scroll_limit: int = DEFAULT_SCROLL_LIMIT,
+    max_points: Optional[int] = DEFAULT_SCROLL_MAX_POINTS,
+    payload_fields: Optional[List[str]] = None
 ) -> List[Dict]:
     """
-    'Documents' 컬렉션에서 특정 사용자의 문서를 검색합니다. (scroll API 사용)
+    'Documents' 컬렉션에서 특정 사용자의 문서를 검색합니다. (scroll API 페이지네이션)
     필터: author 필드를 user_id로 필터링. 날짜 필터링.
     
     Args:
         qdrant_client: Qdrant 클라이언트
         user_id: 사용자 ID
         target_date_str: 대상 날짜 (YYYY-MM-DD 형식)
-        scroll_limit: 스크롤 제한 수
+        scroll_limit: 스크롤 페이지 크기
+        max_points: 최대 조회 건수 (None이면 전체)
+        payload_fields: 가져올 payload 필드 목록 (None이면 retriever 기본 projection 사용)
         
     Returns:
         문서 리스트
@@ -98,15 +273,11 @@ def retrieve_documents(
     qdrant_final_filter = Filter(must=must_conditions)
 
     try:
-        points, _next_offset = qdrant_client.scroll(
-            collection_name=config.COLLECTION_DOCUMENTS,
-            scroll_filter=qdrant_final_filter,
-            limit=scroll_limit,
-            with_payload=True,
-            with_vectors=False  # 벡터는 제외하여 성능 향상
+        formatted_docs = _scroll_and_format(
+            qdrant_client, config.COLLECTION_DOCUMENTS, qdrant_final_filter,
+            _format_qdrant_points_for_documents, scroll_limit, max_points,
+            _build_payload_selector(payload_fields, default_exclude=DOCUMENTS_PAYLOAD_EXCLUDE)
         )
-        
-        formatted_docs = _format_qdrant_points_for_documents(points)
         print(f"VectorDBRetriever: '{config.COLLECTION_DOCUMENTS}'에서 {len(formatted_docs)}개 문서 발견 (author: {user_id})")
         return formatted_docs
         
@@ -120,17 +291,21 @@ def retrieve_emails(
     qdrant_client: QdrantClient,
     user_id: int, 
     target_date_str: Optional[str] = None,
-    scroll_limit: int = DEFAULT_SCROLL_LIMIT
+    scroll_limit: int = DEFAULT_SCROLL_LIMIT,
+    max_points: Optional[int] = DEFAULT_SCROLL_MAX_POINTS,
+    payload_fields: Optional[List[str]] = None
 ) -> List[Dict]:
     """
-    'Emails' 컬렉션에서 특정 사용자의 이메일을 검색합니다. (scroll API 사용)
+    'Emails' 컬렉션에서 특정 사용자의 이메일을 검색합니다. (scroll API 페이지네이션)
     필터: author 필드가 user_id와 일치. metadata.date로 날짜 필터링.
     
     Args:
         qdrant_client: Qdrant 클라이언트
         user_id: 사용자 ID
         target_date_str: 대상 날짜 (YYYY-MM-DD 형식)
-        scroll_limit: 스크롤 제한 수
+        scroll_limit: 스크롤 페이지 크기
+        max_points: 최대 조회 건수 (None이면 전체)
+        payload_fields: 가져올 payload 필드 목록 (None이면 retriever 기본 projection 사용)
         
     Returns:
         이메일 리스트
@@ -149,15 +324,11 @@ def retrieve_emails(
     qdrant_final_filter = Filter(must=must_conditions)
 
     try:
-        points, _next_offset = qdrant_client.scroll(
-            collection_name=config.COLLECTION_EMAILS,
-            scroll_filter=qdrant_final_filter,
-            limit=scroll_limit,
-            with_payload=True,
-            with_vectors=False
+        formatted_docs = _scroll_and_format(
+            qdrant_client, config.COLLECTION_EMAILS, qdrant_final_filter,
+            _format_qdrant_points, scroll_limit, max_points,
+            _build_payload_selector(payload_fields, default_include=EMAILS_PAYLOAD_FIELDS)
         )
-        
-        formatted_docs = _format_qdrant_points(points)
         print(f"VectorDBRetriever: '{config.COLLECTION_EMAILS}'에서 {len(formatted_docs)}개 이메일 발견")
         return formatted_docs
         
@@ -171,18 +342,22 @@ def retrieve_git_activities(
     git_author_identifier: int,
     target_date_str: Optional[str],
     scroll_limit: int = DEFAULT_SCROLL_LIMIT,
-    include_readmes: bool = True
+    include_readmes: bool = True,
+    max_points: Optional[int] = DEFAULT_SCROLL_MAX_POINTS,
+    payload_fields: Optional[List[str]] = None
 ) -> Union[List[Dict], Tuple[List[Dict], str]]:
     """
-    Git 활동 로그 전체를 scroll로 한 번에 조회합니다.
+    Git 활동 로그 전체를 scroll 페이지네이션으로 조회합니다.
     include_readmes=True시 해당 사용자가 참여한 저장소들의 README 정보도 함께 반환합니다.
     
     Args:
         qdrant_client: Qdrant 클라이언트
         git_author_identifier: Git 저자 식별자
         target_date_str: 대상 날짜 (YYYY-MM-DD 형식)
-        scroll_limit: 스크롤 제한 수
+        scroll_limit: 스크롤 페이지 크기
         include_readmes: README 포함 여부
+        max_points: 최대 조회 건수 (None이면 전체)
+        payload_fields: 가져올 payload 필드 목록 (None이면 retriever 기본 projection 사용)
         
     Returns:
         Git 활동 리스트 또는 (Git 활동 리스트, README 정보) 튜플
@@ -204,15 +379,11 @@ def retrieve_git_activities(
     qdrant_filter = Filter(must=must_conditions)
 
     try:
-        points, _ = qdrant_client.scroll(
-            collection_name=config.COLLECTION_GIT_ACTIVITIES,
-            scroll_filter=qdrant_filter,
-            limit=scroll_limit,
-            with_payload=True,
-            with_vectors=False
+        formatted_event_docs = _scroll_and_format(
+            qdrant_client, config.COLLECTION_GIT_ACTIVITIES, qdrant_filter,
+            _format_qdrant_points, scroll_limit, max_points,
+            _build_payload_selector(payload_fields, default_include=GIT_PAYLOAD_FIELDS)
         )
-        
-        formatted_event_docs = _format_qdrant_points(points)
         print(f"VectorDBRetriever: Git 활동 {len(formatted_event_docs)}개 조회 완료")
         
         # README 조회가 필요한 경우
@@ -236,43 +407,57 @@ def retrieve_git_activities(
         print(f"VectorDBRetriever: Git 활동 조회 중 오류: {e}")
         return [] if not include_readmes else ([], "README 조회 실패")
 
+def _fetch_readmes_batch(qdrant_client: QdrantClient, repo_names: List[str]) -> Dict[str, str]:
+    """MatchAny 필터 하나로 여러 저장소의 README를 한 번에 조회합니다. (저장소당 첫 번째 포인트 사용)"""
+    readme_filter = Filter(must=[
+        FieldCondition(key="repo_name", match=MatchAny(any=repo_names))
+    ])
+    readmes: Dict[str, str] = {}
+    for page in scroll_pages(
+        qdrant_client, config.COLLECTION_GIT_README, readme_filter,
+        page_size=max(len(repo_names), 1), max_points=None,
+        with_payload=PayloadSelectorInclude(include=["repo_name", "page_content"])
+    ):
+        for point in page:
+            payload = point.payload or {}
+            repo_name = payload.get("repo_name")
+            if repo_name and repo_name not in readmes:
+                readmes[repo_name] = payload.get("page_content", "")
+    return readmes
+
 def _get_readmes_by_repo_names(qdrant_client: QdrantClient, repo_names: Set[str]) -> str:
-    """참여한 저장소들의 README 조회"""
+    """참여한 저장소들의 README 조회 (프로세스 TTL 캐시 + 캐시에 없는 저장소만 일괄 조회)"""
     if not repo_names:
         return "README 정보 없음"
 
-    try:
-        readme_contents = []
-        for repo_name in repo_names:
-            try:
-                points, _ = qdrant_client.scroll(
-                    collection_name=config.COLLECTION_GIT_README,
-                    scroll_filter=Filter(must=[
-                        FieldCondition(
-                            key="repo_name",
-                            match=MatchValue(value=repo_name)
-                        )
-                    ]),
-                    limit=1,
-                    with_payload=True,
-                    with_vectors=False
-                )
-                
-                if points:
-                    content = points[0].payload.get("page_content", "")
-                    readme_contents.append(f"=== {repo_name} README ===\n{content}\n")
-                    print(f"VectorDBRetriever: {repo_name} README 조회 완료")
-                else:
-                    print(f"VectorDBRetriever: {repo_name} README 없음")
-                    
-            except Exception as e:
-                print(f"VectorDBRetriever: README 조회 오류 ({repo_name}): {e}")
-        
-        return "\n".join(readme_contents) if readme_contents else "README 정보 없음"
-        
-    except Exception as e:
-        print(f"VectorDBRetriever: README 조회 중 오류: {e}")
-        return "README 정보 없음"
+    sorted_repo_names = sorted(repo_names)
+    readmes, missing = _readme_cache.get_many(sorted_repo_names)
+
+    if missing:
+        try:
+            fetched = _fetch_readmes_batch(qdrant_client, missing)
+            for repo_name in missing:
+                # README가 없는 저장소도 None으로 캐시하여 같은 배치에서 반복 조회하지 않습니다.
+                content = fetched.get(repo_name)
+                _readme_cache.put(repo_name, content)
+                readmes[repo_name] = content
+            print(f"VectorDBRetriever: README {len(missing)}개 저장소 일괄 조회 완료 ({len(fetched)}개 발견)")
+        except Exception as e:
+            print(f"VectorDBRetriever: README 일괄 조회 중 오류: {e}")
+
+    readme_contents = []
+    for repo_name in sorted_repo_names:
+        content = readmes.get(repo_name)
+        if content is None:
+            print(f"VectorDBRetriever: {repo_name} README 없음")
+            continue
+        readme_contents.append(f"=== {repo_name} README ===\n{content}\n")
+
+    return "\n".join(readme_contents) if readme_contents else "README 정보 없음"
+
+def get_readme_cache_stats() -> Dict[str, Any]:
+    """README TTL 캐시의 크기와 hit/miss 통계를 반환합니다."""
+    return _readme_cache.stats()
 
 
 # --- Teams Posts ---
@@ -280,17 +465,21 @@ def retrieve_teams_posts(
     qdrant_client: QdrantClient,
     user_id: int, 
     target_date_str: Optional[str] = None,
-    scroll_limit: int = DEFAULT_SCROLL_LIMIT
+    scroll_limit: int = DEFAULT_SCROLL_LIMIT,
+    max_points: Optional[int] = DEFAULT_SCROLL_MAX_POINTS,
+    payload_fields: Optional[List[str]] = None
 ) -> List[Dict]:
     """
-    'Teams-Posts' 컬렉션에서 특정 사용자의 Teams 메시지/게시물을 검색합니다. (scroll API 사용)
+    'Teams-Posts' 컬렉션에서 특정 사용자의 Teams 메시지/게시물을 검색합니다. (scroll API 페이지네이션)
     필터: metadata.user_id 필드를 State의 user_id로 필터링. metadata.date로 날짜 필터링.
     
     Args:
         qdrant_client: Qdrant 클라이언트
         user_id: 사용자 ID
         target_date_str: 대상 날짜 (YYYY-MM-DD 형식)
-        scroll_limit: 스크롤 제한 수
+        scroll_limit: 스크롤 페이지 크기
+        max_points: 최대 조회 건수 (None이면 전체)
+        payload_fields: 가져올 payload 필드 목록 (None이면 retriever 기본 projection 사용)
         
     Returns:
         Teams 게시물 리스트
@@ -309,15 +498,11 @@ def retrieve_teams_posts(
     qdrant_filter = Filter(must=must_conditions)
 
     try:
-        points, _next_offset = qdrant_client.scroll(
-            collection_name=config.COLLECTION_TEAMS_POSTS,
-            scroll_filter=qdrant_filter,
-            limit=scroll_limit,
-            with_payload=True,
-            with_vectors=False
+        formatted_docs = _scroll_and_format(
+            qdrant_client, config.COLLECTION_TEAMS_POSTS, qdrant_filter,
+            _format_qdrant_points, scroll_limit, max_points,
+            _build_payload_selector(payload_fields, default_include=TEAMS_PAYLOAD_FIELDS)
         )
-        
-        formatted_docs = _format_qdrant_points(points)
         print(f"VectorDBRetriever: '{config.COLLECTION_TEAMS_POSTS}'에서 {len(formatted_docs)}개 Teams 게시물 발견")
         return formatted_docs
         
@@ -326,6 +511,122 @@ def retrieve_teams_posts(
         return []
 
 
+# --- Activity census ---
+# (소스 이름, 컬렉션, 날짜 필드) - 각 retriever와 같은 author/날짜 필터로 건수만 셉니다.
+ACTIVITY_SOURCES = [
+    ("git", config.COLLECTION_GIT_ACTIVITIES, "date"),
+    ("email", config.COLLECTION_EMAILS, "date"),
+    ("teams", config.COLLECTION_TEAMS_POSTS, "date"),
+    ("docs", config.COLLECTION_DOCUMENTS, "last_modified"),
+]
+
+def count_user_activities(
+    qdrant_client: QdrantClient,
+    user_id: int,
+    target_date_str: Optional[str]
+) -> Dict[str, Optional[int]]:
+    """
+    소스별(git/email/teams/docs) 사용자의 대상일 포인트 수를 payload 전송 없이 count API로 셉니다.
+    조회에 실패한 소스는 None (건수를 알 수 없으므로 호출 측에서 분석을 생략하지 않아야 함).
+    """
+    counts: Dict[str, Optional[int]] = {}
+    for source, collection_name, date_field in ACTIVITY_SOURCES:
+        must_conditions = [FieldCondition(key="author", match=MatchValue(value=user_id))]
+        date_filter_condition = _create_date_filter(target_date_str, date_field)
+        if date_filter_condition:
+            must_conditions.append(date_filter_condition)
+        try:
+            counts[source] = qdrant_client.count(
+                collection_name=collection_name,
+                count_filter=Filter(must=must_conditions),
+                exact=True
+            ).count
+        except Exception as e:
+            print(f"VectorDBRetriever: '{collection_name}' 건수 조회 중 오류: {e}")
+            counts[source] = None
+    print(f"VectorDBRetriever: 사용자 {user_id} 활동 건수 ({target_date_str}): {counts}")
+    return counts
+
+def _build_filename_filter(filenames: List[str]) -> Filter:
+    """파일명 목록으로 OR 조건(should) 필터 생성"""
+    return Filter(should=[
+        FieldCondition(key="filename", match=MatchValue(value=filename))
+        for filename in filenames
+    ])
+
+def _format_content_hit(hit: Any, query: str) -> Dict:
+    return {
+        "id": str(hit.id),
+        "filename": hit.payload.get("filename"),
+        "chunk_id": hit.payload.get("chunk_id"),
+        "page_content": hit.payload.get("page_content"),
+        "score": hit.score,
+        "query": query  # 어떤 쿼리로 검색되었는지 추가
+    }
+
+def _search_documents_batch(
+    qdrant_client: QdrantClient,
+    search_specs: List[Tuple[Filter, str]],
+    top_k: int
+) -> List[List[Any]]:
+    """
+    (필터, 쿼리) 목록을 한 번의 encode 호출과 한 번의 search_batch 호출로 검색합니다.
+    반환값은 search_specs 순서와 동일한 검색 결과 리스트입니다.
+    """
+    vectors = embed_texts([query for _, query in search_specs])
+    search_requests = [
+        SearchRequest(
+            vector=vector,
+            filter=query_filter,
+            limit=top_k,
+            with_payload=True,
+            params=SearchParams(hnsw_ef=128)
+        )
+        for (query_filter, _), vector in zip(search_specs, vectors)
+    ]
+    return qdrant_client.search_batch(
+        collection_name=config.COLLECTION_DOCUMENTS,
+        requests=search_requests
+    )
+
+def _search_documents_sequential(
+    qdrant_client: QdrantClient,
+    search_specs: List[Tuple[Filter, str]],
+    top_k: int
+) -> List[List[Any]]:
+    """쿼리마다 임베딩과 search를 개별 호출하는 기존 방식 (배치 검색 실패 시 대체 경로 및 벤치마크 비교용)"""
+    all_results = []
+    for query_filter, query in search_specs:
+        print(f"VectorDBRetriever: '{query}' 쿼리로 검색 중...")
+        try:
+            results = qdrant_client.search(
+                collection_name=config.COLLECTION_DOCUMENTS,
+                query_vector=embed_query(query),
+                limit=top_k,
+                with_payload=True,
+                query_filter=query_filter,
+                search_params={"hnsw_ef": 128}
+            )
+        except Exception as e:
+            print(f"VectorDBRetriever: '{query}' 검색 중 오류: {e}")
+            results = []
+        all_results.append(results)
+    return all_results
+
+def _search_documents(
+    qdrant_client: QdrantClient,
+    search_specs: List[Tuple[Filter, str]],
+    top_k: int
+) -> List[List[Any]]:
+    """배치 검색을 우선 시도하고, 실패하면 쿼리별 순차 검색으로 대체합니다."""
+    if not search_specs:
+        return []
+    try:
+        return _search_documents_batch(qdrant_client, search_specs, top_k)
+    except Exception as e:
+        print(f"VectorDBRetriever: 배치 검색 실패, 쿼리별 검색으로 대체합니다: {e}")
+        return _search_documents_sequential(qdrant_client, search_specs, top_k)
+
 def retrieve_documents_content(
     qdrant_client: QdrantClient,
     document_list: List[Dict],   # file_id, filename 등 포함된 문서 리스트
@@ -335,6 +636,7 @@ def retrieve_documents_content(
     """
     문서 리스트와 평가 항목(queries)을 기반으로,
     해당 문서에 속한 page_content에서 의미 있는 chunk들을 hybrid 방식으로 추출
+    모든 쿼리는 한 번의 임베딩 호출과 한 번의 Qdrant 배치 검색으로 처리합니다.
     
     Args:
         qdrant_client: Qdrant 클라이언트
@@ -352,51 +654,98 @@ def retrieve_documents_content(
         print("VectorDBRetriever: 검색할 파일명이 없습니다.")
         return []
 
-    # 파일 필터: 문서 리스트에 포함된 파일명으로 필터링
-    file_conditions = []
-    for filename in target_file_names:
-        file_conditions.append(
-            FieldCondition(key="filename", match=MatchValue(value=filename))
-        )
-    
-    # OR 조건으로 파일 필터 생성
-    file_filter = Filter(should=file_conditions)  # should = OR 조건
+    # 파일 필터: 문서 리스트에 포함된 파일명으로 필터링 (should = OR 조건)
+    file_filter = _build_filename_filter(target_file_names)
+
+    print(f"VectorDBRetriever: {len(document_list)}개의 문서에서 {len(queries)}개의 쿼리로 검색 시작...")
+
+    search_specs = [(file_filter, query) for query in queries]
+    batch_results = _search_documents(qdrant_client, search_specs, top_k)
 
     retrieved_docs_content = []
     seen_ids = set()
-    
-    print(f"VectorDBRetriever: {len(document_list)}개의 문서에서 {len(queries)}개의 쿼리로 검색 시작...")
-    
-    for query in queries:
-        print(f"VectorDBRetriever: '{query}' 쿼리로 검색 중...")
-        try:
-            vector = embed_query(query)  # 의미 벡터 임베딩 함수
-            
-            # Qdrant 검색
-            results = qdrant_client.search(
-                collection_name=config.COLLECTION_DOCUMENTS,
-                query_vector=vector,
-                limit=top_k,
-                with_payload=True,
-                query_filter=file_filter,  # 파일 필터 적용
-                search_params={"hnsw_ef": 128}
-            )
-            
-            for r in results:
-                if r.id not in seen_ids:
-                    retrieved_docs_content.append({
-                        "id": str(r.id),
-                        "filename": r.payload.get("filename"),
-                        "chunk_id": r.payload.get("chunk_id"),
-                        "page_content": r.payload.get("page_content"),
-                        "score": r.score,
-                        "query": query  # 어떤 쿼리로 검색되었는지 추가
-                    })
-                    seen_ids.add(r.id)
-                    
-        except Exception as e:
-            print(f"VectorDBRetriever: '{query}' 검색 중 오류: {e}")
-            continue
+    for (_, query), results in zip(search_specs, batch_results):
+        for r in results:
+            if r.id not in seen_ids:
+                retrieved_docs_content.append(_format_content_hit(r, query))
+                seen_ids.add(r.id)
 
     print(f"VectorDBRetriever: 총 {len(retrieved_docs_content)}개 청크 추출 완료")
-    return retrieved_docs_content
\ No newline at end of file
+    return retrieved_docs_content
+
+def retrieve_documents_content_by_file(
+    qdrant_client: QdrantClient,
+    file_queries: Dict[str, List[str]],   # 파일명 -> 해당 파일에 적용할 쿼리 리스트
+    top_k: int
+) -> Dict[str, List[Dict]]:
+    """
+    여러 파일에 대한 파일별 쿼리를 한 번의 임베딩 호출과 한 번의 Qdrant 배치 검색으로 처리합니다.
+    중복 제거는 파일 단위로 수행하여 파일마다 retrieve_documents_content를 호출한 것과 동일한 결과를 반환합니다.
+    
+    Returns:
+        파일명 -> 검색된 문서 청크 리스트
+    """
+    search_specs: List[Tuple[Filter, str]] = []
+    spec_filenames: List[str] = []
+    for filename, queries in file_queries.items():
+        file_filter = _build_filename_filter([filename])
+        for query in queries:
+            search_specs.append((file_filter, query))
+            spec_filenames.append(filename)
+
+    print(f"VectorDBRetriever: {len(file_queries)}개 파일, 총 {len(search_specs)}개 쿼리 배치 검색 시작...")
+    batch_results = _search_documents(qdrant_client, search_specs, top_k)
+
+    results_by_file: Dict[str, List[Dict]] = {filename: [] for filename in file_queries}
+    seen_ids_by_file: Dict[str, Set] = {filename: set() for filename in file_queries}
+    for filename, (_, query), results in zip(spec_filenames, search_specs, batch_results):
+        seen_ids = seen_ids_by_file[filename]
+        for r in results:
+            if r.id not in seen_ids:
+                results_by_file[filename].append(_format_content_hit(r, query))
+                seen_ids.add(r.id)
+
+    return results_by_file
+
+def benchmark_documents_content_search(
+    qdrant_client: QdrantClient,
+    file_queries: Dict[str, List[str]],
+    top_k: int = 3,
+    repeat: int = 3
+) -> Dict[str, Any]:
+    """파일별 쿼리 검색을 기존 순차 방식과 배치 방식으로 각각 실행하여 왕복 횟수와 소요 시간을 비교합니다."""
+    search_specs = [
+        (_build_filename_filter([filename]), query)
+        for filename, queries in file_queries.items()
+        for query in queries
+    ]
+    embed_texts([query for _, query in search_specs])  # 모델 로드 및 임베딩 캐시 워밍업
+
+    timings = {}
+    for name, search_fn in [("sequential", _search_documents_sequential), ("batch", _search_documents_batch)]:
+        started_at = time.perf_counter()
+        for _ in range(repeat):
+            search_fn(qdrant_client, search_specs, top_k)
+        timings[name] = (time.perf_counter() - started_at) / repeat
+
+    report = {
+        "queries": len(search_specs),
+        "sequential_round_trips": len(search_specs),
+        "batch_round_trips": 1 if search_specs else 0,
+        "sequential_ms": round(timings["sequential"] * 1000, 1),
+        "batch_ms": round(timings["batch"] * 1000, 1),
+    }
+    print(f"VectorDBRetriever: 문서 내용 검색 벤치마크 결과: {report}")
+    return report
+
+
+if __name__ == "__main__":
+    # 사용법: python -m ai.tools.vector_db_retriever <파일명1> [<파일명2> ...]
+    import sys
+
+    sample_files = sys.argv[1:] or ["sample.docx"]
+    sample_queries = ["문서 완성도", "요구사항 정의", "일정 및 산출물"]
+    benchmark_documents_content_search(
+        get_qdrant_client(),
+        {filename: sample_queries for filename in sample_files}
+    )
@@ -1,79 +1,216 @@
 import json
-from typing import List, Dict, Optional
+import threading
+from typing import List, Dict, Optional, Tuple, Any
 import sys
 
+from core import config
 from core.settings import Settings 
-from ai.utils.vector_db import VectorDBHandler
+from qdrant_client import QdrantClient
 from qdrant_client import models # Qdrant 필터 사용을 위해 추가
+from ai.tools.vector_db_retriever import scroll_pages
+from ai.utils.assignee import split_assignee_tokens
+from ai.utils.qdrant_client_factory import get_qdrant_client
 
-def get_project_task_items_tool(
-    project_id: int,
-    limit_results: Optional[int] = None # Qdrant의 limit은 scroll API에서 약간 다르게 동작할 수 있음
-) -> List[Dict]:
+class AssigneeIndex:
     """
-    지정된 프로젝트 ID에 해당하는 모든 작업 항목(task_item)을 VectorDB(Qdrant)에서 조회합니다.
+    프로젝트 로드 시 한 번 생성하는 담당자 → 작업 역색인.
+    기존 선형 필터(_filter_tasks_by_assignee_linear)가 찾는 작업은 모두 찾습니다.
+    (1) 문자열 담당자 필드에 대한 부분 문자열 일치 (2) 리스트 담당자 필드의 원소 정확 일치에 더해,
+    (3) 분리된 담당자 토큰(쉼표/슬래시/세미콜론/줄바꿈 구분, 앞뒤 공백 제거) 정확 일치를 지원합니다.
+    (3) 때문에 리스트 원소가 "홍길동, 김철수"나 " 홍길동"처럼 구분자나 공백을 포함하면 기존 필터보다 더 많은 작업을 찾습니다.
+    (1)은 작업 전체가 아니라 서로 다른 담당자 문자열 값만 검사하며, 이름별 결과는 메모이즈합니다.
     """
-    print(f"--- WBS 작업 항목 조회 도구 실행 (Qdrant, 전체 작업): 프로젝트 ID '{project_id}' ---")
+
+    def __init__(self, tasks: List[Dict]):
+        self._by_token: Dict[str, List[int]] = {}
+        self._by_string_value: Dict[str, List[int]] = {}
+        self._by_list_element: Dict[str, List[int]] = {}
+        self._lookups: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+        for position, task_data in enumerate(tasks):
+            assignee_field_value = task_data.get('assignee')
+            if assignee_field_value is None:
+                continue
+            if isinstance(assignee_field_value, str):
+                self._by_string_value.setdefault(assignee_field_value, []).append(position)
+            elif isinstance(assignee_field_value, list):
+                for element in assignee_field_value:
+                    if isinstance(element, str):
+                        self._by_list_element.setdefault(element, []).append(position)
+            else:
+                print(f"경고: 작업 ID '{task_data.get('task_id', 'N/A')}'의 담당자 필드가 문자열 또는 리스트가 아닙니다 (타입: {type(assignee_field_value)}, 값: {assignee_field_value}). 필터링에서 제외됩니다.")
+                continue
+            for token in split_assignee_tokens(assignee_field_value):
+                self._by_token.setdefault(token, []).append(position)
+
+    def lookup(self, assignee_name: str) -> List[int]:
+        """담당자 이름에 해당하는 작업 위치(원래 순서)를 반환합니다."""
+        with self._lock:
+            positions = self._lookups.get(assignee_name)
+            if positions is not None:
+                return positions
+
+        matched = set(self._by_token.get(assignee_name.strip(), []))
+        matched.update(self._by_list_element.get(assignee_name, []))
+        for string_value, string_positions in self._by_string_value.items():
+            if assignee_name in string_value:
+                matched.update(string_positions)
+        positions = sorted(matched)
+
+        with self._lock:
+            self._lookups[assignee_name] = positions
+        return positions
+
+    def stats(self) -> Dict[str, int]:
+        return {"tokens": len(self._by_token), "string_values": len(self._by_string_value), "list_elements": len(self._by_list_element)}
+
+
+class ProjectTaskEntry:
+    """캐시에 보관되는 프로젝트 단위 WBS 작업 목록과 담당자 색인"""
+
+    def __init__(self, wbs_hash: Optional[str], tasks: List[Dict]):
+        self.wbs_hash = wbs_hash
+        self.tasks = tasks
+        self.assignee_index = AssigneeIndex(tasks)
+
+    def tasks_for_assignee(self, assignee_name: str) -> List[Dict]:
+        return [self.tasks[position] for position in self.assignee_index.lookup(assignee_name)]
+
+
+# --- 프로젝트별 WBS 작업 캐시 ---
+# 같은 팀의 모든 멤버가 동일한 프로젝트 WBS를 조회하므로, (project_id, wbs_hash) 단위로 한 번만 로드하여 공유합니다.
+# 조회 시마다 저장된 wbs_hash만 가볍게 확인하고, 해시가 바뀌면(WBS 재적재) 다시 로드합니다.
+_project_task_cache: Dict[Any, ProjectTaskEntry] = {}
+_project_load_locks: Dict[Any, threading.Lock] = {}
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "loads": 0, "invalidations": 0}
+
+def _get_wbs_client() -> QdrantClient:
+    """WBS 조회에는 프로세스 공유 QdrantClient를 사용합니다. (조회마다 VectorDBHandler를 만들지 않음)"""
+    return get_qdrant_client()
+
+def _project_filter(project_id, *extra_conditions: models.FieldCondition) -> models.Filter:
+    return models.Filter(
+        must=[
+            models.FieldCondition(key="project_id", match=models.MatchValue(value=project_id)),
+            *extra_conditions,
+        ]
+    )
+
+def _get_stored_wbs_hash(client: QdrantClient, project_id) -> Optional[str]:
+    """프로젝트의 저장된 wbs_hash를 포인트 1건(wbs_hash 필드만)으로 조회합니다."""
+    points, _ = client.scroll(
+        collection_name=config.COLLECTION_WBS_DATA,
+        scroll_filter=_project_filter(project_id),
+        limit=1,
+        with_payload=models.PayloadSelectorInclude(include=["wbs_hash"]),
+        with_vectors=False
+    )
+    if points and points[0].payload:
+        return points[0].payload.get("wbs_hash")
+    return None
+
+def get_stored_wbs_hash(project_id) -> Optional[str]:
+    """프로젝트에 마지막으로 적재된 WBS 파일 해시를 반환합니다. 적재된 적이 없으면 None."""
+    return _get_stored_wbs_hash(_get_wbs_client(), project_id)
+
+def _load_project_tasks(
+    client: QdrantClient, project_id, page_size: int, scroll_filter: Optional[models.Filter] = None
+) -> Tuple[List[Dict], set]:
+    """프로젝트의 작업 항목을 페이지 단위로 조회하여 original_data를 디코딩합니다."""
     retrieved_tasks: List[Dict] = []
+    seen_hashes = set()
+    for page in scroll_pages(
+        client, config.COLLECTION_WBS_DATA, scroll_filter or _project_filter(project_id),
+        page_size=page_size, max_points=None,
+        with_payload=models.PayloadSelectorInclude(include=["original_data", "wbs_hash"])
+    ):
+        for record in page:
+            payload = record.payload # payload는 dict
+            if not payload:
+                continue
+            seen_hashes.add(payload.get("wbs_hash"))
+            if 'original_data' in payload:
+                try:
+                    retrieved_tasks.append(json.loads(payload['original_data']))
+                except json.JSONDecodeError:
+                    print(f"경고: 페이로드의 original_data 파싱 실패 - ID: {record.id}")
+            else: # original_data는 없지만 다른 필드가 있을 경우 (디버깅용)
+                print(f"정보: ID {record.id}의 페이로드에 'original_data' 필드가 없지만 다른 데이터는 존재: {payload}")
+    return retrieved_tasks, seen_hashes
 
-    try:
-        # VectorDBHandler 초기화 시 embedding_api_key 인자 제거
-        db_handler = VectorDBHandler(
-            project_id=project_id
-            # sentence_transformer_model_name은 VectorDBHandler의 기본값을 사용하거나,
-            # 필요시 app_settings 등에서 가져와 명시적으로 전달할 수 있습니다.
-        )
+def clear_wbs_task_cache(project_id=None):
+    """WBS 작업 캐시를 비웁니다. project_id를 지정하면 해당 프로젝트만 비웁니다. (WBS 재적재 직후 호출)"""
+    with _cache_lock:
+        if project_id is None:
+            _project_task_cache.clear()
+        else:
+            _project_task_cache.pop(project_id, None)
 
-        # Qdrant 필터 조건 생성
-        qdrant_filter = models.Filter(
-            must=[
-                models.FieldCondition(key="project_id", match=models.MatchValue(value=project_id)),
-            ]
-        )
-        # Qdrant에서 가져올 데이터 수 제한 설정
-        fetch_limit = limit_results if limit_results is not None and limit_results > 0 else 1000 # 예시: 최대 1000개로 제한, 또는 None으로 두어 Qdrant 기본값 사용
-                                                                                                    # 실제 모든 데이터를 가져오려면 반복 scroll 필요
-
-        print(f"컬렉션 '{db_handler.collection_name}'에서 작업 항목 조회 중 (최대 {fetch_limit}건)...")
-        
-        points, next_page_offset = db_handler.client.scroll(
-            collection_name=db_handler.collection_name,
-            scroll_filter=qdrant_filter,
-            limit=fetch_limit, # 한 번에 가져올 포인트 수
-            with_payload=True, # 페이로드(메타데이터) 포함
-            with_vectors=False # 벡터 데이터는 필요 없음
-        )
+def get_wbs_task_cache_stats() -> Dict[str, Any]:
+    """WBS 작업 캐시의 프로젝트 수와 hit/load/invalidation 횟수를 반환합니다."""
+    with _cache_lock:
+        return {"projects": len(_project_task_cache), **_cache_stats}
+
+def _get_project_entry(project_id, page_size: int, use_cache: bool) -> ProjectTaskEntry:
+    """캐시된 프로젝트 작업 목록을 반환하고, 저장된 해시가 바뀌었거나 없으면 새로 로드합니다."""
+    client = _get_wbs_client()
+    stored_hash = _get_stored_wbs_hash(client, project_id)
 
-        # 모든 데이터를 가져오고 싶다면, next_page_offset이 None이 될 때까지 반복.
-        all_points = list(points) # 초기 포인트 복사
-        while next_page_offset is not None:
-            more_points, next_page_offset = db_handler.client.scroll(
-                collection_name=db_handler.collection_name,
-                scroll_filter=qdrant_filter,
-                limit=fetch_limit,
-                offset=next_page_offset, # 이전 오프셋 사용
-                with_payload=True,
-                with_vectors=False
-            )
-            all_points.extend(more_points)
-        points = all_points # 모든 포인트를 points 변수에 할당
-
-        if points: # points는 List[models.Record]
-            for record in points:
-                payload = record.payload # payload는 dict
-                if payload and 'original_data' in payload:
-                    try:
-                        task_data = json.loads(payload['original_data'])
-                        retrieved_tasks.append(task_data)
-                    except json.JSONDecodeError:
-                        print(f"경고: 페이로드의 original_data 파싱 실패 - ID: {record.id}")
-                elif payload: # original_data는 없지만 다른 필드가 있을 경우 (디버깅용)
-                    print(f"정보: ID {record.id}의 페이로드에 'original_data' 필드가 없지만 다른 데이터는 존재: {payload}")
+    if use_cache:
+        with _cache_lock:
+            cached = _project_task_cache.get(project_id)
+            if cached is not None and cached.wbs_hash == stored_hash:
+                _cache_stats["hits"] += 1
+                print(f"WBS 작업 캐시 사용: 프로젝트 '{project_id}' ({len(cached.tasks)}건, 해시 {str(stored_hash)[:10]})")
+                return cached
+            if cached is not None:
+                _cache_stats["invalidations"] += 1
+                _project_task_cache.pop(project_id, None)
+            load_lock = _project_load_locks.setdefault(project_id, threading.Lock())
+    else:
+        load_lock = threading.Lock()
 
+    # 같은 프로젝트를 여러 워커가 동시에 요청하면 한 워커만 로드하고 나머지는 결과를 재사용합니다.
+    with load_lock:
+        if use_cache:
+            with _cache_lock:
+                cached = _project_task_cache.get(project_id)
+                if cached is not None and cached.wbs_hash == stored_hash:
+                    _cache_stats["hits"] += 1
+                    return cached
+
+        print(f"컬렉션 '{config.COLLECTION_WBS_DATA}'에서 작업 항목 조회 중 (페이지 크기 {page_size}건)...")
+        retrieved_tasks, seen_hashes = _load_project_tasks(client, project_id, page_size)
+
+        if retrieved_tasks:
             print(f"VectorDB(Qdrant)에서 총 {len(retrieved_tasks)}개의 작업 항목을 가져왔습니다.")
         else:
             print("해당 조건으로 VectorDB(Qdrant)에서 조회된 작업 항목이 없습니다.")
 
+        entry = ProjectTaskEntry(stored_hash, retrieved_tasks)
+        # 조회 도중 재적재가 일어나 해시가 섞인 경우에는 캐시하지 않습니다.
+        if use_cache and seen_hashes <= {stored_hash}:
+            with _cache_lock:
+                _project_task_cache[project_id] = entry
+                _cache_stats["loads"] += 1
+        return entry
+
+def get_project_task_items_tool(
+    project_id: int,
+    limit_results: Optional[int] = None, # scroll 요청 1회당 가져올 포인트 수 (전체 결과는 페이지네이션으로 모두 조회)
+    use_cache: bool = True
+) -> List[Dict]:
+    """
+    지정된 프로젝트 ID에 해당하는 모든 작업 항목(task_item)을 VectorDB(Qdrant)에서 조회합니다.
+    (project_id, wbs_hash) 기준 캐시를 사용하므로 같은 배치의 다른 사용자는 저장된 해시 확인만 수행합니다.
+    """
+    print(f"--- WBS 작업 항목 조회 도구 실행 (Qdrant, 전체 작업): 프로젝트 ID '{project_id}' ---")
+    page_size = limit_results if limit_results is not None and limit_results > 0 else 1000
+
+    try:
+        return list(_get_project_entry(project_id, page_size, use_cache).tasks)
     except ValueError as e:
         print(f"오류: 도구 실행 중 설정 문제 발생 - {e}")
     except RuntimeError as e:
@@ -83,53 +220,120 @@ def get_project_task_items_tool(
         print(f"오류: WBS 작업 항목 조회 중 예상치 못한 문제 발생 - {e}")
         print(traceback.format_exc())
 
-    return retrieved_tasks
+    return []
+
+
+def _get_tasks_by_assignee_server_side(project_id, assignee_name: str, page_size: int) -> List[Dict]:
+    """
+    `assignees` keyword payload 색인을 사용해 Qdrant 서버에서 담당자 필터링을 수행합니다.
+    토큰 정확 일치만 지원하며, `assignees` 필드가 없는 (이전에 적재된) 데이터는 조회되지 않습니다.
+    """
+    scroll_filter = _project_filter(
+        project_id,
+        models.FieldCondition(key="assignees", match=models.MatchValue(value=assignee_name.strip()))
+    )
+    tasks, _ = _load_project_tasks(_get_wbs_client(), project_id, page_size, scroll_filter)
+    return tasks
 
 
 def get_tasks_by_assignee_tool(
     project_id: str,
     assignee_name_to_filter: str,
-    initial_fetch_limit: Optional[int] = None
+    initial_fetch_limit: Optional[int] = None,
+    server_side: Optional[bool] = None
 ) -> List[Dict]:
     """
-    지정된 프로젝트 ID의 모든 작업 항목을 가져온 후,
-    Python 단에서 담당자 이름(리스트 또는 단일 문자열, 또는 단일 문자열 내 포함)을 기준으로 후처리 필터링합니다.
+    지정된 프로젝트 ID의 작업 항목 중 담당자 이름(리스트 또는 단일 문자열, 또는 단일 문자열 내 포함)에
+    해당하는 작업을 반환합니다. 기본적으로 프로젝트 로드 시 생성한 담당자 역색인을 사용하며,
+    server_side=True(또는 WBS_ASSIGNEE_FILTER_SERVER_SIDE)이면 Qdrant payload 색인으로 필터링합니다.
     """
-    print(f"--- WBS 작업 항목 조회 및 후처리 필터링 (담당자별): 프로젝트 ID '{project_id}', 필터링 담당자 '{assignee_name_to_filter}' ---")
+    print(f"--- WBS 작업 항목 조회 및 담당자 필터링: 프로젝트 ID '{project_id}', 필터링 담당자 '{assignee_name_to_filter}' ---")
 
     if not assignee_name_to_filter:
         print("오류: 필터링할 담당자 이름(assignee_name_to_filter)은 필수입니다.")
         return []
 
-    all_project_tasks = get_project_task_items_tool(
-        project_id=project_id,
-        limit_results=initial_fetch_limit
-    )
+    page_size = initial_fetch_limit if initial_fetch_limit is not None and initial_fetch_limit > 0 else 1000
+    use_server_side = config.WBS_ASSIGNEE_FILTER_SERVER_SIDE if server_side is None else server_side
 
-    if not all_project_tasks:
-        print(f"프로젝트 '{project_id}'에 대한 작업 항목을 찾을 수 없습니다. 담당자 필터링을 진행할 수 없습니다.")
+    try:
+        if use_server_side:
+            filtered_tasks = _get_tasks_by_assignee_server_side(project_id, assignee_name_to_filter, page_size)
+            print(f"서버 측 필터링 완료. 담당자 '{assignee_name_to_filter}'에게 할당된 작업 {len(filtered_tasks)}건을 찾았습니다.")
+            return filtered_tasks
+
+        entry = _get_project_entry(project_id, page_size, use_cache=True)
+    except Exception as e:
+        import traceback
+        print(f"오류: WBS 작업 항목 조회 중 예상치 못한 문제 발생 - {e}")
+        print(traceback.format_exc())
         return []
 
-    filtered_tasks: List[Dict] = []
-    print(f"가져온 {len(all_project_tasks)}개 작업 항목에 대해 담당자 '{assignee_name_to_filter}'(으)로 후처리 필터링 시작...")
+    if not entry.tasks:
+        print(f"프로젝트 '{project_id}'에 대한 작업 항목을 찾을 수 없습니다. 담당자 필터링을 진행할 수 없습니다.")
+        return []
 
-    for task_data in all_project_tasks:
-        assignee_field_value = task_data.get('assignee')
+    filtered_tasks = entry.tasks_for_assignee(assignee_name_to_filter)
+    print(f"담당자 색인 조회 완료. {len(entry.tasks)}개 작업 중 담당자 '{assignee_name_to_filter}'에게 할당된 작업 {len(filtered_tasks)}건을 찾았습니다.")
+    return filtered_tasks
 
-        if assignee_field_value is None:
-            continue
 
-        # 담당자 필드가 단일 문자열인 경우: 필터링할 이름이 포함되어 있는지 확인
+def _filter_tasks_by_assignee_linear(tasks: List[Dict], assignee_name_to_filter: str) -> List[Dict]:
+    """이전 방식의 선형 필터 (벤치마크 비교용)"""
+    filtered_tasks: List[Dict] = []
+    for task_data in tasks:
+        assignee_field_value = task_data.get('assignee')
         if isinstance(assignee_field_value, str):
-            if assignee_name_to_filter in assignee_field_value: # 수정된 부분: 정확한 일치에서 포함(contains)으로 변경
+            if assignee_name_to_filter in assignee_field_value:
                 filtered_tasks.append(task_data)
-        # 담당자 필드가 리스트인 경우: 필터링할 이름이 리스트의 멤버인지 확인
         elif isinstance(assignee_field_value, list):
             if assignee_name_to_filter in assignee_field_value:
                 filtered_tasks.append(task_data)
-        else:
-            print(f"경고: 작업 ID '{task_data.get('task_id', 'N/A')}'의 담당자 필드가 문자열 또는 리스트가 아닙니다 (타입: {type(assignee_field_value)}, 값: {assignee_field_value}). 필터링에서 제외됩니다.")
-
-    print(f"후처리 필터링 완료. 담당자 '{assignee_name_to_filter}'에게 할당된 작업 {len(filtered_tasks)}건을 찾았습니다.")
     return filtered_tasks
 
+
+def benchmark_assignee_filter(task_counts: Tuple[int, ...] = (100, 1000, 5000, 10000), member_count: int = 30):
+    """
+    WBS 크기별로 선형 필터와 담당자 색인의 팀 전체(멤버 수만큼) 조회 시간을 비교합니다.
+    담당자 필드는 단일 문자열 / 리스트 / 쉼표 구분 문자열을 섞어서 생성합니다.
+    """
+    import random
+    import time
+
+    members = [f"담당자{i:02d}" for i in range(member_count)]
+    rng = random.Random(42)
+
+    print(f"{'작업 수':>8} | {'선형 필터(ms)':>14} | {'색인 생성(ms)':>14} | {'색인 조회(ms)':>14} | 결과 일치")
+    for task_count in task_counts:
+        tasks = []
+        for i in range(task_count):
+            form = i % 3
+            if form == 0:
+                assignee = rng.choice(members)
+            elif form == 1:
+                assignee = rng.sample(members, 2)
+            else:
+                assignee = ", ".join(rng.sample(members, 2))
+            tasks.append({"task_id": f"T{i}", "task_name": f"작업 {i}", "assignee": assignee})
+
+        started_at = time.perf_counter()
+        linear_results = [_filter_tasks_by_assignee_linear(tasks, member) for member in members]
+        linear_ms = (time.perf_counter() - started_at) * 1000
+
+        started_at = time.perf_counter()
+        entry = ProjectTaskEntry("benchmark", tasks)
+        build_ms = (time.perf_counter() - started_at) * 1000
+
+        started_at = time.perf_counter()
+        index_results = [entry.tasks_for_assignee(member) for member in members]
+        lookup_ms = (time.perf_counter() - started_at) * 1000
+
+        matches = all(
+            [t["task_id"] for t in linear] == [t["task_id"] for t in indexed]
+            for linear, indexed in zip(linear_results, index_results)
+        )
+        print(f"{task_count:>8} | {linear_ms:>14.2f} | {build_ms:>14.2f} | {lookup_ms:>14.2f} | {matches}")
+
+
+if __name__ == "__main__":
+    benchmark_assignee_filter()
@@ -0,0 +1,20 @@
+import re
+from typing import Any, List
+
+# WBS 담당자 필드 정규화 (적재 시 assignees payload 생성과 조회 시 담당자 역색인이 함께 사용)
+_ASSIGNEE_SEPARATORS = re.compile(r"[,/;\n]")
+
+def split_assignee_tokens(assignee_value: Any) -> List[str]:
+    """담당자 필드(단일 문자열, 리스트, 쉼표/슬래시 구분 문자열)를 개별 담당자 이름 목록으로 정규화합니다."""
+    if assignee_value is None:
+        return []
+    values = assignee_value if isinstance(assignee_value, list) else [assignee_value]
+    tokens: List[str] = []
+    for value in values:
+        if value is None:
+            continue
+        for token in _ASSIGNEE_SEPARATORS.split(str(value)):
+            token = token.strip()
+            if token and token not in tokens:
+                tokens.append(token)
+    return tokens
@@ -0,0 +1,25 @@
+import asyncio
+import threading
+from typing import Any, Coroutine, Optional
+
+# 동기 코드(워커 스레드)에서 비동기 그래프(app.ainvoke)를 실행하기 위한 프로세스 공유 이벤트 루프
+# 호출마다 asyncio.run으로 루프를 새로 만들면 LLM 클라이언트의 비동기 HTTP 커넥션이 닫힌 루프에 묶여 재사용되지 않으므로,
+# 백그라운드 스레드에서 도는 루프 하나에 모든 코루틴을 제출합니다. 여러 워커가 제출한 코루틴은 이 루프에서 함께 실행됩니다.
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="async-runner", daemon=True).start()
+                _loop = loop
+    return _loop
+
+def run_coroutine(coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+    """공유 이벤트 루프에서 코루틴을 실행하고 완료될 때까지 기다려 결과를 반환합니다. (이벤트 루프 스레드 안에서는 호출하지 마세요)"""
+    future = asyncio.run_coroutine_threadsafe(coro, _get_loop())
+    return future.result(timeout)
@@ -1,11 +1,117 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Any
+
+import numpy
 from sentence_transformers import SentenceTransformer
-from typing import List
-from core.config import EMBEDDING_MODEL
+from core.config import EMBEDDING_MODEL, EMBEDDING_CACHE_SIZE
+
+# SentenceTransformer 모델은 수백 MB 크기이므로 모델 이름별로 프로세스당 한 번만 로드합니다.
+_encoders: Dict[str, SentenceTransformer] = {}
+_encoder_lock = threading.Lock()
+
+def get_encoder(model_name: str = EMBEDDING_MODEL) -> SentenceTransformer:
+    """공유 SentenceTransformer 인코더를 반환합니다. 최초 호출 시에만 모델을 로드합니다."""
+    encoder = _encoders.get(model_name)
+    if encoder is None:
+        with _encoder_lock:
+            encoder = _encoders.get(model_name)
+            if encoder is None:
+                print(f"SentenceTransformer 모델 '{model_name}' 로드 중 (프로세스 공유 인코더)...")
+                encoder = SentenceTransformer(model_name)
+                _encoders[model_name] = encoder
+    return encoder
+
+
+class QueryEmbeddingCache:
+    """(모델 이름, 정규화된 텍스트)를 키로 하는 스레드 안전 LRU 임베딩 캐시"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max(0, max_size)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, str]):
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, key: Tuple[str, str], vector: Tuple[float, ...]):
+        if not self.max_size:
+            return
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+_query_cache = QueryEmbeddingCache(EMBEDDING_CACHE_SIZE)
+
+def _normalize_text(text: str) -> str:
+    """캐시 키 및 인코딩 입력용으로 앞뒤 공백을 제거하고 연속 공백을 하나로 합칩니다."""
+    return " ".join(str(text).split())
 
-def embed_query(query: str) -> List[float]:
+def embed_texts(texts: List[str], model_name: str = EMBEDDING_MODEL) -> List[List[float]]:
+    """
+    여러 텍스트를 한 번의 encode 호출로 임베딩합니다.
+    캐시에 있는 텍스트는 재사용하고, 없는 텍스트만 모아서 인코딩합니다.
+    """
+    results: List[Any] = [None] * len(texts)
+    missing: "OrderedDict[str, List[int]]" = OrderedDict()
+
+    for i, text in enumerate(texts):
+        normalized = _normalize_text(text)
+        cached = _query_cache.get((model_name, normalized))
+        if cached is not None:
+            results[i] = list(cached)
+        else:
+            missing.setdefault(normalized, []).append(i)
+
+    if missing:
+        texts_to_encode = list(missing.keys())
+        vectors = get_encoder(model_name).encode(texts_to_encode, convert_to_numpy=True)
+        for normalized, vector in zip(texts_to_encode, vectors):
+            vector_tuple = tuple(vector.tolist())
+            _query_cache.put((model_name, normalized), vector_tuple)
+            for i in missing[normalized]:
+                results[i] = list(vector_tuple)
+
+    return results
+
+def encode_texts_matrix(texts: List[str], model_name: str = EMBEDDING_MODEL) -> numpy.ndarray:
+    """
+    대량 적재용: 캐시를 거치지 않고 텍스트 전체를 한 번에 인코딩하여 (n, dim) float32 행렬로 반환합니다.
+    적재 문서는 대부분 한 번만 임베딩되므로 쿼리 캐시를 오염시키지 않도록 분리했습니다.
+    """
+    if not texts:
+        return numpy.empty((0, 0), dtype=numpy.float32)
+    matrix = get_encoder(model_name).encode([_normalize_text(text) for text in texts], convert_to_numpy=True)
+    return numpy.asarray(matrix, dtype=numpy.float32)
+
+def embed_query(query: str, model_name: str = EMBEDDING_MODEL) -> List[float]:
     """
     입력 쿼리를 의미 벡터로 임베딩하여 Qdrant 검색에 사용 가능하도록 변환
     """
-    embedding_model = SentenceTransformer(EMBEDDING_MODEL)
-    
-    return embedding_model.encode(query).tolist()
+    return embed_texts([query], model_name)[0]
+
+def get_embedding_cache_stats() -> Dict[str, Any]:
+    """쿼리 임베딩 캐시의 크기와 hit/miss 통계를 반환합니다."""
+    return _query_cache.stats()
@@ -1,7 +1,15 @@
 
 import pandas as pd
+import datetime
 import hashlib
+import json
+import math
 import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import openpyxl
+
+from core import config
 
 def calculate_file_hash(file_path: str) -> str:
     """주어진 파일의 SHA256 해시를 계산합니다."""
@@ -18,34 +26,178 @@ def calculate_file_hash(file_path: str) -> str:
         print(f"파일 해시 계산 중 오류 발생 ({file_path}): {e}")
         raise
 
-def read_wbs_to_json_text(wbs_file_path: str) -> str:
+try:
+    from python_calamine import CalamineWorkbook # 선택 의존성: 설치되어 있으면 더 빠른 Rust 기반 엔진 사용
+except ImportError:
+    CalamineWorkbook = None
+
+def _normalize_cell(value: Any) -> Any:
+    """셀 값을 JSON 직렬화 가능한 형태로 정규화합니다. 빈 값은 None을 반환합니다."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    if isinstance(value, datetime.datetime):
+        # 시간 정보가 없는 날짜 셀은 YYYY-MM-DD, 시간이 있으면 ISO 8601로 표기합니다.
+        if value.time() == datetime.time(0, 0):
+            return value.date().isoformat()
+        return value.isoformat(timespec="seconds")
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, float):
+        if math.isnan(value):
+            return None
+        if value.is_integer():
+            return int(value)
+    return value
+
+def _is_legacy_xls(wbs_file_path: str) -> bool:
+    return os.path.splitext(wbs_file_path)[1].lower() == ".xls"
+
+def _reader_engine(wbs_file_path: str) -> str:
+    if CalamineWorkbook is not None:
+        return "calamine"
+    return "pandas(xlrd)" if _is_legacy_xls(wbs_file_path) else "openpyxl read-only"
+
+def _iter_legacy_xls_rows(wbs_file_path: str, sheet_names: Optional[List[str]]) -> Iterator[Tuple[str, Iterator[tuple]]]:
+    """openpyxl은 .xls(BIFF)를 읽지 못하므로 calamine이 없으면 pandas(xlrd 엔진)로 시트를 읽습니다. (시트 단위로 메모리에 로드)"""
+    try:
+        excel_file = pd.ExcelFile(wbs_file_path)
+    except ImportError as e:
+        raise ValueError(f".xls 형식의 WBS 파일을 읽으려면 python-calamine 또는 xlrd 패키지가 필요합니다: {wbs_file_path}") from e
+    for sheet_name in excel_file.sheet_names:
+        if sheet_names and sheet_name not in sheet_names:
+            continue
+        df = excel_file.parse(sheet_name, header=None)
+        df = df.astype(object).where(df.notna(), None) # NaN/NaT는 빈 셀(None)로
+        yield sheet_name, df.itertuples(index=False, name=None)
 
+def _iter_sheet_rows(wbs_file_path: str, sheet_names: Optional[List[str]]) -> Iterator[Tuple[str, Iterator[tuple]]]:
+    """(시트 이름, 행 값 튜플 iterator)를 시트별로 yield 합니다. calamine이 있으면 우선 사용하고, 없으면 openpyxl read-only 모드로 스트리밍합니다."""
+    if CalamineWorkbook is None and _is_legacy_xls(wbs_file_path):
+        yield from _iter_legacy_xls_rows(wbs_file_path, sheet_names)
+        return
+
+    if CalamineWorkbook is not None:
+        workbook = CalamineWorkbook.from_path(wbs_file_path)
+        for sheet_name in workbook.sheet_names:
+            if sheet_names and sheet_name not in sheet_names:
+                continue
+            sheet = workbook.get_sheet_by_name(sheet_name)
+            rows = sheet.iter_rows() if hasattr(sheet, "iter_rows") else iter(sheet.to_python())
+            yield sheet_name, (tuple(row) for row in rows)
+        return
+
+    workbook = openpyxl.load_workbook(wbs_file_path, read_only=True, data_only=True)
+    try:
+        for worksheet in workbook.worksheets:
+            if sheet_names and worksheet.title not in sheet_names:
+                continue
+            yield worksheet.title, worksheet.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+def iter_wbs_records(wbs_file_path: str, sheet_names: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    WBS 엑셀 파일의 모든 시트(또는 sheet_names에 지정한 시트)를 행 단위로 스트리밍하며 레코드를 yield 합니다.
+    - 시트마다 첫 번째 비어 있지 않은 행을 헤더로 사용합니다.
+    - 빈 행은 건너뛰고, 값이 없는 셀(빈 열)은 레코드에 포함하지 않습니다.
+    - 날짜는 YYYY-MM-DD(시간이 있으면 ISO 8601)로 정규화합니다.
+    - 각 레코드에는 sheet_name과 엑셀 기준 행 번호(row_number)가 포함됩니다.
+    """
     if not os.path.exists(wbs_file_path):
         raise FileNotFoundError(f"WBS 파일을 찾을 수 없습니다: {wbs_file_path}")
+
+    for sheet_name, rows in _iter_sheet_rows(wbs_file_path, sheet_names):
+        headers: Optional[List[str]] = None
+        for row_number, values in enumerate(rows, start=1):
+            cells = [_normalize_cell(value) for value in values]
+            if not any(cell is not None for cell in cells):
+                continue # 빈 행 건너뛰기
+
+            if headers is None:
+                headers = [str(cell) if cell is not None else f"Unnamed: {i}" for i, cell in enumerate(cells)]
+                continue
+
+            record: Dict[str, Any] = {"sheet_name": sheet_name}
+            for i, cell in enumerate(cells):
+                if cell is None:
+                    continue
+                header = headers[i] if i < len(headers) else f"Unnamed: {i}"
+                record[header] = cell
+            record["row_number"] = row_number
+            yield record
+
+def stream_wbs_records(wbs_file_path: str, sheet_names: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    WBS_SHEET_NAMES 설정을 적용하여 iter_wbs_records의 레코드를 그대로 흘려보내고, 끝까지 읽으면 시트별 행 수를 출력합니다.
+    레코드 목록을 따로 만들지 않으므로 wbs_diff.build_rows 등에 바로 넘겨 사용합니다.
+    """
     try:
-        print(f"WBS 파일 읽는 중: {wbs_file_path}")
-        try:
-            excel_file = pd.ExcelFile(wbs_file_path, engine='openpyxl')
-        except Exception as e:
-            print(f"'{wbs_file_path}' 파일 로드 시 openpyxl 엔진 사용 중 오류: {e}. 기본 엔진으로 재시도합니다.")
-            excel_file = pd.ExcelFile(wbs_file_path) # 기본 엔진으로 시도
-
-        if not excel_file.sheet_names:
-            raise ValueError(f"엑셀 파일에 시트가 없습니다: {wbs_file_path}")
-        
-        df = excel_file.parse(excel_file.sheet_names[0])
-        
-        print(f"WBS 파일 (시트: {excel_file.sheet_names[0]}) 상위 3개 행:\n{df.head(3)}")
-        print("WBS 파일 읽기 완료. JSON으로 변환 중...")
-        
-        wbs_json = df.to_json(orient='records', indent=None, force_ascii=False, date_format='iso')
-        return wbs_json
+        print(f"WBS 파일 읽는 중: {wbs_file_path} (엔진: {_reader_engine(wbs_file_path)})")
+        sheet_counts: Dict[str, int] = {}
+        for record in iter_wbs_records(wbs_file_path, sheet_names or config.WBS_SHEET_NAMES or None):
+            sheet_counts[record["sheet_name"]] = sheet_counts.get(record["sheet_name"], 0) + 1
+            yield record
+        print(f"WBS 파일 읽기 완료: 시트별 행 수 {sheet_counts}")
     except FileNotFoundError:
         print(f"오류: WBS 파일을 읽을 수 없습니다 - {wbs_file_path}")
         raise
-    except ValueError as ve:
-        print(f"WBS 파일 처리 중 값 오류: {ve}")
-        raise
     except Exception as e:
-        print(f"WBS 파일 읽기 또는 JSON 변환 오류 ({wbs_file_path}): {e}")
+        print(f"WBS 파일 읽기 오류 ({wbs_file_path}): {e}")
         raise
+
+def read_wbs_records(wbs_file_path: str, sheet_names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """WBS 엑셀 파일을 행 단위 레코드 목록으로 읽습니다. (stream_wbs_records의 결과를 모음)"""
+    return list(stream_wbs_records(wbs_file_path, sheet_names))
+
+def _read_wbs_records_pandas(wbs_file_path: str) -> List[Dict[str, Any]]:
+    """이전 방식(pandas 전체 로드, 첫 번째 시트만)의 리더. 벤치마크 비교용으로만 사용합니다."""
+    df = pd.ExcelFile(wbs_file_path, engine='openpyxl').parse(0)
+    return json.loads(df.to_json(orient='records', force_ascii=False, date_format='iso'))
+
+def records_to_json_text(records: List[Dict[str, Any]]) -> str:
+    """레코드 목록을 LLM 입력용 JSON 문자열로 변환합니다."""
+    return json.dumps(records, ensure_ascii=False)
+
+def read_wbs_to_json_text(wbs_file_path: str) -> str:
+    records = read_wbs_records(wbs_file_path)
+    print("WBS 파일 읽기 완료. JSON으로 변환 중...")
+    return records_to_json_text(records)
+
+
+def benchmark_wbs_readers(row_counts: Tuple[int, ...] = (5000, 50000), column_count: int = 12):
+    """합성 WBS 파일(행 수별)로 이전 pandas 리더와 스트리밍 리더의 읽기 시간을 비교합니다."""
+    import tempfile
+    import time
+
+    print(f"{'행 수':>8} | {'pandas(초)':>11} | {'스트리밍(초)':>12} | 레코드 수")
+    for row_count in row_counts:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, f"wbs_{row_count}.xlsx")
+            workbook = openpyxl.Workbook(write_only=True)
+            sheet = workbook.create_sheet("WBS")
+            sheet.append(["작업 ID", "작업명", "담당자", "시작일", "종료일", "산출물"] + [f"비고{i}" for i in range(column_count - 6)])
+            start_date = datetime.datetime(2025, 1, 1)
+            for i in range(row_count):
+                sheet.append([
+                    f"T{i:05d}", f"작업 {i}", f"담당자{i % 30:02d}",
+                    start_date + datetime.timedelta(days=i % 180), start_date + datetime.timedelta(days=i % 180 + 7),
+                    f"산출물 {i}" if i % 3 == 0 else None,
+                ] + [None if (i + c) % 4 else f"메모 {c}" for c in range(column_count - 6)])
+            workbook.save(path)
+
+            started_at = time.perf_counter()
+            pandas_records = _read_wbs_records_pandas(path)
+            pandas_seconds = time.perf_counter() - started_at
+
+            started_at = time.perf_counter()
+            streamed_count = sum(1 for _ in iter_wbs_records(path))
+            streaming_seconds = time.perf_counter() - started_at
+
+        print(f"{row_count:>8} | {pandas_seconds:>11.2f} | {streaming_seconds:>12.2f} | {len(pandas_records)} / {streamed_count}")
+
+
+if __name__ == "__main__":
+    benchmark_wbs_readers()
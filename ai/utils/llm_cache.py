@@ -0,0 +1,191 @@
+import contextvars
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Sequence
+
+from langchain.globals import set_llm_cache
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+
+from core import config
+
+# LLM 응답 영속 캐시 (LLM_CACHE_ENABLED=true일 때만 사용)
+# - LangChain 전역 캐시로 등록하므로 모든 에이전트의 `prompt | llm | parser` 체인에 그대로 적용됩니다.
+# - 키는 (모델 설정 문자열, 렌더링된 프롬프트)의 SHA256입니다. 모델 설정 문자열에는 모델명과 temperature 등 호출 파라미터가 포함되므로
+#   같은 프롬프트라도 모델/파라미터가 다르면 다른 항목입니다.
+# - 부분 실패 후 같은 날짜를 다시 실행하면 이미 성공한 사용자의 동일한 프롬프트는 LLM을 다시 호출하지 않습니다.
+# - LLM_CACHE_BYPASS=true이면 조회는 항상 미스로 처리하고 새 응답으로 캐시를 갱신합니다. (새로 생성해야 하는 실행용)
+# - LangChain은 출력 파서가 실행되기 전에 LLM 응답을 캐시에 씁니다. 파싱할 수 없는 응답이 캐시되어 재시도마다 같은 응답을 받지 않도록,
+#   cache_writes_on_success() 안의 호출은 체인 전체(파서 포함)가 성공했을 때만 캐시에 쓰고,
+#   실패하면 쓰기를 버리고 이번 호출에서 적중한 항목도 삭제합니다. (invoke_chain / ainvoke_chain, LLMInterface가 사용)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    generations TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+)
+"""
+
+
+# cache_writes_on_success() 안에서만 설정됨: {"writes": [(cache, key, generations)], "hits": [(cache, key)]}
+_pending: contextvars.ContextVar[Optional[Dict[str, list]]] = contextvars.ContextVar("llm_cache_pending", default=None)
+
+
+class SQLiteLLMCache(BaseCache):
+    """TTL과 최대 항목 수(오래 사용되지 않은 항목부터 삭제)를 갖는 SQLite 파일 기반 LLM 응답 캐시"""
+
+    def __init__(self, path: str, ttl_seconds: int, max_entries: int, bypass: bool = False):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self.bypass = bypass
+        self._stats = {"hits": 0, "misses": 0, "bypassed": 0, "expired": 0, "writes": 0, "evictions": 0, "discarded": 0, "invalidated": 0}
+        self._stats_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed_at ON llm_cache (accessed_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def _count(self, name: str, n: int = 1):
+        with self._stats_lock:
+            self._stats[name] += n
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        if self.bypass:
+            self._count("bypassed")
+            return None
+
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT generations, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._count("misses")
+                return None
+            generations, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._count("expired")
+                self._count("misses")
+                return None
+            conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+
+        try:
+            result = [loads(generation) for generation in json.loads(generations)]
+        except Exception as e:
+            print(f"LLMCache: 캐시 항목 복원 실패, 미스로 처리합니다: {e}")
+            self._count("misses")
+            return None
+        self._count("hits")
+        pending = _pending.get()
+        if pending is not None:
+            pending["hits"].append((self, key))
+        return result
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        key = self._key(prompt, llm_string)
+        generations = json.dumps([dumps(generation) for generation in return_val])
+        pending = _pending.get()
+        if pending is not None:
+            # 체인 전체가 성공할 때까지 쓰기를 미룸
+            pending["writes"].append((self, key, generations))
+            return
+        self._write(key, generations)
+
+    def _write(self, key: str, generations: str):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, generations, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, generations, now, now)
+            )
+            (total,) = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+            overflow = total - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY accessed_at LIMIT ?)",
+                    (overflow,)
+                )
+                self._count("evictions", overflow)
+        self._count("writes")
+
+    def _invalidate(self, key: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+        self._count("invalidated")
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+
+@contextmanager
+def cache_writes_on_success():
+    """
+    블록 안의 LLM 응답은 블록이 예외 없이 끝났을 때만 캐시에 씁니다.
+    예외(출력 파싱 실패 등)가 나면 미뤄 둔 쓰기를 버리고, 블록 안에서 적중한 캐시 항목도 삭제하여 재시도 시 LLM을 다시 호출하게 합니다.
+    """
+    pending: Dict[str, list] = {"writes": [], "hits": []}
+    token = _pending.set(pending)
+    try:
+        yield
+    except BaseException:
+        for cache, key in pending["hits"]:
+            cache._invalidate(key)
+        for cache, _, _ in pending["writes"]:
+            cache._count("discarded")
+        raise
+    else:
+        for cache, key, generations in pending["writes"]:
+            cache._write(key, generations)
+    finally:
+        _pending.reset(token)
+
+
+_llm_cache: Optional[SQLiteLLMCache] = None
+_llm_cache_lock = threading.Lock()
+
+def configure_llm_cache() -> Optional[SQLiteLLMCache]:
+    """LLM_CACHE_ENABLED 설정에 따라 LangChain 전역 캐시를 등록(또는 해제)합니다. 여러 번 호출해도 캐시는 하나만 생성합니다."""
+    global _llm_cache
+    if not config.LLM_CACHE_ENABLED:
+        set_llm_cache(None)
+        return None
+
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = SQLiteLLMCache(
+                config.LLM_CACHE_PATH, config.LLM_CACHE_TTL_SECONDS, config.LLM_CACHE_MAX_ENTRIES, config.LLM_CACHE_BYPASS
+            )
+            print(f"LLMCache: 응답 캐시 사용 ({config.LLM_CACHE_PATH}, TTL {config.LLM_CACHE_TTL_SECONDS}초, 최대 {config.LLM_CACHE_MAX_ENTRIES}건, bypass: {config.LLM_CACHE_BYPASS})")
+        set_llm_cache(_llm_cache)
+        return _llm_cache
+
+def get_llm_cache_stats() -> Dict[str, Any]:
+    """캐시 적중/미스/쓰기/삭제 횟수와 적중률. 캐시를 사용하지 않으면 {"enabled": False}."""
+    if _llm_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **_llm_cache.stats()}
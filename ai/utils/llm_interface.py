@@ -1,11 +1,81 @@
 
 import os
 import json
-from typing import Dict, Any
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnablePassthrough
+from ai.utils.llm_cache import cache_writes_on_success
+from ai.utils.rate_limiter import llm_call_slot, PROVIDER_OPENAI
+from core import config
+
+try:
+    import tiktoken # langchain-openai 의존성으로 함께 설치됨
+    _token_encoding = tiktoken.get_encoding("cl100k_base")
+except Exception: # tiktoken이 없거나 인코딩 파일을 받을 수 없는 환경
+    _token_encoding = None
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수를 추정합니다. tiktoken이 없으면 한글 비중을 고려해 문자 2개당 1토큰으로 계산합니다."""
+    if _token_encoding is not None:
+        return len(_token_encoding.encode(text))
+    return len(text) // 2 + 1
+
+def split_records_by_token_budget(records: List[Dict[str, Any]], max_tokens: int) -> List[List[Dict[str, Any]]]:
+    """레코드를 원래 순서대로 유지하면서, 각 묶음의 JSON 토큰 수가 max_tokens를 넘지 않도록 나눕니다."""
+    chunks: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    current_tokens = 0
+    for record in records:
+        record_tokens = estimate_tokens(json.dumps(record, ensure_ascii=False))
+        if current and current_tokens + record_tokens > max_tokens:
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(record)
+        current_tokens += record_tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _task_fingerprint(task: Any) -> str:
+    return json.dumps(task, ensure_ascii=False, sort_keys=True, default=str)
+
+def merge_wbs_results(chunk_results: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], List[int]]:
+    """
+    청크별 분석 결과를 청크 순서대로 병합합니다. (입력 순서가 같으면 결과도 항상 같음)
+    - task_list: 내용이 완전히 같은 작업만 하나로 합칩니다. task_id가 같아도 내용이 다르면(시트가 다른 작업 등) 모두 유지하며,
+      포인트 ID 충돌은 저장 단계(VectorDBHandler._deterministic_point_id)에서 순번을 붙여 구분합니다.
+    - project_summary: 첫 번째로 값이 있는 청크의 요약
+    assignee_workload / delayed_tasks는 적재 단계에서 저장하지 않으므로 병합하지 않습니다.
+    병합 결과와 함께 각 task_list 항목이 몇 번째 청크에서 왔는지 반환합니다.
+    """
+    merged: Dict[str, Any] = {"project_summary": None, "task_list": []}
+    task_chunk_indexes: List[int] = []
+    seen_tasks = set()
+    seen_task_ids: Dict[str, int] = {}
+
+    for chunk_index, result in enumerate(chunk_results):
+        if merged["project_summary"] is None and result.get("project_summary"):
+            merged["project_summary"] = result.get("project_summary")
+
+        for task in result.get("task_list") or []:
+            fingerprint = _task_fingerprint(task)
+            if fingerprint in seen_tasks:
+                continue
+            seen_tasks.add(fingerprint)
+            merged["task_list"].append(task)
+            task_chunk_indexes.append(chunk_index)
+            if isinstance(task, dict) and task.get("task_id") is not None:
+                task_id = str(task.get("task_id"))
+                seen_task_ids[task_id] = seen_task_ids.get(task_id, 0) + 1
+
+    duplicated_ids = sorted(task_id for task_id, count in seen_task_ids.items() if count > 1)
+    if duplicated_ids:
+        print(f"참고: 내용이 다른 작업이 같은 task_id를 사용합니다 (모두 유지): {duplicated_ids[:10]}{' ...' if len(duplicated_ids) > 10 else ''}")
+    return merged, task_chunk_indexes
 
 class LLMInterface:
 
@@ -47,6 +117,34 @@ class LLMInterface:
             print(f"프롬프트 파일 읽기 오류 ({prompt_file_path}): {e}")
             raise
 
+    def _parse_llm_response(self, response_str: str) -> Dict[str, Any]:
+        """LLM 응답 문자열에서 JSON 객체를 추출합니다. 유효한 JSON이 없으면 ValueError."""
+        # LLM 응답이 마크다운 코드 블록(```json ... ```)으로 감싸져 오는 경우가 있으므로 처리
+        clean_response_str = response_str.strip()
+        if clean_response_str.startswith("```json"):
+            clean_response_str = clean_response_str[7:]
+            if clean_response_str.endswith("```"):
+                clean_response_str = clean_response_str[:-3]
+        clean_response_str = clean_response_str.strip()
+
+        # JSON 응답 시작과 끝을 찾아 파싱 (더 견고한 방법 고려 가능)
+        json_start = clean_response_str.find('{')
+        json_end = clean_response_str.rfind('}') + 1
+        if json_start == -1 or json_end <= json_start:
+            raise ValueError(f"LLM 응답에서 유효한 JSON 구조를 찾지 못했습니다. 응답 전문: {response_str}")
+
+        try:
+            return json.loads(clean_response_str[json_start:json_end])
+        except json.JSONDecodeError as e:
+            raise ValueError(f"LLM JSON 응답 파싱 오류: {e}\nLLM 원본 응답 (파싱 시도 부분):\n{clean_response_str}")
+
+    def _invoke_and_parse(self, wbs_json_data: str) -> Dict[str, Any]:
+        # 파싱까지 성공한 응답만 캐시되도록 파싱도 같은 블록에서 수행 (실패한 응답을 재시도에서 다시 받지 않도록)
+        with cache_writes_on_success():
+            with llm_call_slot(PROVIDER_OPENAI):
+                response_str = self.chain.invoke(wbs_json_data)
+            return self._parse_llm_response(response_str)
+
     def analyze_wbs_with_llm(self, wbs_json_data: str) -> Dict[str, Any]:
         if not wbs_json_data:
             print("경고: LLM 분석을 위한 WBS 데이터가 비어있습니다.")
@@ -57,35 +155,11 @@ class LLMInterface:
         print(f"[DEBUG] Prompt 길이 (문자): {len(prompt_preview)}")
 
         try:
-            response_str = self.chain.invoke(wbs_json_data)
-            print("LLM 분석 완료. 응답 파싱 중...")
-            # prompt_str = self.prompt_template.format(wbs_data=wbs_json_data)
-            # response_str = self.llm.invoke(prompt_str)  # LangChain chain 안 거침
-
-            # LLM 응답이 마크다운 코드 블록(```json ... ```)으로 감싸져 오는 경우가 있으므로 처리
-            clean_response_str = response_str.strip()
-            if clean_response_str.startswith("```json"):
-                clean_response_str = clean_response_str[7:]
-                if clean_response_str.endswith("```"):
-                    clean_response_str = clean_response_str[:-3]
-            clean_response_str = clean_response_str.strip()
-
-            # JSON 응답 시작과 끝을 찾아 파싱 (더 견고한 방법 고려 가능)
-            json_start = clean_response_str.find('{')
-            json_end = clean_response_str.rfind('}') + 1
-            
-            if json_start != -1 and json_end > json_start:
-                json_to_parse = clean_response_str[json_start:json_end]
-                parsed_json = json.loads(json_to_parse)
-                print("LLM 응답 파싱 성공.")
-                return parsed_json
-            else:
-                print(f"LLM 응답에서 유효한 JSON 구조를 찾지 못했습니다. 응답 전문: {response_str}")
-                return self._default_llm_response()
-        except json.JSONDecodeError as e:
-            error_context = clean_response_str if 'clean_response_str' in locals() else response_str
-            print(f"LLM JSON 응답 파싱 오류: {e}")
-            print(f"LLM 원본 응답 (파싱 시도 부분):\n{error_context}")
+            parsed_json = self._invoke_and_parse(wbs_json_data)
+            print("LLM 응답 파싱 성공.")
+            return parsed_json
+        except ValueError as e:
+            print(e)
             return self._default_llm_response()
         except Exception as e:
             # API 연결 오류 등 LangChain/OpenAI 관련 예외 처리 포함
@@ -93,6 +167,57 @@ class LLMInterface:
             # raise # 필요에 따라 에러를 다시 발생시켜 상위 호출부에서 처리
             return self._default_llm_response() # 또는 기본 응답 반환
 
+    def _analyze_chunk_with_retry(self, chunk_index: int, records: List[Dict[str, Any]], max_retries: int) -> Tuple[Optional[Dict[str, Any]], float, int]:
+        """청크 하나를 분석합니다. 실패 시 지수 백오프로 재시도하며 (결과, 소요 시간, 시도 횟수)를 반환합니다."""
+        wbs_json_data = json.dumps(records, ensure_ascii=False)
+        started_at = time.perf_counter()
+        for attempt in range(1, max_retries + 2):
+            try:
+                result = self._invoke_and_parse(wbs_json_data)
+                elapsed = time.perf_counter() - started_at
+                print(f"WBS 청크 {chunk_index + 1} 분석 완료: {len(records)}행, 작업 {len(result.get('task_list') or [])}개, {elapsed:.1f}초 (시도 {attempt}회)")
+                return result, elapsed, attempt
+            except Exception as e:
+                print(f"WBS 청크 {chunk_index + 1} 분석 실패 (시도 {attempt}/{max_retries + 1}): {e}")
+                if attempt <= max_retries:
+                    time.sleep(min(2 ** (attempt - 1), 30))
+        return None, time.perf_counter() - started_at, max_retries + 1
+
+    def analyze_wbs_records_chunked(
+        self,
+        records: List[Dict[str, Any]],
+        max_chunk_tokens: int = config.WBS_LLM_CHUNK_TOKENS,
+        max_workers: int = config.WBS_LLM_CHUNK_WORKERS,
+        max_retries: int = config.WBS_LLM_CHUNK_RETRIES
+    ) -> Optional[Tuple[Dict[str, Any], List[List[Dict[str, Any]]], List[int]]]:
+        """
+        WBS 레코드를 토큰 예산 단위 청크로 나누어 동시에 분석하고(map), 결과를 결정적으로 병합합니다(reduce).
+        재시도 후에도 실패한 청크가 있으면 일부 작업만 저장되지 않도록 None을 반환합니다.
+        반환값: (병합 결과, 청크 목록, task_list 항목별 청크 인덱스)
+        """
+        if not records:
+            return self._default_llm_response(), [], []
+
+        chunks = split_records_by_token_budget(records, max_chunk_tokens)
+        print(f"WBS {len(records)}행을 {len(chunks)}개 청크로 나누어 분석합니다. (청크당 최대 {max_chunk_tokens} 토큰, 동시 {max_workers}개)")
+
+        started_at = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+            outcomes = list(executor.map(
+                lambda indexed: self._analyze_chunk_with_retry(indexed[0], indexed[1], max_retries),
+                enumerate(chunks)
+            ))
+
+        chunk_seconds = [elapsed for _, elapsed, _ in outcomes]
+        failed = [index + 1 for index, (result, _, _) in enumerate(outcomes) if result is None]
+        print(f"WBS 청크 분석 소요: 전체 {time.perf_counter() - started_at:.1f}초, 청크 최대 {max(chunk_seconds):.1f}초, 합계 {sum(chunk_seconds):.1f}초")
+        if failed:
+            print(f"오류: WBS 청크 {failed} 분석이 재시도 후에도 실패했습니다.")
+            return None
+
+        merged, task_chunk_indexes = merge_wbs_results([result for result, _, _ in outcomes])
+        return merged, chunks, task_chunk_indexes
+
     def _default_llm_response(self) -> Dict[str, Any]:
         """LLM 처리 실패 또는 유효하지 않은 응답 시 반환할 기본 구조입니다."""
         return {
@@ -0,0 +1,61 @@
+import os
+import threading
+from typing import Dict, Optional, Tuple, Any
+
+from langchain_anthropic import ChatAnthropic
+from langchain_openai import ChatOpenAI
+from langchain.prompts import PromptTemplate
+
+from core import config
+
+# LLM 클라이언트는 내부에 HTTP 커넥션 풀을 가지므로 (모델, 파라미터) 조합별로 프로세스당 하나만 생성하여 공유합니다.
+_llm_clients: Dict[Tuple, Any] = {}
+_prompt_texts: Dict[str, str] = {}
+_prompt_templates: Dict[str, PromptTemplate] = {}
+_registry_lock = threading.Lock()
+
+def get_chat_openai(model: str, temperature: float, max_tokens: Optional[int] = None) -> ChatOpenAI:
+    """공유 ChatOpenAI 클라이언트를 반환합니다."""
+    key = ("openai", model, temperature, max_tokens)
+    with _registry_lock:
+        llm = _llm_clients.get(key)
+        if llm is None:
+            kwargs = {"model": model, "temperature": temperature, "openai_api_key": config.OPENAI_API_KEY}
+            if max_tokens is not None:
+                kwargs["max_tokens"] = max_tokens
+            llm = ChatOpenAI(**kwargs)
+            _llm_clients[key] = llm
+        return llm
+
+def get_chat_anthropic(model: str, temperature: float, max_tokens: int) -> ChatAnthropic:
+    """공유 ChatAnthropic 클라이언트를 반환합니다."""
+    key = ("anthropic", model, temperature, max_tokens)
+    with _registry_lock:
+        llm = _llm_clients.get(key)
+        if llm is None:
+            llm = ChatAnthropic(
+                model=model, temperature=temperature,
+                api_key=config.CLAUDE_API_KEY, max_tokens=max_tokens
+            )
+            _llm_clients[key] = llm
+        return llm
+
+def load_prompt_text(file_name: str) -> str:
+    """ai/prompts 아래의 프롬프트 파일 내용을 한 번만 읽어 캐시합니다. 파일이 없으면 FileNotFoundError."""
+    with _registry_lock:
+        text = _prompt_texts.get(file_name)
+        if text is None:
+            prompt_file_path = os.path.join(config.PROMPTS_BASE_DIR, file_name)
+            with open(prompt_file_path, "r", encoding="utf-8") as f:
+                text = f.read()
+            _prompt_texts[file_name] = text
+        return text
+
+def get_prompt_template(file_name: str) -> PromptTemplate:
+    """프롬프트 파일로부터 파싱된 PromptTemplate을 캐시하여 반환합니다. 파일이 없으면 FileNotFoundError."""
+    template = _prompt_templates.get(file_name)
+    if template is None:
+        template = PromptTemplate.from_template(load_prompt_text(file_name))
+        with _registry_lock:
+            template = _prompt_templates.setdefault(file_name, template)
+    return template
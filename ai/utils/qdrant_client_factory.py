@@ -0,0 +1,97 @@
+import threading
+from typing import Dict, Iterable, Optional
+
+from qdrant_client import QdrantClient, models
+from qdrant_client.http.models import Distance, VectorParams
+
+from core import config
+
+# QdrantClient는 내부에 HTTP(또는 gRPC) 커넥션 풀을 가지며 스레드 안전하므로 프로세스당 하나만 생성하여 공유합니다.
+_client: Optional[QdrantClient] = None
+_client_lock = threading.Lock()
+
+# 컬렉션 존재 여부 / 벡터 차원 확인은 프로세스당 컬렉션별로 한 번만 수행합니다.
+_checked_collections: Dict[str, int] = {}
+_collections_lock = threading.Lock()
+
+def get_qdrant_client() -> QdrantClient:
+    """공유 QdrantClient를 반환합니다. QDRANT_PREFER_GRPC=true이면 gRPC 연결을 우선 사용합니다."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                try:
+                    _client = QdrantClient(
+                        host=config.QDRANT_HOST,
+                        port=config.QDRANT_PORT,
+                        grpc_port=config.QDRANT_GRPC_PORT,
+                        prefer_grpc=config.QDRANT_PREFER_GRPC,
+                        timeout=config.QDRANT_TIMEOUT_SECONDS
+                    )
+                    print(f"Qdrant 클라이언트 초기화 성공 (공유 클라이언트, gRPC 우선: {config.QDRANT_PREFER_GRPC}).")
+                except Exception as e:
+                    raise RuntimeError(f"Qdrant 클라이언트 초기화 실패 : {e}")
+    return _client
+
+def _get_vector_size(collection_info) -> int:
+    """컬렉션 정보에서 기본(또는 첫 번째 명명된) 벡터 차원을 읽습니다. 확인할 수 없으면 -1."""
+    vectors_config = collection_info.config.params.vectors
+    if isinstance(vectors_config, models.VectorParams):
+        return vectors_config.size
+    if isinstance(vectors_config, dict):
+        default_vector_config = vectors_config.get('') or vectors_config.get(models.DEFAULT_VECTOR_NAME)
+        if default_vector_config:
+            return default_vector_config.size
+        if vectors_config: # 명명된 벡터만 있는 경우 첫 번째 것을 기준으로 함
+            return next(iter(vectors_config.values())).size
+    return -1
+
+def _is_not_found_error(e: Exception) -> bool:
+    error_str = str(e).lower()
+    return "not found" in error_str or "status_code=404" in error_str or "not_found" in error_str
+
+def ensure_collection(
+    collection_name: str,
+    vector_size: int,
+    keyword_indexes: Iterable[str] = (),
+    client: Optional[QdrantClient] = None
+) -> int:
+    """
+    컬렉션이 없으면 생성하고 keyword payload 색인을 준비합니다. 프로세스당 컬렉션별로 한 번만 서버에 확인하며,
+    이후 호출은 캐시된 벡터 차원(확인 불가 시 -1)을 바로 반환합니다.
+    """
+    with _collections_lock:
+        if collection_name in _checked_collections:
+            return _checked_collections[collection_name]
+
+        client = client or get_qdrant_client()
+        try:
+            current_config_dim = _get_vector_size(client.get_collection(collection_name=collection_name))
+            if current_config_dim != -1 and current_config_dim != vector_size:
+                print(f"경고: 기존 컬렉션 '{collection_name}'의 벡터 차원({current_config_dim})이 현재 임베딩 차원({vector_size})과 다릅니다. "
+                      "데이터 일관성 문제가 발생할 수 있습니다. 컬렉션을 재 생성하거나 모델 설정을 확인하세요.")
+            print(f"Qdrant 컬렉션 '{collection_name}'이 이미 존재합니다. 설정된 벡터 차원: {current_config_dim if current_config_dim != -1 else '확인 안됨'}.")
+        except Exception as e:
+            if not _is_not_found_error(e):
+                raise RuntimeError(f"Qdrant 컬렉션 '{collection_name}' 정보 조회 실패: {e}")
+            print(f"Qdrant 컬렉션 '{collection_name}' 생성 중 (벡터 크기: {vector_size}, 거리 함수: COSINE)...")
+            client.recreate_collection(
+                collection_name=collection_name,
+                vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE)
+            )
+            current_config_dim = vector_size
+            print(f"Qdrant 컬렉션 '{collection_name}' 생성 완료.")
+
+        for field_name in keyword_indexes:
+            try:
+                client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=field_name,
+                    field_schema=models.PayloadSchemaType.KEYWORD,
+                    wait=True
+                )
+            except Exception as e:
+                print(f"정보: '{collection_name}.{field_name}' payload 색인 생성 건너뜀 (이미 존재하거나 지원되지 않음): {e}")
+
+        _checked_collections[collection_name] = current_config_dim
+        return current_config_dim
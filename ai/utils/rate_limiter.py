@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Any
+
+from core import config
+from ai.utils.llm_cache import cache_writes_on_success
+
+PROVIDER_OPENAI = "openai"
+PROVIDER_ANTHROPIC = "anthropic"
+
+# 비동기 호출이 동시 호출 한도에 걸렸을 때 빈 슬롯을 다시 확인하는 간격
+ASYNC_SLOT_POLL_SECONDS = 0.05
+
+
+class ProviderRateBudget:
+    """LLM 공급자별 동시 호출 수와 분당 호출 수(RPM)를 제한하는 호출 예산"""
+
+    def __init__(self, provider: str, max_concurrency: int, requests_per_minute: int = 0):
+        self.provider = provider
+        self.max_concurrency = max(1, max_concurrency)
+        self.requests_per_minute = max(0, requests_per_minute)
+
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self._next_allowed_at = 0.0
+
+        self.total_calls = 0
+        self.total_wait_seconds = 0.0
+
+    def _reserve_rate_delay(self) -> float:
+        """RPM 제한이 설정된 경우, 호출 간 최소 간격을 지키기 위해 기다려야 할 시간(초)을 예약하여 반환합니다."""
+        if not self.requests_per_minute:
+            return 0.0
+
+        interval = 60.0 / self.requests_per_minute
+        with self._lock:
+            now = time.monotonic()
+            scheduled_at = max(now, self._next_allowed_at)
+            self._next_allowed_at = scheduled_at + interval
+        return scheduled_at - now
+
+    def _wait_for_rate_slot(self):
+        delay = self._reserve_rate_delay()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _record_call(self, requested_at: float):
+        waited = time.monotonic() - requested_at
+        with self._lock:
+            self.total_calls += 1
+            self.total_wait_seconds += waited
+
+    @contextmanager
+    def slot(self):
+        """LLM 호출 한 건을 감싸는 컨텍스트. 예산이 허용될 때까지 블로킹합니다."""
+        requested_at = time.monotonic()
+        self._semaphore.acquire()
+        try:
+            self._wait_for_rate_slot()
+            self._record_call(requested_at)
+            yield
+        finally:
+            self._semaphore.release()
+
+    @asynccontextmanager
+    async def async_slot(self):
+        """slot()의 비동기 버전. 이벤트 루프를 막지 않고 대기하며, 동기 호출과 같은 예산을 공유합니다."""
+        requested_at = time.monotonic()
+        while not self._semaphore.acquire(blocking=False):
+            await asyncio.sleep(ASYNC_SLOT_POLL_SECONDS)
+        try:
+            delay = self._reserve_rate_delay()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._record_call(requested_at)
+            yield
+        finally:
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "provider": self.provider,
+                "max_concurrency": self.max_concurrency,
+                "requests_per_minute": self.requests_per_minute,
+                "total_calls": self.total_calls,
+                "total_wait_seconds": round(self.total_wait_seconds, 2),
+            }
+
+
+_budgets: Dict[str, ProviderRateBudget] = {}
+_budgets_lock = threading.Lock()
+
+def get_rate_budget(provider: str) -> ProviderRateBudget:
+    """공급자별 호출 예산을 프로세스 단위로 하나만 생성하여 반환합니다."""
+    with _budgets_lock:
+        budget = _budgets.get(provider)
+        if budget is None:
+            if provider == PROVIDER_ANTHROPIC:
+                budget = ProviderRateBudget(provider, config.ANTHROPIC_MAX_CONCURRENCY, config.ANTHROPIC_RPM)
+            else:
+                budget = ProviderRateBudget(provider, config.OPENAI_MAX_CONCURRENCY, config.OPENAI_RPM)
+            _budgets[provider] = budget
+        return budget
+
+def llm_call_slot(provider: str):
+    """`with llm_call_slot(PROVIDER_OPENAI): chain.invoke(...)` 형태로 사용합니다."""
+    return get_rate_budget(provider).slot()
+
+def allm_call_slot(provider: str):
+    """`async with allm_call_slot(PROVIDER_OPENAI): await chain.ainvoke(...)` 형태로 사용합니다."""
+    return get_rate_budget(provider).async_slot()
+
+def invoke_chain(chain, llm_input: Dict[str, Any], provider: str) -> Any:
+    """공급자 호출 예산 안에서 chain.invoke를 실행합니다. LLM 응답은 체인(출력 파서 포함)이 성공했을 때만 캐시됩니다."""
+    with llm_call_slot(provider), cache_writes_on_success():
+        return chain.invoke(llm_input)
+
+async def ainvoke_chain(chain, llm_input: Dict[str, Any], provider: str) -> Any:
+    """공급자 호출 예산 안에서 chain.ainvoke를 실행합니다. LLM 응답은 체인(출력 파서 포함)이 성공했을 때만 캐시됩니다."""
+    async with allm_call_slot(provider):
+        with cache_writes_on_success():
+            return await chain.ainvoke(llm_input)
+
+def get_rate_budget_stats() -> Dict[str, Dict[str, Any]]:
+    with _budgets_lock:
+        budgets = list(_budgets.values())
+    return {budget.provider: budget.stats() for budget in budgets}
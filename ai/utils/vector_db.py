@@ -1,13 +1,18 @@
 from qdrant_client import QdrantClient, models
 from qdrant_client.http.models import PointStruct, Distance, VectorParams, Filter, FieldCondition, MatchValue
-from sentence_transformers import SentenceTransformer # 직접 SentenceTransformer 사용
+from ai.utils.embed_query import embed_texts, encode_texts_matrix, get_encoder # 프로세스 공유 SentenceTransformer 인코더 사용
 import json
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, Iterable, List, Any, Optional, Union
 import uuid
 import numpy
 import traceback # 디버깅을 위해 추가
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from core.config import COLLECTION_WBS_DATA, QDRANT_HOST
+from core.config import COLLECTION_WBS_DATA, QDRANT_UPSERT_BATCH_SIZE, QDRANT_UPSERT_PARALLEL
+from ai.utils.qdrant_client_factory import get_qdrant_client, ensure_collection
+from ai.utils.assignee import split_assignee_tokens
+# 결정적 포인트 ID 생성용 네임스페이스 ((project_id, task_id)가 같으면 항상 같은 ID)
+WBS_POINT_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "yaxim/wbs-task")
 # 임베딩 모델 정보
 DEFAULT_SENTENCE_TRANSFORMER_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"
 
@@ -25,53 +30,16 @@ class VectorDBHandler:
         self.project_id = project_id
         self.collection_name = f"{collection_name_prefix}"
 
-        try:
-            self.client = QdrantClient(host=QDRANT_HOST, port=6333)
-        except Exception as e:
-            raise RuntimeError(f"Qdrant 클라이언트 초기화 실패 : {e}")
+        # 프로세스 공유 QdrantClient 사용 (커넥션 재사용)
+        self.client = get_qdrant_client()
 
         self.embedding_model_name = sentence_transformer_model_name
         self.embedding_model = None  # 임베딩 모델은 필요할 때 초기화
         self.embedding_dim = 384    # 임베딩 차원도 필요할 때 설정
 
         try:
-            collection_exists = False
-            current_config_dim = -1 # 컬렉션 차원 초기화
-            try:
-                collection_info = self.client.get_collection(collection_name=self.collection_name)
-                if collection_info:
-                    vectors_config = collection_info.config.params.vectors
-                    if isinstance(vectors_config, models.VectorParams):
-                        current_config_dim = vectors_config.size
-                    elif isinstance(vectors_config, dict):
-                        default_vector_config = vectors_config.get('') or vectors_config.get(models.DEFAULT_VECTOR_NAME)
-                        if default_vector_config:
-                            current_config_dim = default_vector_config.size
-                        elif vectors_config: # 명명된 벡터만 있는 경우 첫 번째 것을 기준으로 함
-                            first_named_vector_config = next(iter(vectors_config.values()))
-                            current_config_dim = first_named_vector_config.size
-                    
-                    if current_config_dim != -1 and current_config_dim != self.embedding_dim:
-                         print(f"경고: 기존 컬렉션 '{self.collection_name}'의 벡터 차원({current_config_dim})이 현재 모델('{self.embedding_model_name}')의 임베딩 차원({self.embedding_dim})과 다릅니다. "
-                               "데이터 일관성 문제가 발생할 수 있습니다. 컬렉션을 재 생성하거나 모델 설정을 확인하세요.")
-                collection_exists = True
-            except Exception as e:
-                error_str = str(e).lower()
-                if "not found" in error_str or "status_code=404" in error_str or "not_found" in error_str or "NOT_FOUND" in str(e).upper() :
-                     collection_exists = False
-                else:
-                    raise RuntimeError(f"Qdrant 컬렉션 '{self.collection_name}' 정보 조회 실패: {e}")
-
-            if not collection_exists:
-                print(f"Qdrant 컬렉션 '{self.collection_name}' 생성 중 (벡터 크기: {self.embedding_dim}, 거리 함수: COSINE)...")
-                self.client.recreate_collection(
-                    collection_name=self.collection_name,
-                    vectors_config=VectorParams(size=self.embedding_dim, distance=Distance.COSINE)
-                )
-                print(f"Qdrant 컬렉션 '{self.collection_name}' 생성 완료.")
-            else:
-                print(f"Qdrant 컬렉션 '{self.collection_name}'이 이미 존재합니다. 설정된 벡터 차원: {current_config_dim if current_config_dim != -1 else '확인 안됨'}.")
-
+            # 컬렉션 존재 확인 / 생성 및 assignees payload 색인 준비는 프로세스당 한 번만 수행됩니다.
+            ensure_collection(self.collection_name, self.embedding_dim, keyword_indexes=("assignees",), client=self.client)
         except Exception as e:
             raise RuntimeError(f"Qdrant 컬렉션 '{self.collection_name}' 처리 중 오류: {e}")
 
@@ -81,8 +49,7 @@ class VectorDBHandler:
         """임베딩 모델을 초기화합니다. 필요할 때만 호출됩니다."""
         if self.embedding_model is None:
             try:
-                print(f"SentenceTransformer 모델 '{self.embedding_model_name}' 로드 중...")
-                self.embedding_model = SentenceTransformer(self.embedding_model_name)
+                self.embedding_model = get_encoder(self.embedding_model_name)
                 self.embedding_dim = self.embedding_model.get_sentence_embedding_dimension()
                 print(f"SentenceTransformer 모델 로드 완료. 모델 '{self.embedding_model_name}'의 임베딩 차원은 {self.embedding_dim}입니다.")
             except Exception as model_load_e:
@@ -105,20 +72,8 @@ class VectorDBHandler:
             self._initialize_embedding_model()
             
         try:
-            raw_embeddings: numpy.ndarray = self.embedding_model.encode(texts, convert_to_numpy=True)
-
-            if not isinstance(raw_embeddings, numpy.ndarray):
-                 raise ValueError(f"SentenceTransformer.encode 결과가 예상치 못한 타입입니다 (numpy.ndarray 기대): {type(raw_embeddings)}")
-
-            embeddings_as_lists: List[List[float]] = []
-            if raw_embeddings.ndim == 1:
-                embeddings_as_lists.append(raw_embeddings.tolist())
-            elif raw_embeddings.ndim == 2:
-                for emb_vector in raw_embeddings:
-                    embeddings_as_lists.append(emb_vector.tolist())
-            else:
-                raise ValueError(f"SentenceTransformer.encode 결과가 예상치 못한 차원의 NumPy 배열입니다: {raw_embeddings.ndim}D")
-
+            # 공유 인코더 + 임베딩 LRU 캐시를 사용 (캐시에 없는 텍스트만 한 번에 인코딩)
+            embeddings_as_lists: List[List[float]] = embed_texts(texts, self.embedding_model_name)
             return embeddings_as_lists
         except Exception as e:
             print(f"텍스트 임베딩 중 오류 (모델: {self.embedding_model_name}): {e}")
@@ -148,6 +103,64 @@ class VectorDBHandler:
             print(f"저장된 WBS 해시 조회 중 오류 또는 데이터 없음 (컬렉션: {self.collection_name}, 프로젝트 ID: {self.project_id}): {e}")
         return None
 
+    def get_stored_row_hashes(self) -> Dict[str, Optional[List[str]]]:
+        """
+        현재 프로젝트의 작업 포인트별 출처 행 해시(row_hashes)를 조회합니다. {point_id: row_hashes}
+        row_hashes 없이 적재된 이전 포인트는 값이 None입니다.
+        """
+        stored: Dict[str, Optional[List[str]]] = {}
+        next_offset = None
+        while True:
+            points, next_offset = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=Filter(must=[FieldCondition(key="project_id", match=MatchValue(value=self.project_id))]),
+                limit=1000,
+                offset=next_offset,
+                with_payload=models.PayloadSelectorInclude(include=["row_hashes"]),
+                with_vectors=False
+            )
+            for point in points:
+                payload = point.payload or {}
+                stored[str(point.id)] = payload.get("row_hashes")
+            if next_offset is None:
+                return stored
+
+    def delete_points(self, point_ids: List[str]):
+        """지정한 포인트들만 삭제합니다. (증분 적재 시 수정/삭제된 행의 작업 제거)"""
+        if not point_ids:
+            return
+        self.client.delete(
+            collection_name=self.collection_name,
+            points_selector=models.PointIdsList(points=list(point_ids)),
+            wait=True
+        )
+        print(f"프로젝트 '{self.project_id}'의 포인트 {len(point_ids)}개 삭제 완료.")
+
+    def update_wbs_hash(self, wbs_hash: str):
+        """프로젝트의 모든 포인트의 wbs_hash를 현재 파일 해시로 갱신합니다. (증분 적재 후 유지된 포인트 포함)"""
+        self.client.set_payload(
+            collection_name=self.collection_name,
+            payload={"wbs_hash": wbs_hash},
+            points=models.FilterSelector(
+                filter=Filter(must=[FieldCondition(key="project_id", match=MatchValue(value=self.project_id))])
+            ),
+            wait=True
+        )
+
+    def sweep_stale_points(self, current_wbs_hash: str):
+        """현재 파일 해시가 아닌 (이전 적재에서 남은) 프로젝트 포인트를 삭제합니다. 새 포인트 업서트 이후에 호출합니다."""
+        self.client.delete(
+            collection_name=self.collection_name,
+            points_selector=models.FilterSelector(
+                filter=models.Filter(
+                    must=[models.FieldCondition(key="project_id", match=models.MatchValue(value=self.project_id))],
+                    must_not=[models.FieldCondition(key="wbs_hash", match=models.MatchValue(value=current_wbs_hash))]
+                )
+            ),
+            wait=True
+        )
+        print(f"프로젝트 '{self.project_id}'의 이전 해시 포인트 정리 완료.")
+
     def clear_project_data(self):
         """DB에서 현재 프로젝트 ID와 관련된 모든 데이터를 삭제합니다."""
         print(f"프로젝트 '{self.project_id}'의 데이터 삭제 시도 (컬렉션: {self.collection_name})...")
@@ -168,8 +181,29 @@ class VectorDBHandler:
             print(f"프로젝트 데이터 삭제 중 오류 (프로젝트: {self.project_id}, 컬렉션: {self.collection_name}): {e}")
 
 
+    def _deterministic_point_id(self, item_dict: Dict[str, Any], used_ids: set) -> str:
+        """
+        (project_id, task_id)로부터 uuid5 포인트 ID를 만듭니다. 재적재 시 같은 작업은 같은 포인트를 제자리에서 덮어씁니다.
+        task_id가 없으면 작업명+담당자를 사용하고, used_ids(이번 저장에서 쓴 ID와 유지할 기존 포인트 ID)와 겹치면 순번을 붙여 구분합니다.
+        """
+        task_id = item_dict.get('task_id')
+        if task_id is not None and str(task_id).strip():
+            key = f"{self.project_id}:task:{str(task_id).strip()}"
+        else:
+            key = f"{self.project_id}:name:{item_dict.get('task_name')}|{item_dict.get('assignee')}"
+
+        point_id = str(uuid.uuid5(WBS_POINT_ID_NAMESPACE, key))
+        occurrence = 1
+        while point_id in used_ids:
+            point_id = str(uuid.uuid5(WBS_POINT_ID_NAMESPACE, f"{key}#{occurrence}"))
+            occurrence += 1
+        used_ids.add(point_id)
+        return point_id
+
     def _prepare_item_for_storage(self, item_dict: Dict[str, Any], item_type: str, wbs_hash: str,
-                                 id_counter: int, assignee_name_for_workload: Optional[str] = None) -> Optional[tuple]:
+                                 id_counter: int, assignee_name_for_workload: Optional[str] = None,
+                                 row_hashes: Optional[List[str]] = None,
+                                 used_ids: Optional[set] = None) -> Optional[tuple]:
         """단일 항목을 저장 가능한 형태(문서 텍스트, 페이로드, ID)로 준비합니다."""
         if not isinstance(item_dict, dict):
             print(f"경고: 저장할 {item_type} 항목이 딕셔너리가 아닙니다. 건너뜁니다: {item_dict}")
@@ -181,44 +215,121 @@ class VectorDBHandler:
             "wbs_hash": wbs_hash,
             "original_data": json.dumps(item_dict, ensure_ascii=False, sort_keys=True)
         }
+        if row_hashes is not None:
+            payload["row_hashes"] = row_hashes # 증분 적재용 출처 행 해시
 
         task_id = item_dict.get('task_id')
         task_name = item_dict.get('task_name')
         assignee = item_dict.get('assignee')
         if task_name: doc_text_parts.append(f"작업명: {task_name}")
         if task_id: payload["task_id"] = str(task_id)
-        if assignee: payload["assignee"] = str(assignee)
+        if assignee:
+            payload["assignee"] = str(assignee)
+            # 서버 측 담당자 필터링용 정규화된 담당자 목록 (keyword payload 색인 대상)
+            payload["assignees"] = split_assignee_tokens(assignee)
         if item_dict.get('deliverables'): payload["has_deliverables"] = True
 
         doc_text = ", ".join(filter(None, doc_text_parts))
-        unique_id = str(uuid.uuid4())
+        unique_id = self._deterministic_point_id(item_dict, used_ids if used_ids is not None else set())
 
         return doc_text, payload, unique_id
 
 
-    def store_llm_analysis_results(self, llm_output_dict: Dict[str, Any], wbs_hash: str):
-        """LLM 분석 결과를 청킹(항목별 분리)하여 VectorDB(Qdrant)에 저장합니다."""
+    def _get_embedding_matrix(self, texts: List[str]) -> numpy.ndarray:
+        """적재할 텍스트를 한 번에 인코딩하여 (n, dim) float32 행렬로 반환합니다. (쿼리 캐시 미사용)"""
+        if self.embedding_model is None:
+            self._initialize_embedding_model()
+        return encode_texts_matrix(texts, self.embedding_model_name)
+
+    def _validate_vector_matrix(self, matrix: Any, expected_rows: int) -> numpy.ndarray:
+        """
+        임베딩 행렬의 shape/dtype을 한 번에 검증합니다. (벡터 원소마다 isinstance를 검사하던 O(n·dim) 루프 대체)
+        문제가 있으면 ValueError를 발생시킵니다.
+        """
+        matrix = numpy.asarray(matrix)
+        if matrix.ndim != 2 or matrix.shape[0] != expected_rows:
+            raise ValueError(f"임베딩 행렬 shape {matrix.shape}이 예상 ({expected_rows}, {self.embedding_dim})과 다릅니다.")
+        if matrix.shape[1] != self.embedding_dim:
+            raise ValueError(f"임베딩 차원({matrix.shape[1]})이 모델 차원({self.embedding_dim})과 다릅니다.")
+        if not numpy.issubdtype(matrix.dtype, numpy.floating):
+            raise ValueError(f"임베딩 dtype({matrix.dtype})이 실수형이 아닙니다.")
+        if not numpy.isfinite(matrix).all():
+            raise ValueError("임베딩에 NaN 또는 무한대 값이 포함되어 있습니다.")
+        return matrix.astype(numpy.float32, copy=False)
+
+    def _upsert_in_batches(self, ids: List[str], matrix: numpy.ndarray, payloads: List[Dict[str, Any]]) -> bool:
+        """
+        포인트를 QDRANT_UPSERT_BATCH_SIZE 크기의 Batch 요청으로 나누어 QDRANT_UPSERT_PARALLEL개씩 병렬 업서트합니다.
+        모든 배치가 성공하면 True를 반환합니다.
+        """
+        batch_size = max(1, QDRANT_UPSERT_BATCH_SIZE)
+        batches = [(start, min(start + batch_size, len(ids))) for start in range(0, len(ids), batch_size)]
+
+        def upsert_batch(bounds):
+            start, end = bounds
+            self.client.upsert(
+                collection_name=self.collection_name,
+                points=models.Batch(
+                    ids=list(ids[start:end]),
+                    vectors=matrix[start:end].tolist(), # 배치 단위로 한 번에 변환 (C 레벨 변환)
+                    payloads=list(payloads[start:end])
+                ),
+                wait=True
+            )
+
+        failed = 0
+        with ThreadPoolExecutor(max_workers=max(1, min(QDRANT_UPSERT_PARALLEL, len(batches)))) as executor:
+            futures = {executor.submit(upsert_batch, bounds): bounds for bounds in batches}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    failed += 1
+                    start, end = futures[future]
+                    print(f"VectorDB(Qdrant)에 데이터 추가/업데이트 중 오류 발생 (포인트 {start}~{end - 1}, 첫 번째 ID: {ids[start]}): {e}")
+                    payload_sample = str(payloads[start])[:200] + "..." if payloads[start] else "None"
+                    print(f"  오류 발생 배치의 첫 번째 포인트 페이로드 (샘플): {payload_sample}")
+
+        if failed:
+            print(f"오류: 업서트 배치 {len(batches)}개 중 {failed}개가 실패했습니다.")
+        return failed == 0
+
+    def store_llm_analysis_results(self, llm_output_dict: Dict[str, Any], wbs_hash: str,
+                                   task_row_hashes: Optional[List[List[str]]] = None,
+                                   reserved_ids: Optional[Iterable[str]] = None) -> Optional[List[str]]:
+        """
+        LLM 분석 결과를 청킹(항목별 분리)하여 VectorDB(Qdrant)에 저장합니다.
+        task_row_hashes가 주어지면 task_list와 같은 순서로 각 작업의 출처 행 해시를 payload에 저장합니다.
+        포인트 ID는 (project_id, task_id) 기반 uuid5이므로 같은 작업은 제자리에서 덮어씁니다(upsert).
+        reserved_ids(증분 적재에서 유지하는 포인트 ID)와 겹치는 ID는 사용하지 않으므로, 변경된 행의 작업이
+        변경되지 않은 행의 작업과 task_id가 같아도 유지할 포인트를 덮어쓰지 않습니다.
+        저장에 성공한 포인트 ID 목록을 반환하며, 임베딩/업서트 실패 시 None을 반환합니다.
+        """
         if not llm_output_dict or not isinstance(llm_output_dict, dict):
             print("저장할 LLM 분석 결과가 없거나 유효하지 않습니다.")
-            return
+            return None
 
         items_to_process: List[tuple] = []
         current_id_counter = 0
+        used_ids: set = set(reserved_ids or ())
 
         print(f"LLM 분석 결과 VectorDB(Qdrant) 저장 준비 중 (컬렉션: {self.collection_name})...")
 
         
         task_list_data = llm_output_dict.get("task_list", [])
         if isinstance(task_list_data, list):
-            for task_item in task_list_data:
-                prepared_item = self._prepare_item_for_storage(task_item, "task_item", wbs_hash, current_id_counter)
+            for task_index, task_item in enumerate(task_list_data):
+                row_hashes = task_row_hashes[task_index] if task_row_hashes is not None else None
+                prepared_item = self._prepare_item_for_storage(
+                    task_item, "task_item", wbs_hash, current_id_counter, row_hashes=row_hashes, used_ids=used_ids
+                )
                 if prepared_item: items_to_process.append(prepared_item); current_id_counter += 1
         elif task_list_data is not None:
             print(f"경고: 'task_list' 데이터가 예상한 리스트 형태가 아닙니다: {type(task_list_data)}")
 
         if not items_to_process:
             print("LLM 분석 결과에서 VectorDB에 저장할 청크된 데이터가 없습니다.")
-            return
+            return []
 
         docs_to_embed = [item[0] for item in items_to_process]
         payloads = [item[1] for item in items_to_process]
@@ -226,46 +337,16 @@ class VectorDBHandler:
 
         print(f"텍스트 {len(docs_to_embed)}건 임베딩 진행 중 (모델: {self.embedding_model_name})...")
         try:
-            vectors = self._get_embeddings(docs_to_embed)
+            vector_matrix = self._validate_vector_matrix(self._get_embedding_matrix(docs_to_embed), len(items_to_process))
         except Exception as e:
-            print(f"임베딩 생성 중 심각한 오류 발생: {e}. 데이터 저장을 중단합니다.")
-            return
-
-        if not vectors or len(vectors) != len(items_to_process):
-            print(f"오류: 임베딩 결과 수({len(vectors) if vectors else 0})와 처리할 항목 수({len(items_to_process)})가 일치하지 않거나 임베딩 결과가 없습니다. 데이터 저장을 중단합니다.")
-            return
-
-        points_to_add = []
-        for i in range(len(ids_for_points)):
-            if isinstance(vectors[i], list) and all(isinstance(x, float) for x in vectors[i]):
-                if isinstance(payloads[i], dict):
-                    points_to_add.append(PointStruct(id=ids_for_points[i], vector=vectors[i], payload=payloads[i]))
-                else:
-                    print(f"경고: ID {ids_for_points[i]}의 페이로드가 딕셔너리가 아닙니다 (타입: {type(payloads[i])}). 해당 포인트 저장 건너뜁니다.")
-            else:
-                print(f"경고: ID {ids_for_points[i]}의 벡터가 List[float] 형태가 아닙니다 (타입: {type(vectors[i])}). 해당 포인트 저장 건너뜁니다.")
-
+            print(f"임베딩 생성 또는 검증 중 심각한 오류 발생: {e}. 데이터 저장을 중단합니다.")
+            return None
 
-        if points_to_add:
-            print(f"VectorDB(Qdrant)에 새로운 포인트 {len(points_to_add)}개 추가/업데이트 중 (컬렉션: {self.collection_name})...")
-            try:
-                self.client.upsert(
-                    collection_name=self.collection_name,
-                    points=points_to_add,
-                    wait=True
-                )
-                print(f"데이터 {len(points_to_add)}건 추가/업데이트 완료.")
-            except Exception as e:
-                print(f"VectorDB(Qdrant)에 데이터 추가/업데이트 중 오류 발생: {e}")
-                if points_to_add:
-                    print(f"  오류 발생 시 첫 번째 포인트 ID (샘플): {points_to_add[0].id}")
-                    try:
-                        payload_sample = str(points_to_add[0].payload)[:200] + "..." if points_to_add[0].payload else "None"
-                        print(f"  오류 발생 시 첫 번째 포인트 페이로드 (샘플): {payload_sample}")
-                    except Exception as log_e:
-                        print(f"  페이로드 샘플 로깅 중 오류: {log_e}")
-        else:
-            print("VectorDB(Qdrant)에 저장할 유효한 포인트가 없습니다 (임베딩 실패, 데이터 형식 오류 또는 모든 항목이 필터링됨).")
+        print(f"VectorDB(Qdrant)에 새로운 포인트 {len(ids_for_points)}개 추가/업데이트 중 (컬렉션: {self.collection_name})...")
+        if not self._upsert_in_batches(ids_for_points, vector_matrix, payloads):
+            return None
+        print(f"데이터 {len(ids_for_points)}건 추가/업데이트 완료.")
+        return list(ids_for_points)
 
     def add_texts_with_metadata(self, texts: List[str], metadatas: List[Dict], ids: List[str]):
         """제공된 텍스트, 메타데이터(페이로드), ID를 사용하여 VectorDB(Qdrant) 컬렉션에 포인트를 추가/업데이트합니다."""
@@ -278,47 +359,63 @@ class VectorDBHandler:
             print(f"  Texts: {len(texts)}, Metadatas: {len(metadatas)}, IDs: {len(ids)}")
             return
 
-        print(f"텍스트 {len(texts)}건 임베딩 진행 중 (add_texts_with_metadata, 모델: {self.embedding_model_name})...")
-        try:
-            vectors = self._get_embeddings(texts)
-        except Exception as e:
-            print(f"임베딩 생성 중 심각한 오류 발생 (add_texts_with_metadata): {e}. 데이터 저장을 중단합니다.")
-            return
-
-        if not vectors or len(vectors) != len(texts):
-            print(f"오류 (add_texts_with_metadata): 임베딩 결과 수({len(vectors) if vectors else 0})와 텍스트 수({len(texts)})가 일치하지 않거나 임베딩 결과가 없습니다. 데이터 저장을 중단합니다.")
+        valid_positions = [i for i, metadata in enumerate(metadatas) if isinstance(metadata, dict)]
+        for i in set(range(len(ids))) - set(valid_positions):
+            print(f"경고 (add_texts_with_metadata): ID {ids[i]}의 메타데이터(페이로드)가 딕셔너리가 아닙니다 (타입: {type(metadatas[i])}). 해당 포인트 저장 건너뜁니다.")
+        if not valid_positions:
+            print("VectorDB(Qdrant)에 저장할 유효한 포인트가 없습니다 (데이터 형식 오류로 모든 항목이 필터링됨, via add_texts_with_metadata).")
             return
 
-        points_to_add = []
-        for i in range(len(ids)):
-            if not isinstance(vectors[i], list) or not all(isinstance(x, float) for x in vectors[i]):
-                print(f"경고 (add_texts_with_metadata): ID {ids[i]}의 벡터가 List[float] 형태가 아닙니다 (타입: {type(vectors[i])}). 해당 포인트 저장 건너뜁니다.")
-                continue
-            if not isinstance(metadatas[i], dict):
-                print(f"경고 (add_texts_with_metadata): ID {ids[i]}의 메타데이터(페이로드)가 딕셔너리가 아닙니다 (타입: {type(metadatas[i])}). 해당 포인트 저장 건너뜁니다.")
-                continue
-
-            points_to_add.append(
-                PointStruct(id=ids[i], vector=vectors[i], payload=metadatas[i])
+        print(f"텍스트 {len(valid_positions)}건 임베딩 진행 중 (add_texts_with_metadata, 모델: {self.embedding_model_name})...")
+        try:
+            vector_matrix = self._validate_vector_matrix(
+                self._get_embedding_matrix([texts[i] for i in valid_positions]), len(valid_positions)
             )
+        except Exception as e:
+            print(f"임베딩 생성 또는 검증 중 심각한 오류 발생 (add_texts_with_metadata): {e}. 데이터 저장을 중단합니다.")
+            return
 
-        if points_to_add:
-            print(f"VectorDB(Qdrant)에 새로운 포인트 {len(points_to_add)}개 추가/업데이트 중 (컬렉션: {self.collection_name}, via add_texts_with_metadata)...")
-            try:
-                self.client.upsert(
-                    collection_name=self.collection_name,
-                    points=points_to_add,
-                    wait=True
-                )
-                print(f"데이터 {len(points_to_add)}건 추가/업데이트 완료 (via add_texts_with_metadata).")
-            except Exception as e:
-                print(f"VectorDB(Qdrant)에 데이터 추가/업데이트 중 오류 발생 (add_texts_with_metadata): {e}")
-                if points_to_add:
-                    print(f"  오류 발생 시 첫 번째 포인트 ID (샘플): {points_to_add[0].id}")
-                    try:
-                        payload_sample = str(points_to_add[0].payload)[:200] + "..." if points_to_add[0].payload else "None"
-                        print(f"  오류 발생 시 첫 번째 포인트 페이로드 (샘플): {payload_sample}")
-                    except Exception as log_e:
-                        print(f"  페이로드 샘플 로깅 중 오류 (add_texts_with_metadata): {log_e}")
-        else:
-            print("VectorDB(Qdrant)에 저장할 유효한 포인트가 없습니다 (임베딩 실패, 데이터 형식 오류 또는 모든 항목이 필터링됨, via add_texts_with_metadata).")
\ No newline at end of file
+        print(f"VectorDB(Qdrant)에 새로운 포인트 {len(valid_positions)}개 추가/업데이트 중 (컬렉션: {self.collection_name}, via add_texts_with_metadata)...")
+        if self._upsert_in_batches([ids[i] for i in valid_positions], vector_matrix, [metadatas[i] for i in valid_positions]):
+            print(f"데이터 {len(valid_positions)}건 추가/업데이트 완료 (via add_texts_with_metadata).")
+
+
+def benchmark_vector_postprocessing(point_counts=(1000, 10000, 50000), dim: int = 384, batch_size: int = 256):
+    """
+    Qdrant 전송 전 클라이언트 측 후처리 비용을 포인트당 마이크로초로 비교합니다. (Qdrant 연결 불필요)
+    - 기존: 행마다 tolist() + 원소마다 isinstance 검사 + PointStruct 생성
+    - 변경: 행렬 shape/dtype/유한값 검증 1회 + 배치 단위 tolist() + Batch 생성
+    """
+    import time
+
+    print(f"{'포인트 수':>10} | {'기존(us/point)':>15} | {'변경(us/point)':>15} | 배속")
+    for count in point_counts:
+        matrix = numpy.random.default_rng(0).standard_normal((count, dim)).astype(numpy.float32)
+        ids = [str(uuid.uuid4()) for _ in range(count)]
+        payloads = [{"project_id": "benchmark", "index": i} for i in range(count)]
+
+        started_at = time.perf_counter()
+        vectors = [row.tolist() for row in matrix]
+        legacy_points = [
+            PointStruct(id=ids[i], vector=vectors[i], payload=payloads[i])
+            for i in range(count)
+            if isinstance(vectors[i], list) and all(isinstance(x, float) for x in vectors[i])
+        ]
+        legacy_us = (time.perf_counter() - started_at) / count * 1e6
+
+        started_at = time.perf_counter()
+        checked = numpy.asarray(matrix)
+        assert checked.ndim == 2 and checked.shape == (count, dim) and numpy.isfinite(checked).all()
+        batches = [
+            models.Batch(ids=ids[start:start + batch_size], vectors=checked[start:start + batch_size].tolist(),
+                         payloads=payloads[start:start + batch_size])
+            for start in range(0, count, batch_size)
+        ]
+        vectorized_us = (time.perf_counter() - started_at) / count * 1e6
+
+        assert len(legacy_points) == sum(len(batch.ids) for batch in batches)
+        print(f"{count:>10} | {legacy_us:>15.2f} | {vectorized_us:>15.2f} | {legacy_us / vectorized_us:.1f}x")
+
+
+if __name__ == "__main__":
+    benchmark_vector_postprocessing()
@@ -0,0 +1,137 @@
+import bisect
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# WBS 행 단위 변경 감지 유틸리티
+# - 각 행(레코드)의 내용으로 row_hash를 만들고, Qdrant 작업 포인트 payload의 row_hashes와 비교합니다.
+# - 행 번호는 해시에서 제외하므로, 행 삽입/삭제로 아래 행들이 밀려도 내용이 같으면 변경으로 보지 않습니다.
+
+ROW_NUMBER_FIELD = "row_number"
+
+def compute_row_hash(record: Dict[str, Any]) -> str:
+    """행 번호를 제외한 행 내용의 SHA256 해시를 계산합니다."""
+    content = {k: v for k, v in record.items() if k != ROW_NUMBER_FIELD}
+    return hashlib.sha256(json.dumps(content, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def build_rows(records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    레코드 목록을 {row_hash, row_number, record} 목록으로 변환합니다.
+    내용이 완전히 같은 행이 여러 개면 두 번째부터 ':<순번>'을 붙여 서로 구분합니다.
+    """
+    rows: List[Dict[str, Any]] = []
+    seen: Dict[str, int] = {}
+    for record in records:
+        row_hash = compute_row_hash(record)
+        occurrence = seen.get(row_hash, 0)
+        seen[row_hash] = occurrence + 1
+        if occurrence:
+            row_hash = f"{row_hash}:{occurrence}"
+        rows.append({"row_hash": row_hash, "row_number": record.get(ROW_NUMBER_FIELD), "record": record})
+    return rows
+
+
+class WBSDiffPlan:
+    """저장된 작업 포인트와 현재 WBS 행을 비교한 증분 적재 계획"""
+
+    def __init__(self, rows_to_analyze: List[Dict[str, Any]], stale_point_ids: List[str],
+                 kept_point_ids: List[str], total_rows: int):
+        self.rows_to_analyze = rows_to_analyze
+        self.stale_point_ids = stale_point_ids
+        self.kept_point_ids = kept_point_ids
+        self.total_rows = total_rows
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.rows_to_analyze or self.stale_point_ids)
+
+    @property
+    def change_ratio(self) -> float:
+        return len(self.rows_to_analyze) / self.total_rows if self.total_rows else 1.0
+
+    def summary(self) -> str:
+        return (f"전체 {self.total_rows}행 중 재분석 {len(self.rows_to_analyze)}행, "
+                f"삭제 포인트 {len(self.stale_point_ids)}개, 유지 포인트 {len(self.kept_point_ids)}개")
+
+
+def plan_incremental_update(rows: List[Dict[str, Any]], stored_row_hashes: Dict[str, Optional[List[str]]]) -> Optional[WBSDiffPlan]:
+    """
+    증분 적재 계획을 세웁니다.
+    - 출처 행 중 하나라도 현재 WBS에 없는 포인트는 삭제 대상입니다. (수정 또는 삭제된 행)
+    - 유지되는 포인트가 다루지 않는 현재 행만 LLM 재분석 대상입니다.
+    row_hashes가 없는 (이전 방식으로 적재된) 포인트가 있으면 증분 적재가 불가능하므로 None을 반환합니다.
+    """
+    if any(hashes is None for hashes in stored_row_hashes.values()):
+        return None
+
+    current_hashes: Set[str] = {row["row_hash"] for row in rows}
+    stale_point_ids: List[str] = []
+    kept_point_ids: List[str] = []
+    covered_hashes: Set[str] = set()
+
+    for point_id, hashes in stored_row_hashes.items():
+        if hashes and set(hashes) <= current_hashes:
+            kept_point_ids.append(point_id)
+            covered_hashes.update(hashes)
+        else:
+            stale_point_ids.append(point_id)
+
+    rows_to_analyze = [row for row in rows if row["row_hash"] not in covered_hashes]
+    return WBSDiffPlan(rows_to_analyze, stale_point_ids, kept_point_ids, len(rows))
+
+
+def _normalize_key(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+def attribute_tasks_to_rows(task_list: List[Dict[str, Any]], rows: List[Dict[str, Any]]) -> List[List[str]]:
+    """
+    LLM이 추출한 각 작업이 어떤 WBS 행에서 나왔는지 row_hash 목록으로 연결합니다.
+    1) task_name 또는 task_id가 정확히 한 행의 셀 값(또는 행 번호)과 일치하면 그 행에 연결합니다.
+    2) 어떤 작업과도 연결되지 않은 행(구분 행, 병합 셀로 나뉜 행 등)은 가장 가까운 다음(없으면 이전) 연결 행의 작업에 붙입니다.
+    3) 어떤 행과도 연결되지 않은 작업은 분석에 사용한 모든 행에 연결합니다. (해당 행이 바뀌면 다시 분석됨)
+    """
+    if not rows:
+        return [[] for _ in task_list]
+
+    # 여러 행에 등장하는 값은 어느 행인지 특정할 수 없으므로 -1로 표시합니다.
+    value_to_row: Dict[str, int] = {}
+    for position, row in enumerate(rows):
+        keys = {_normalize_key(value) for value in row["record"].values()}
+        keys.add(_normalize_key(row.get("row_number")))
+        for key in keys:
+            if key:
+                value_to_row[key] = position if key not in value_to_row else -1
+
+    task_rows: List[Optional[int]] = []
+    for task in task_list:
+        position = None
+        if isinstance(task, dict):
+            for field_name in ("task_name", "task_id"):
+                key = _normalize_key(task.get(field_name))
+                if key and value_to_row.get(key, -1) >= 0:
+                    position = value_to_row[key]
+                    break
+        task_rows.append(position)
+
+    matched_positions = sorted({p for p in task_rows if p is not None})
+    extra_rows_by_position: Dict[int, List[int]] = {p: [] for p in matched_positions}
+    if matched_positions:
+        for position in range(len(rows)):
+            if position in extra_rows_by_position:
+                continue
+            next_index = bisect.bisect_right(matched_positions, position)
+            target = matched_positions[next_index] if next_index < len(matched_positions) else matched_positions[-1]
+            extra_rows_by_position[target].append(position)
+
+    all_row_hashes = [row["row_hash"] for row in rows]
+    attributed: List[List[str]] = []
+    for position in task_rows:
+        if position is None:
+            attributed.append(list(all_row_hashes))
+        else:
+            positions = [position] + extra_rows_by_position.get(position, [])
+            attributed.append([rows[p]["row_hash"] for p in sorted(positions)])
+    return attributed
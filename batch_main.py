@@ -10,11 +10,11 @@ import schedule
 # 현재 디렉토리를 sys.path에 추가
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
 
-from ai.graphs.daily_graph import create_analysis_graph 
+from ai.graphs.graph_registry import GRAPH_DAILY, get_compiled_graph
 from ai.graphs.state_definition import LangGraphState
 
-from langchain.globals import set_llm_cache
-set_llm_cache(None)
+from ai.utils.llm_cache import configure_llm_cache
+configure_llm_cache()
 
 # 하드코딩된 사용자 데이터
 HARDCODED_USERS = [
@@ -70,7 +70,7 @@ def run_analysis_workflow(user_config):
 
     try:
         # LangGraph 워크플로우 실행
-        app = create_analysis_graph()
+        app = get_compiled_graph(GRAPH_DAILY)
         final_state = app.invoke(initial_state)
 
         # 보고서 저장
@@ -14,10 +14,20 @@ CLAUDE_MODEL = os.getenv("CLAUDE_MODEL", "claude-3-7-sonnet-20250219")
 
 # --- HuggingFace 임베딩 모델 ---
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "paraphrase-multilingual-MiniLM-L12-v2")
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096")) # 쿼리 임베딩 LRU 캐시 최대 항목 수 (0 = 비활성화)
 
 # --- Qdrant 설정 ---
 QDRANT_HOST = os.getenv("QDRANT_HOST")
 QDRANT_PORT = int(os.getenv("QDRANT_PORT"))
+QDRANT_GRPC_PORT = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+QDRANT_PREFER_GRPC = os.getenv("QDRANT_PREFER_GRPC", "false").lower() == "true" # gRPC 연결 우선 사용 여부
+QDRANT_UPSERT_BATCH_SIZE = int(os.getenv("QDRANT_UPSERT_BATCH_SIZE", "256")) # 업서트 요청 1회당 포인트 수
+QDRANT_UPSERT_PARALLEL = int(os.getenv("QDRANT_UPSERT_PARALLEL", "4")) # 동시에 보낼 업서트 배치 수
+QDRANT_TIMEOUT_SECONDS = int(os.getenv("QDRANT_TIMEOUT_SECONDS")) if os.getenv("QDRANT_TIMEOUT_SECONDS") else None # 요청 타임아웃 (미설정 시 클라이언트 기본값)
+QDRANT_SCROLL_PAGE_SIZE = int(os.getenv("QDRANT_SCROLL_PAGE_SIZE", "50")) # scroll 요청 1회당 포인트 수
+QDRANT_SCROLL_MAX_POINTS = int(os.getenv("QDRANT_SCROLL_MAX_POINTS", "0")) # 조회 1회당 최대 포인트 수 (0 = 제한 없음)
+README_CACHE_TTL_SECONDS = int(os.getenv("README_CACHE_TTL_SECONDS", "3600")) # Git README 캐시 유지 시간 (0 = 캐시 사용 안 함)
+WBS_ASSIGNEE_FILTER_SERVER_SIDE = os.getenv("WBS_ASSIGNEE_FILTER_SERVER_SIDE", "false").lower() == "true" # WBS 담당자 필터를 Qdrant payload 색인으로 수행
 
 # --- 컬렉션 이름 ---
 COLLECTION_DOCUMENTS = "Documents"
@@ -35,6 +45,48 @@ DATA_DIR = os.path.join(PROJECT_ROOT_DIR, "data") # 원본 데이터 저장 경
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
+# --- WBS 적재 설정 ---
+WBS_SHEET_NAMES = [name.strip() for name in os.getenv("WBS_SHEET_NAMES", "").split(",") if name.strip()] # 적재할 시트 이름 (비우면 모든 시트)
+WBS_INCREMENTAL_MAX_CHANGE_RATIO = float(os.getenv("WBS_INCREMENTAL_MAX_CHANGE_RATIO", "0.5")) # 변경 행 비율이 이 값을 넘으면 전체 재적재
+WBS_LLM_CHUNK_TOKENS = int(os.getenv("WBS_LLM_CHUNK_TOKENS", "6000")) # WBS 분석 청크당 최대 입력 토큰 수
+WBS_LLM_CHUNK_WORKERS = int(os.getenv("WBS_LLM_CHUNK_WORKERS", "4")) # 동시에 분석할 청크 수
+WBS_LLM_CHUNK_RETRIES = int(os.getenv("WBS_LLM_CHUNK_RETRIES", "2")) # 청크별 재시도 횟수
+WBS_DOWNLOAD_STATE_PATH = os.getenv("WBS_DOWNLOAD_STATE_PATH") or os.path.join(DATA_DIR, "wbs_download_state.json") # WBS 파일별 다운로드/적재 상태 파일
+WBS_DOWNLOAD_SPOOL_BYTES = int(os.getenv("WBS_DOWNLOAD_SPOOL_BYTES", str(16 * 1024 * 1024))) # 이 크기까지는 다운로드 본문을 메모리에 보관
+WBS_INGESTION_MAX_WORKERS = int(os.getenv("WBS_INGESTION_MAX_WORKERS", "2")) # 동시에 적재할 프로젝트 수
+WBS_INGESTION_WATERMARK_PATH = os.getenv("WBS_INGESTION_WATERMARK_PATH") or os.path.join(DATA_DIR, "wbs_ingestion_watermark.json") # 마지막 WBS 적재 실행 정보
+WBS_INGESTION_SCHEDULE_TIMES = [t.strip() for t in os.getenv("WBS_INGESTION_SCHEDULE_TIMES", "07:00").split(",") if t.strip()] # wbs_main.py auto 실행 시각 (HH:MM, 쉼표 구분)
+DAILY_REPORT_INGEST_WBS = os.getenv("DAILY_REPORT_INGEST_WBS", "false").lower() == "true" # Daily 보고서 생성 전에 WBS 적재도 함께 실행
+WBS_DOWNLOAD_TIMEOUT_SECONDS = int(os.getenv("WBS_DOWNLOAD_TIMEOUT_SECONDS", "60")) # WBS 파일 다운로드 타임아웃
+
+# --- 배치 실행 설정 ---
+JOB_MAX_CONCURRENT_JOBS = int(os.getenv("JOB_MAX_CONCURRENT_JOBS", "1")) # 동시에 실행할 백그라운드 보고서 작업 수
+JOB_HISTORY_SIZE = int(os.getenv("JOB_HISTORY_SIZE", "100")) # 조회용으로 보관할 작업 수
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH") or os.path.join(DATA_DIR, "job_store.sqlite3") # 보고서 배치 작업 항목 상태 저장소 (SQLite)
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "1800")) # 작업 항목 임대 시간. 지나면 다른 워커가 다시 가져감
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3")) # 실패 항목을 재실행 시 다시 시도할 최대 횟수
+JOB_SKIP_SUBMITTED = os.getenv("JOB_SKIP_SUBMITTED", "true").lower() == "true" # 이미 제출된 Daily 보고서는 다시 생성하지 않음
+SHARD_MODE = os.getenv("SHARD_MODE", "off").lower() # 레플리카 간 배치 분할 방식: off / hash
+SHARD_PEERS_HOST = os.getenv("SHARD_PEERS_HOST", "localhost") # hash 모드에서 레플리카 IP 목록을 조회할 헤드리스 서비스 이름
+SHARD_PEER_PORT = int(os.getenv("SHARD_PEER_PORT", "8000")) # 다른 레플리카에 요청을 전달할 포트
+SHARD_FANOUT_TIMEOUT_SECONDS = int(os.getenv("SHARD_FANOUT_TIMEOUT_SECONDS", "10")) # 레플리카별 요청 전달 타임아웃
+DAILY_REPORT_MAX_WORKERS = int(os.getenv("DAILY_REPORT_MAX_WORKERS", "4")) # 동시에 처리할 사용자 수 (1이면 순차 실행)
+DAILY_REPORT_ASYNC_GRAPH = os.getenv("DAILY_REPORT_ASYNC_GRAPH", "false").lower() == "true" # 사용자별 그래프를 app.ainvoke로 실행해 소스별/파일별 LLM 호출을 겹쳐 실행
+ACTIVITY_CENSUS_ENABLED = os.getenv("ACTIVITY_CENSUS_ENABLED", "true").lower() == "true" # Daily 그래프 실행 전 소스별 활동 건수를 세어 빈 소스의 분석/보고서 생성 LLM 호출을 생략
+
+# --- LLM 응답 캐시 ---
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true" # 동일한 (모델 설정, 프롬프트) 호출의 응답을 재사용
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH") or os.path.join(DATA_DIR, "llm_cache.sqlite3") # 응답 캐시 저장소 (SQLite)
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600))) # 캐시 항목 유효 시간 (0 = 만료 없음)
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000")) # 최대 항목 수. 넘으면 오래 사용되지 않은 항목부터 삭제
+LLM_CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS", "false").lower() == "true" # 캐시를 조회하지 않고 새 응답으로 갱신 (새로 생성해야 하는 실행용)
+
+# --- LLM 공급자별 호출 예산 (RPM 0 = 제한 없음) ---
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
+OPENAI_RPM = int(os.getenv("OPENAI_RPM", "0"))
+ANTHROPIC_MAX_CONCURRENCY = int(os.getenv("ANTHROPIC_MAX_CONCURRENCY", "4"))
+ANTHROPIC_RPM = int(os.getenv("ANTHROPIC_RPM", "0"))
+
 API_BASE_URL = os.getenv("API_BASE_URL")
 API_AUTHORIZATION = os.getenv("API_AUTHORIZATION")
 API_KEY = os.getenv("API_KEY")
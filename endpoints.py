@@ -1,27 +1,101 @@
-from fastapi import APIRouter
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
 
 from service.daily_report_service import daily_report_service
+from service.job_manager import get_job_manager
+from service.sharding import fan_out_shards, requested_shard, shard_params
 from service.team_weekly_service import team_weekly_report_service
 from service.weekly_report_service import weekly_report_service
+from service.wbs_ingestion_service import get_wbs_ingestion_watermark, wbs_ingestion_service
 
 
 router = APIRouter()
 
+# 보고서 생성 엔드포인트는 배치를 백그라운드 작업으로 등록하고 job_id를 즉시 반환합니다.
+# 진행 상황은 /jobs/{job_id}로 조회합니다. force=true이면 이전 실행에서 완료된 항목도 다시 생성합니다.
+# SHARD_MODE=hash이면 요청을 받은 레플리카가 다른 레플리카들에 샤드 번호(shard_index/shard_count)를 붙여 요청을 전달하고,
+# 자기 샤드만 처리합니다. (다른 레플리카에 전달할 때 블로킹 HTTP 호출을 하므로 보고서 엔드포인트는 동기 함수로 둡니다.)
+
+def _submit_report_job(kind: str, path: str, func: Callable[..., Any], shard_index: Optional[int], shard_count: Optional[int], **params) -> Dict[str, Any]:
+  try:
+    shard = requested_shard(shard_index, shard_count)
+  except ValueError as e:
+    raise HTTPException(status_code=400, detail=str(e))
+
+  peer_jobs: List[Dict[str, Any]] = []
+  if shard is None:
+    shard, peer_jobs = fan_out_shards(path, params)
+
+  job = get_job_manager().submit(kind, func, **params, **shard_params(shard))
+  result = job.to_dict()
+  if peer_jobs:
+    result["peer_jobs"] = peer_jobs
+  return result
+
 @router.get("/", tags=["Root"])
 def read_root():
     return {"message": "Hello from FastAPI"}
-  
+
 @router.get("/daily", tags=["보고서 생성"])
-async def create_daily():
-  daily_report_service()
-  return
+def create_daily(
+  team_id: Optional[int] = None,
+  user_ids: Optional[List[int]] = Query(None),
+  target_date: Optional[str] = None,
+  force: bool = False,
+  shard_index: Optional[int] = None,
+  shard_count: Optional[int] = None
+):
+  return _submit_report_job(
+    "daily", "/daily", daily_report_service, shard_index, shard_count,
+    team_id=team_id, user_ids=user_ids, target_date=target_date, force=force
+  )
 
 @router.get("/weekly", tags=["보고서 생성"])
-async def create_weekly():
-  weekly_report_service()
-  return
+def create_weekly(
+  team_id: Optional[int] = None,
+  user_ids: Optional[List[int]] = Query(None),
+  start_date: Optional[str] = None,
+  end_date: Optional[str] = None,
+  force: bool = False,
+  shard_index: Optional[int] = None,
+  shard_count: Optional[int] = None
+):
+  return _submit_report_job(
+    "weekly", "/weekly", weekly_report_service, shard_index, shard_count,
+    team_id=team_id, user_ids=user_ids, start_date=start_date, end_date=end_date, force=force
+  )
 
 @router.get("/team-weekly", tags=["보고서 생성"])
-async def create_team_weekly():
-  team_weekly_report_service()
-  return
\ No newline at end of file
+def create_team_weekly(
+  team_id: Optional[int] = None,
+  start_date: Optional[str] = None,
+  end_date: Optional[str] = None,
+  force: bool = False,
+  shard_index: Optional[int] = None,
+  shard_count: Optional[int] = None
+):
+  return _submit_report_job(
+    "team-weekly", "/team-weekly", team_weekly_report_service, shard_index, shard_count,
+    team_id=team_id, start_date=start_date, end_date=end_date, force=force
+  )
+
+@router.get("/wbs-ingest", tags=["WBS 적재"])
+async def ingest_wbs():
+  job = get_job_manager().submit("wbs-ingest", wbs_ingestion_service)
+  return job.to_dict()
+
+@router.get("/wbs-ingest/watermark", tags=["WBS 적재"])
+async def read_wbs_watermark():
+  return get_wbs_ingestion_watermark()
+
+@router.get("/jobs", tags=["작업 조회"])
+async def list_jobs():
+  return [job.to_dict() for job in get_job_manager().list()]
+
+@router.get("/jobs/{job_id}", tags=["작업 조회"])
+async def read_job(job_id: str):
+  job = get_job_manager().get(job_id)
+  if job is None:
+    raise HTTPException(status_code=404, detail=f"작업을 찾을 수 없습니다: {job_id}")
+  return job.to_dict()
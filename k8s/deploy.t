@@ -22,4 +22,11 @@ spec:
         - name: USER_NAME
           value: ${USER_NAME}
         - name: NAMESPACE
-          value: ${NAMESPACE}
\ No newline at end of file
+          value: ${NAMESPACE}
+        # 레플리카 간 보고서 배치 분할 (기본 off). hash로 바꾸면 요청을 받은 파드가 헤드리스 서비스로 찾은 다른 파드들에 샤드를 나눠 전달
+        - name: SHARD_MODE
+          value: "off"
+        - name: SHARD_PEERS_HOST
+          value: "${USER_NAME}-${SERVICE_NAME}-peers.${NAMESPACE}.svc.cluster.local"
+        - name: SHARD_PEER_PORT
+          value: "${CONTAINER_PORT}"
\ No newline at end of file
@@ -12,3 +12,19 @@ spec:
       port: ${CONTAINER_PORT}
       targetPort: ${CONTAINER_PORT}
   type: ClusterIP
+---
+# 샤딩(SHARD_MODE=hash) 시 레플리카 파드 IP 목록 조회용 헤드리스 서비스
+apiVersion: v1
+kind: Service
+metadata:
+  name: ${USER_NAME}-${SERVICE_NAME}-peers
+  namespace: ${NAMESPACE}
+spec:
+  clusterIP: None
+  selector:
+    app: ${USER_NAME}-${SERVICE_NAME}
+  ports:
+    - name: http
+      protocol: TCP
+      port: ${CONTAINER_PORT}
+      targetPort: ${CONTAINER_PORT}
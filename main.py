@@ -1,7 +1,13 @@
 from fastapi import FastAPI
 import endpoints
+from ai.graphs.graph_registry import warmup_graphs
 
 
 app = FastAPI()
 
+@app.on_event("startup")
+def compile_graphs_on_startup():
+    # 모든 보고서 그래프를 프로세스 시작 시 한 번만 컴파일하여 요청마다 재사용합니다.
+    warmup_graphs()
+
 app.include_router(endpoints.router)
\ No newline at end of file
@@ -1,24 +1,34 @@
 # main.py
 from datetime import date
-import os
-import tempfile
-from typing import List
+import statistics
+import time
+from typing import List, Optional, Tuple
 from dotenv import load_dotenv
 from pprint import pprint
 import json
 
 import requests
 
-from service.run_wbs_analyzer import run_wbs_agent
-from api.dto.response.team_info_response import FileInfo
+from service.job_manager import ITEM_FAILED, ITEM_SKIPPED, ITEM_SUCCESS, JobProgress
+from service.job_store import run_work_items
+from service.sharding import to_shard_spec
+from service.report_scope import filter_teams, filter_users
+from service.wbs_ingestion_service import collect_wbs_files, get_wbs_ingestion_watermark, ingest_wbs_files
 from schemas.user_info import ProjectInfo, UserInfo 
 
 from api.api_client import APIClient
-from ai.graphs.daily_graph import create_analysis_graph 
+from core import config
+from ai.graphs.graph_registry import GRAPH_DAILY, get_compiled_graph, get_graph_reuse_report, warmup_graphs
 from ai.graphs.state_definition import LangGraphState
+from ai.tools.activity_census import get_activity_census_stats
+from ai.utils.async_runner import run_coroutine
+from ai.utils.embed_query import get_embedding_cache_stats
+from ai.tools.vector_db_retriever import get_payload_transfer_stats, get_readme_cache_stats
+from ai.tools.wbs_retriever_tool import get_wbs_task_cache_stats
+from ai.utils.rate_limiter import get_rate_budget_stats
 
-from langchain.globals import set_llm_cache
-set_llm_cache(None)
+from ai.utils.llm_cache import configure_llm_cache, get_llm_cache_stats
+configure_llm_cache()
 
 def run_analysis_workflow(user_info: UserInfo, target_date: str = date.today().isoformat()):
 
@@ -40,10 +50,14 @@ def run_analysis_workflow(user_info: UserInfo, target_date: str = date.today().i
     )
 
     try:
-        app = create_analysis_graph()
+        app = get_compiled_graph(GRAPH_DAILY)
 
         print("\n--- LangGraph 워크플로우 실행 시작 ---")
-        final_state = app.invoke(initial_state)
+        if config.DAILY_REPORT_ASYNC_GRAPH:
+            # 분석 노드들의 LLM 호출(소스별, 문서 품질 평가의 파일별)을 공유 이벤트 루프에서 겹쳐 실행
+            final_state = run_coroutine(app.ainvoke(initial_state))
+        else:
+            final_state = app.invoke(initial_state)
         print("--- LangGraph 워크플로우 실행 완료 ---\n")
 
         print("최종 분석 결과 (State 내용):")
@@ -93,84 +107,160 @@ def run_analysis_workflow(user_info: UserInfo, target_date: str = date.today().i
         print(f"워크플로우 실행 중 예상치 못한 오류 발생: {e}")
         traceback.print_exc()
 
-def download_wbs(project_id: int, files: List[FileInfo]):
-    for file in files:
-        tmp_path = None
-        try:
-            # 파일 다운로드 요청
-            response = requests.get(file.file_url)
-            response.raise_for_status()
-
-            # 임시 파일로 저장
-            file_ext = os.path.splitext(file.original_file_name)[-1].lower()
-            if file_ext in [".xls", ".xlsx"]:
-                with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.original_file_name)[-1]) as tmp_file:
-                    tmp_file.write(response.content)
-                    tmp_path = tmp_file.name
-
-                print(f"[다운로드 완료] 임시 파일 경로: {tmp_path}")
-
-                # Agent 실행
-                success_status = run_wbs_agent(
-                    project_id=project_id,
-                    wbs_file_path=tmp_path
-                )
-
-                if success_status:
-                    print(f"[성공] WBS agent 실행 성공 - 파일: {file.original_file_name}")
-                else:
-                    print(f"[실패] WBS agent 실행 실패 - 파일: {file.original_file_name}")
-
-        except requests.RequestException as e:
-            print(f"[에러] 파일 다운로드 중 오류 발생 - 파일: {file.original_file_name} | 에러: {e}")
-        except Exception as e:
-            print(f"[에러] 예기치 못한 오류 발생 - 파일: {file.original_file_name} | 에러: {e}")
-        finally:
-            # 임시 파일 삭제
-            if tmp_path and os.path.exists(tmp_path):
-                os.remove(tmp_path)
-                print(f"[삭제 완료] {tmp_path}")
+def _build_member_user_infos(team) -> List[UserInfo]:
+    """팀 정보에서 보고서 생성 대상 멤버의 UserInfo 목록을 구성합니다."""
+    projects = [
+        ProjectInfo(
+            id = proj.id,
+            name = proj.name,
+            start_date = proj.start_date,
+            end_date = proj.end_date,
+            description = proj.description,
+            progress = proj.progress or 0
+        )
+        for proj in team.projects
+    ]
+    return [
+        UserInfo(
+            id=member.id,
+            name=member.name,
+            email=member.email,
+            team_id=team.id,
+            team_name=team.name,
+            projects=projects
+        )
+        for member in team.members
+        if not member.id == 0
+    ]
 
-        
-def daily_report_service():
+def _run_member_workflow_timed(user_info: UserInfo, target_date: str) -> Tuple[Optional[dict], float, Optional[str]]:
+    """워커 스레드에서 단일 사용자 워크플로우를 실행하고 (보고서, 소요 시간(초), 오류)를 반환합니다."""
+    started_at = time.perf_counter()
+    try:
+        daily_report = run_analysis_workflow(user_info, target_date)
+        return daily_report, time.perf_counter() - started_at, None
+    except Exception as e:
+        return None, time.perf_counter() - started_at, str(e)
+
+def _is_daily_report_submitted(client: APIClient, user_id: int, target_date: str) -> bool:
+    """해당 날짜의 Daily 보고서가 이미 제출되어 있는지 확인합니다. 조회에 실패하면 제출되지 않은 것으로 봅니다."""
+    try:
+        return bool(client.get_user_daily_reports(user_id=user_id, start_date=target_date, end_date=target_date))
+    except requests.RequestException as e:
+        print(f"[경고] 사용자 {user_id} 제출 여부 확인 실패, 보고서를 생성합니다: {e}")
+        return False
+
+def _print_batch_summary(latencies: List[Tuple[str, float, str]], wall_seconds: float, max_workers: int):
+    """사용자별 처리 시간과 전체 처리량을 출력합니다."""
+    print("\n=== Daily 보고서 배치 실행 결과 ===")
+    if not latencies:
+        print("처리된 사용자가 없습니다.")
+        return
+
+    for user_name, seconds, status in sorted(latencies, key=lambda x: x[1], reverse=True):
+        print(f"  - {user_name}: {seconds:.1f}초 ({status})")
+
+    durations = sorted(seconds for _, seconds, _ in latencies)
+    success_count = sum(1 for _, _, status in latencies if status == "success")
+    p95_index = min(len(durations) - 1, int(len(durations) * 0.95))
+    throughput = len(latencies) / wall_seconds * 60 if wall_seconds > 0 else 0.0
+
+    print(f"성공: {success_count}/{len(latencies)}명 (동시 실행 수: {max_workers})")
+    print(f"사용자별 소요 시간 - 평균: {statistics.mean(durations):.1f}초, 중앙값: {statistics.median(durations):.1f}초, p95: {durations[p95_index]:.1f}초, 최대: {durations[-1]:.1f}초")
+    print(f"전체 소요 시간: {wall_seconds:.1f}초, 처리량: {throughput:.2f}명/분")
+    for provider, stats in get_rate_budget_stats().items():
+        print(f"LLM 호출 예산 [{provider}]: {stats}")
+    for name, report in get_graph_reuse_report().items():
+        print(f"그래프 재사용 [{name}]: {report}")
+    print(f"쿼리 임베딩 캐시: {get_embedding_cache_stats()}")
+    print(f"Qdrant payload 수신량: {get_payload_transfer_stats()}")
+    print(f"Git README 캐시: {get_readme_cache_stats()}")
+    print(f"WBS 작업 캐시: {get_wbs_task_cache_stats()}")
+    print(f"활동 사전 점검 (생략된 소스/LLM 호출): {get_activity_census_stats()}")
+    print(f"LLM 응답 캐시: {get_llm_cache_stats()}")
+
+def daily_report_service(
+    max_workers: Optional[int] = None,
+    ingest_wbs: Optional[bool] = None,
+    team_id: Optional[int] = None,
+    user_ids: Optional[List[int]] = None,
+    target_date: Optional[str] = None,
+    shard_indexes: Optional[List[int]] = None,
+    shard_count: Optional[int] = None,
+    force: bool = False,
+    progress: Optional[JobProgress] = None
+):
+    """
+    팀별 멤버의 Daily 보고서를 생성하여 제출합니다.
+    WBS 적재는 별도 단계(wbs_ingestion_service)에서 수행하며, 여기서는 이미 적재된 WBS 데이터만 읽습니다.
+    ingest_wbs=True(또는 DAILY_REPORT_INGEST_WBS=true)이면 보고서 생성 전에 적재를 함께 실행합니다.
+    team_id / user_ids / target_date로 실행 범위를 제한할 수 있으며, progress가 주어지면 사용자별 진행률을 기록합니다.
+    force=True이면 이전 실행 기록과 제출 여부와 관계없이 모든 사용자의 보고서를 다시 생성합니다.
+    """
     load_dotenv()
     print("환경 변수 로드 시도 완료.")
     
     client = APIClient()
-    response = client.get_teams_info()
+    response = filter_teams(client.get_teams_info(), team_id)
     
-    target_date = date.today().isoformat()
-    target_date = "2025-06-19"
+    if target_date is None:
+        target_date = date.today().isoformat()
     
+    if config.DAILY_REPORT_INGEST_WBS if ingest_wbs is None else ingest_wbs:
+        # 팀 간에 공유되는 프로젝트도 한 번만 적재한 뒤 사용자별 분석을 시작합니다.
+        ingest_wbs_files(collect_wbs_files(response))
+    else:
+        watermark = get_wbs_ingestion_watermark()
+        print(f"WBS 적재 단계 생략 (마지막 적재 완료: {watermark.get('last_completed_at', '없음')}, 마지막 성공: {watermark.get('last_success_at', '없음')})")
+
+    user_infos: List[UserInfo] = []
     for team in response:
-        print(team.name)
-        for proj in team.projects:
-            print(proj.name)
-            for file in proj.files:
-                download_wbs(proj.id, [file])
-
-        projects = [
-            ProjectInfo(
-                id = proj.id,
-                name = proj.name,
-                start_date = proj.start_date,
-                end_date = proj.end_date,
-                description = proj.description,
-                progress = proj.progress or 0
-            )
-            for proj in team.projects
-        ]
-        for member in team.members:
-            if not member.id == 0:
-                user_info = UserInfo(
-                    id=member.id,
-                    name=member.name,
-                    email=member.email,
-                    team_id=team.id,
-                    team_name=team.name,
-                    projects=projects
-                )
-                daily_report = run_analysis_workflow(user_info, target_date)
-                
-                if daily_report:
-                    client.submit_user_daily_report(user_id=member.id, target_date=target_date, report_content=daily_report)
+        user_infos.extend(_build_member_user_infos(team))
+    user_infos = filter_users(user_infos, user_ids)
+    if progress:
+        progress.set_total(len(user_infos))
+
+    warmup_graphs([GRAPH_DAILY])
+    max_workers = max(1, max_workers or config.DAILY_REPORT_MAX_WORKERS)
+    print(f"Daily 보고서 생성 시작: 대상 {len(user_infos)}명, 동시 실행 수 {max_workers}")
+
+    latencies: List[Tuple[str, float, str]] = []
+    batch_started_at = time.perf_counter()
+
+    def process_member(item_key: str, user_info: UserInfo) -> str:
+        # 다른 실행(또는 수동 작성)으로 이미 제출된 보고서는 다시 생성하지 않습니다.
+        if not force and config.JOB_SKIP_SUBMITTED and _is_daily_report_submitted(client, user_info.id, target_date):
+            print(f"[건너뜀] {user_info.name} {target_date} 보고서가 이미 제출되어 있습니다.")
+            return ITEM_SKIPPED
+
+        daily_report, seconds, error = _run_member_workflow_timed(user_info, target_date)
+        if error:
+            print(f"[에러] {user_info.name} 보고서 생성 중 오류 발생: {error}")
+            status = "error"
+        elif daily_report:
+            try:
+                response = client.submit_user_daily_report(user_id=user_info.id, target_date=target_date, report_content=daily_report)
+                status = "success" if response.ok else "submit_failed"
+            except requests.RequestException as e:
+                print(f"[에러] {user_info.name} 보고서 제출 실패: {e}")
+                status = "submit_failed"
+        else:
+            status = "failed"
+        # latencies는 모든 워커 스레드가 함께 쓰므로 결과 판단은 이 멤버의 status로만 합니다.
+        latencies.append((user_info.name, seconds, status))
+        return ITEM_SUCCESS if status == "success" else ITEM_FAILED
+
+    # 멤버별 워크플로우는 영속 작업 큐(job_store)를 통해 워커 풀에서 병렬로 실행하고, 완료되는 즉시 제출합니다.
+    # 중단 후 같은 날짜로 다시 실행하면 이미 제출한 사용자는 건너뜁니다.
+    run_work_items(
+        f"daily:{target_date}",
+        {f"user:{user_info.id}": user_info for user_info in user_infos},
+        process_member,
+        max_workers=max_workers,
+        progress=progress,
+        shard=to_shard_spec(shard_indexes, shard_count),
+        force=force
+    )
+
+    _print_batch_summary(latencies, time.perf_counter() - batch_started_at, max_workers)
+    return {"target_date": target_date, "users": len(user_infos), "succeeded": sum(1 for *_, status in latencies if status == "success")}
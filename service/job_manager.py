@@ -0,0 +1,155 @@
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from core import config
+
+# 보고서 배치를 백그라운드 작업(job)으로 실행하고 진행 상황을 조회하기 위한 프로세스 내 작업 관리자
+# 엔드포인트는 작업을 등록한 뒤 job_id를 즉시 반환하고, /jobs/{job_id}로 진행률과 예상 완료 시간을 확인합니다.
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+ITEM_SUCCESS = "success"
+ITEM_FAILED = "failed"
+ITEM_SKIPPED = "skipped"
+
+
+class JobProgress:
+    """작업 하나의 상태와 항목(사용자/팀) 단위 진행률. 서비스 함수가 progress 인자로 받아 갱신합니다."""
+
+    def __init__(self, job_id: str, kind: str, params: Dict[str, Any]):
+        self.job_id = job_id
+        self.kind = kind
+        self.params = params
+        self.status = JOB_QUEUED
+        self.created_at = datetime.now().isoformat(timespec="seconds")
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.error: Optional[str] = None
+        self.result: Any = None
+        self.total = 0
+        self.counts = {ITEM_SUCCESS: 0, ITEM_FAILED: 0, ITEM_SKIPPED: 0}
+        self.resumed = 0 # 이전 실행에서 이미 완료되어 이번 실행에서 처리하지 않은 항목 수 (skipped에 포함)
+        self._started_perf: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def set_total(self, total: int):
+        with self._lock:
+            self.total = total
+
+    def item_done(self, status: str = ITEM_SUCCESS, resumed: bool = False):
+        """항목 하나의 결과를 기록합니다. resumed=True는 이전 실행에서 완료되어 처리 없이 건너뛴 항목입니다."""
+        with self._lock:
+            self.counts[status] = self.counts.get(status, 0) + 1
+            if resumed:
+                self.resumed += 1
+
+    def _start(self):
+        with self._lock:
+            self.status = JOB_RUNNING
+            self.started_at = datetime.now().isoformat(timespec="seconds")
+            self._started_perf = time.perf_counter()
+
+    def _finish(self, status: str, result: Any = None, error: Optional[str] = None):
+        with self._lock:
+            self.status = status
+            self.result = result
+            self.error = error
+            self.finished_at = datetime.now().isoformat(timespec="seconds")
+
+    def _eta_seconds(self, done: int, elapsed: float) -> Optional[float]:
+        # 이번 실행에서 실제로 처리한 항목의 평균 처리 속도로 남은 항목의 소요 시간을 추정합니다. (병렬 실행 효과 포함)
+        # 재개 시 즉시 건너뛴 항목은 처리 시간이 0이므로 속도 계산에서 제외합니다.
+        processed = done - self.resumed
+        if self.status != JOB_RUNNING or processed <= 0 or self.total <= done:
+            return None
+        return round(elapsed / processed * (self.total - done), 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            done = sum(self.counts.values())
+            elapsed = time.perf_counter() - self._started_perf if self._started_perf and self.status == JOB_RUNNING else None
+            return {
+                "job_id": self.job_id,
+                "kind": self.kind,
+                "params": self.params,
+                "status": self.status,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "total": self.total,
+                "done": done,
+                "succeeded": self.counts[ITEM_SUCCESS],
+                "failed": self.counts[ITEM_FAILED],
+                "skipped": self.counts[ITEM_SKIPPED],
+                "resumed": self.resumed,
+                "elapsed_seconds": round(elapsed, 1) if elapsed is not None else None,
+                "eta_seconds": self._eta_seconds(done, elapsed) if elapsed is not None else None,
+                "error": self.error,
+                "result": self.result,
+            }
+
+
+class JobManager:
+    """백그라운드 작업 풀과 작업 목록. 완료된 작업은 JOB_HISTORY_SIZE개까지만 보관합니다."""
+
+    def __init__(self, max_concurrent_jobs: int, history_size: int):
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_concurrent_jobs), thread_name_prefix="report-job")
+        self._jobs: Dict[str, JobProgress] = {}
+        self._history_size = max(1, history_size)
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, func: Callable[..., Any], **params) -> JobProgress:
+        """func(**params, progress=JobProgress)를 백그라운드에서 실행하도록 등록하고 작업 정보를 반환합니다."""
+        job = JobProgress(uuid.uuid4().hex, kind, {k: v for k, v in params.items() if v is not None})
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._evict_finished()
+        self._executor.submit(self._run, job, func, params)
+        print(f"[작업 등록] {kind} (job_id: {job.job_id}, 범위: {job.params})")
+        return job
+
+    def _run(self, job: JobProgress, func: Callable[..., Any], params: Dict[str, Any]):
+        job._start()
+        try:
+            result = func(progress=job, **params)
+            job._finish(JOB_COMPLETED, result=result)
+            print(f"[작업 완료] {job.kind} (job_id: {job.job_id})")
+        except Exception as e:
+            job._finish(JOB_FAILED, error=str(e))
+            print(f"[작업 실패] {job.kind} (job_id: {job.job_id}): {e}")
+            traceback.print_exc()
+
+    def _evict_finished(self):
+        finished = [job for job in self._jobs.values() if job.status in (JOB_COMPLETED, JOB_FAILED)]
+        overflow = len(self._jobs) - self._history_size
+        for job in finished[:max(0, overflow)]: # dict는 등록 순서를 유지하므로 앞쪽이 오래된 작업
+            del self._jobs[job.job_id]
+
+    def get(self, job_id: str) -> Optional[JobProgress]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[JobProgress]:
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+
+_job_manager: Optional[JobManager] = None
+_job_manager_lock = threading.Lock()
+
+def get_job_manager() -> JobManager:
+    """프로세스 공유 JobManager를 반환합니다."""
+    global _job_manager
+    if _job_manager is None:
+        with _job_manager_lock:
+            if _job_manager is None:
+                _job_manager = JobManager(config.JOB_MAX_CONCURRENT_JOBS, config.JOB_HISTORY_SIZE)
+    return _job_manager
@@ -0,0 +1,313 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, TypeVar
+
+from core import config
+from service.job_manager import ITEM_FAILED, ITEM_SKIPPED, ITEM_SUCCESS, JobProgress
+from service.sharding import ShardSpec, select_shard
+
+T = TypeVar("T")
+
+# 보고서 배치의 작업 항목(사용자/팀)별 상태를 SQLite에 저장하는 영속 작업 큐
+# - 배치 키(예: "daily:2025-06-19")와 항목 키(예: "user:7") 조합으로 상태를 기록하므로,
+#   프로세스가 중단된 뒤 같은 배치를 다시 실행하면 이미 완료된 항목은 건너뛰고 남은 항목만 처리합니다.
+# - 항목은 BEGIN IMMEDIATE 트랜잭션 안에서 임대(lease)하여 가져가므로 여러 워커 프로세스가 같은 파일을 함께 처리해도 중복 처리되지 않습니다.
+# - 임대 시간이 지나도록 완료되지 않은 항목(중단된 프로세스의 항목)은 다른 워커가 다시 가져갑니다.
+#   처리 중인 워커는 임대 시간의 1/3마다 임대를 연장(heartbeat)하므로, 처리가 임대 시간보다 오래 걸려도 다른 워커가 가져가지 않습니다.
+# - force 실행은 배치의 완료/실패 항목을 다시 대기 상태로 돌려 처음부터 다시 생성합니다.
+
+# claim에서 allowed_keys를 IN (...) 조건으로 나눠 조회할 때 한 번에 넣을 키 수 (SQLite 바인딩 변수 제한 이하)
+_CLAIM_KEY_CHUNK = 500
+
+STATE_PENDING = "pending"
+STATE_RUNNING = "running"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS work_items (
+    batch_key TEXT NOT NULL,
+    item_key TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    claimed_by TEXT,
+    lease_expires_at REAL,
+    result TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (batch_key, item_key)
+)
+"""
+
+
+class JobStore:
+    """SQLite 파일 기반 작업 항목 저장소. 연결은 호출마다 새로 열어 스레드/프로세스 간에 안전하게 사용합니다."""
+
+    def __init__(self, path: str, lease_seconds: int, max_attempts: int):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: 트랜잭션을 BEGIN IMMEDIATE로 직접 제어
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def enqueue(self, batch_key: str, item_keys: Iterable[str]):
+        """
+        배치에 항목을 등록합니다. 이미 있는 항목은 상태를 유지하고(재개),
+        재시도 횟수가 남은 실패 항목만 다시 대기 상태로 돌립니다.
+        """
+        now = time.time()
+        keys = list(item_keys)
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR IGNORE INTO work_items (batch_key, item_key, state, updated_at) VALUES (?, ?, ?, ?)",
+                [(batch_key, key, STATE_PENDING, now) for key in keys]
+            )
+            conn.executemany(
+                "UPDATE work_items SET state = ?, updated_at = ? WHERE batch_key = ? AND item_key = ? AND state = ? AND attempts < ?",
+                [(STATE_PENDING, now, batch_key, key, STATE_FAILED, self.max_attempts) for key in keys]
+            )
+            conn.execute("COMMIT")
+
+    def claim(self, batch_key: str, worker_id: str, allowed_keys: Optional[Sequence[str]] = None) -> Optional[str]:
+        """
+        대기 중이거나 임대가 만료된 항목 하나를 원자적으로 가져옵니다. allowed_keys가 주어지면 그 안에서만 고릅니다.
+        가져갈 항목이 없으면 None.
+        """
+        claimable = "SELECT item_key FROM work_items WHERE batch_key = ? AND (state = ? OR (state = ? AND lease_expires_at < ?))"
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            item_key = None
+            if allowed_keys is None:
+                row = conn.execute(
+                    f"{claimable} ORDER BY item_key LIMIT 1", (batch_key, STATE_PENDING, STATE_RUNNING, now)
+                ).fetchone()
+                item_key = row[0] if row else None
+            else:
+                for start in range(0, len(allowed_keys), _CLAIM_KEY_CHUNK):
+                    chunk = allowed_keys[start:start + _CLAIM_KEY_CHUNK]
+                    row = conn.execute(
+                        f"{claimable} AND item_key IN ({','.join('?' * len(chunk))}) ORDER BY item_key LIMIT 1",
+                        (batch_key, STATE_PENDING, STATE_RUNNING, now, *chunk)
+                    ).fetchone()
+                    if row:
+                        item_key = row[0]
+                        break
+            if item_key is not None:
+                conn.execute(
+                    "UPDATE work_items SET state = ?, claimed_by = ?, lease_expires_at = ?, attempts = attempts + 1, updated_at = ? "
+                    "WHERE batch_key = ? AND item_key = ?",
+                    (STATE_RUNNING, worker_id, now + self.lease_seconds, now, batch_key, item_key)
+                )
+            conn.execute("COMMIT")
+        return item_key
+
+    def renew(self, batch_key: str, item_key: str, worker_id: str) -> bool:
+        """처리 중인 항목의 임대를 연장합니다. 다른 워커가 이미 가져갔거나 처리가 끝난 항목이면 False."""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE work_items SET lease_expires_at = ?, updated_at = ? "
+                "WHERE batch_key = ? AND item_key = ? AND state = ? AND claimed_by = ?",
+                (now + self.lease_seconds, now, batch_key, item_key, STATE_RUNNING, worker_id)
+            )
+        return cursor.rowcount > 0
+
+    def reset(self, batch_key: str, item_keys: Iterable[str]):
+        """
+        항목을 대기 상태로 되돌리고 재시도 횟수를 초기화합니다. (force 실행)
+        임대가 유효한(다른 워커가 처리 중인) 항목은 그대로 둡니다.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "UPDATE work_items SET state = ?, attempts = 0, result = NULL, error = NULL, claimed_by = NULL, "
+                "lease_expires_at = NULL, updated_at = ? "
+                "WHERE batch_key = ? AND item_key = ? AND NOT (state = ? AND lease_expires_at >= ?)",
+                [(STATE_PENDING, now, batch_key, key, STATE_RUNNING, now) for key in item_keys]
+            )
+            conn.execute("COMMIT")
+
+    def complete(self, batch_key: str, item_key: str, worker_id: str, result: str = ITEM_SUCCESS) -> bool:
+        return self._set_state(batch_key, item_key, worker_id, STATE_DONE, result=result)
+
+    def fail(self, batch_key: str, item_key: str, worker_id: str, error: str) -> bool:
+        return self._set_state(batch_key, item_key, worker_id, STATE_FAILED, error=error[:1000])
+
+    def _set_state(self, batch_key: str, item_key: str, worker_id: str, state: str,
+                   result: Optional[str] = None, error: Optional[str] = None) -> bool:
+        """
+        항목을 가져간 워커(claimed_by)만 결과를 기록합니다. 임대가 만료되어 다른 워커가 다시 가져간 항목이면
+        기록하지 않고 False를 반환하여 새 담당 워커의 결과를 덮어쓰지 않습니다.
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE work_items SET state = ?, result = ?, error = ?, lease_expires_at = NULL, updated_at = ? "
+                "WHERE batch_key = ? AND item_key = ? AND state = ? AND claimed_by = ?",
+                (state, result, error, time.time(), batch_key, item_key, STATE_RUNNING, worker_id)
+            )
+        return cursor.rowcount > 0
+
+    def done_keys(self, batch_key: str) -> List[str]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT item_key FROM work_items WHERE batch_key = ? AND state = ?", (batch_key, STATE_DONE)
+            ).fetchall()
+        return [key for (key,) in rows]
+
+    def exhausted_keys(self, batch_key: str) -> List[str]:
+        """재시도 횟수(max_attempts)를 모두 써서 force 실행 전까지 다시 처리되지 않는 실패 항목"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT item_key FROM work_items WHERE batch_key = ? AND state = ? AND attempts >= ?",
+                (batch_key, STATE_FAILED, self.max_attempts)
+            ).fetchall()
+        return [key for (key,) in rows]
+
+    def summary(self, batch_key: str) -> Dict[str, int]:
+        """배치의 상태별 항목 수. 실패 항목 중 재시도 횟수를 모두 쓴 항목 수는 exhausted로 따로 표시합니다."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT state, COUNT(*) FROM work_items WHERE batch_key = ? GROUP BY state", (batch_key,)
+            ).fetchall()
+            (exhausted,) = conn.execute(
+                "SELECT COUNT(*) FROM work_items WHERE batch_key = ? AND state = ? AND attempts >= ?",
+                (batch_key, STATE_FAILED, self.max_attempts)
+            ).fetchone()
+        summary = {state: count for state, count in rows}
+        if exhausted:
+            summary["exhausted"] = exhausted
+        return summary
+
+
+_job_store: Optional[JobStore] = None
+_job_store_lock = threading.Lock()
+
+def get_job_store() -> JobStore:
+    """프로세스 공유 JobStore를 반환합니다. (JOB_STORE_PATH)"""
+    global _job_store
+    if _job_store is None:
+        with _job_store_lock:
+            if _job_store is None:
+                _job_store = JobStore(config.JOB_STORE_PATH, config.JOB_LEASE_SECONDS, config.JOB_MAX_ATTEMPTS)
+    return _job_store
+
+def _worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+
+@contextmanager
+def _lease_heartbeat(store: JobStore, batch_key: str, item_key: str, worker_id: str):
+    """블록이 실행되는 동안 임대 시간의 1/3마다 항목의 임대를 연장합니다."""
+    stop = threading.Event()
+    interval = max(1.0, store.lease_seconds / 3)
+
+    def beat():
+        while not stop.wait(interval):
+            try:
+                renewed = store.renew(batch_key, item_key, worker_id)
+            except sqlite3.Error as e:
+                print(f"[경고] {batch_key} / {item_key} 임대 연장 실패: {e}")
+                continue
+            if not renewed:
+                print(f"[경고] {batch_key} / {item_key} 임대를 잃었습니다. 다른 워커가 항목을 가져갔을 수 있습니다.")
+                return
+
+    heartbeat = threading.Thread(target=beat, name=f"lease-{item_key}", daemon=True)
+    heartbeat.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        heartbeat.join()
+
+def run_work_items(
+    batch_key: str,
+    items: Dict[str, T],
+    handler: Callable[[str, T], str],
+    max_workers: int = 1,
+    progress: Optional[JobProgress] = None,
+    store: Optional[JobStore] = None,
+    shard: Optional[ShardSpec] = None,
+    force: bool = False
+) -> Dict[str, int]:
+    """
+    items를 배치에 등록하고 max_workers개의 워커 스레드로 남은 항목을 처리합니다.
+    handler(item_key, item)는 ITEM_SUCCESS / ITEM_SKIPPED / ITEM_FAILED 중 하나를 반환합니다.
+    이전 실행에서 이미 완료된 항목은 handler를 호출하지 않고 건너뜁니다. 이번 실행의 결과별 항목 수를 반환합니다.
+    shard가 주어지면(SHARD_MODE=hash의 fan-out 요청) 해당 샤드의 항목만 처리합니다.
+    force=True이면 이전 실행의 완료/실패 기록을 지우고 모든 항목을 다시 처리합니다.
+    """
+    items = select_shard(batch_key, items, shard)
+    store = store or get_job_store()
+    store.enqueue(batch_key, items.keys())
+    if force:
+        store.reset(batch_key, items.keys())
+        print(f"[강제 실행] {batch_key}: {len(items)}개 항목을 처음부터 다시 처리합니다.")
+    item_keys = sorted(items)
+
+    counts = {ITEM_SUCCESS: 0, ITEM_SKIPPED: 0, ITEM_FAILED: 0}
+    counts_lock = threading.Lock()
+
+    def record(status: str, resumed: bool = False):
+        with counts_lock:
+            counts[status] += 1
+        if progress:
+            progress.item_done(status, resumed=resumed)
+
+    if progress:
+        progress.set_total(len(items))
+    already_done = set(store.done_keys(batch_key)) & set(items)
+    for _ in already_done:
+        record(ITEM_SKIPPED, resumed=True)
+    if already_done:
+        print(f"[재개] {batch_key}: 이전 실행에서 완료된 {len(already_done)}/{len(items)}개 항목을 건너뜁니다.")
+    exhausted = set(store.exhausted_keys(batch_key)) & set(items)
+    for _ in exhausted:
+        record(ITEM_FAILED, resumed=True)
+    if exhausted:
+        print(f"[재시도 한도 초과] {batch_key}: {len(exhausted)}개 항목은 {store.max_attempts}회 실패하여 force 실행 전까지 다시 처리하지 않습니다: {sorted(exhausted)[:10]}")
+
+    def drain():
+        worker_id = _worker_id()
+        while True:
+            item_key = store.claim(batch_key, worker_id, item_keys)
+            if item_key is None:
+                return
+            try:
+                with _lease_heartbeat(store, batch_key, item_key, worker_id):
+                    status = handler(item_key, items[item_key])
+            except Exception as e:
+                print(f"[에러] {batch_key} / {item_key} 처리 중 오류 발생: {e}")
+                status, error = ITEM_FAILED, str(e)
+            else:
+                error = "handler reported failure"
+            if status == ITEM_FAILED:
+                recorded = store.fail(batch_key, item_key, worker_id, error)
+            else:
+                recorded = store.complete(batch_key, item_key, worker_id, status)
+            if not recorded:
+                # 임대를 잃은 항목의 결과는 새로 가져간 워커가 기록합니다.
+                print(f"[경고] {batch_key} / {item_key} 임대를 잃어 결과({status})를 기록하지 않습니다.")
+                continue
+            record(status)
+
+    workers = max(1, min(max_workers, len(items) or 1))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=batch_key.split(":")[0]) as executor:
+        for future in [executor.submit(drain) for _ in range(workers)]:
+            future.result()
+
+    print(f"[배치 상태] {batch_key}: 이번 실행 {counts}, 전체 {store.summary(batch_key)}")
+    return counts
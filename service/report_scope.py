@@ -0,0 +1,18 @@
+from typing import Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+# 보고서 배치 실행 범위(팀 / 사용자 목록) 필터. 값이 None이면 전체를 대상으로 합니다.
+
+def filter_teams(teams: Iterable[T], team_id: Optional[int] = None) -> List[T]:
+    teams = list(teams)
+    if team_id is None:
+        return teams
+    return [team for team in teams if team.id == team_id]
+
+def filter_users(users: Iterable[T], user_ids: Optional[Iterable[int]] = None) -> List[T]:
+    users = list(users)
+    if not user_ids:
+        return users
+    allowed = set(user_ids)
+    return [user for user in users if user.id in allowed]
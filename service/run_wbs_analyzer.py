@@ -1,17 +1,38 @@
 import os
 import sys
-from typing import Optional
+import threading
+from typing import Dict, Optional
 
 from ai.agents.wbs_analysis_agent import WBSAnalysisAgent
+from ai.utils.llm_interface import LLMInterface
 from core import config
 from core.settings import Settings 
-from langchain.globals import set_llm_cache
+from ai.utils.llm_cache import configure_llm_cache
 
-# LangChain 캐시 비활성화 (LLM 호출 시 항상 최신 응답을 받기 위함)
-set_llm_cache(None)
+# LLM 응답 캐시는 LLM_CACHE_ENABLED=true일 때만 사용 (기본값은 비활성화로 항상 최신 응답)
+configure_llm_cache()
+
+# WBS 파일마다 LLM 클라이언트/프롬프트 체인을 새로 만들지 않도록 프롬프트 파일별로 공유합니다.
+# LLMInterface는 호출 간 상태를 갖지 않으므로 여러 적재 워커 스레드에서 함께 사용해도 안전합니다.
+_llm_interfaces: Dict[str, LLMInterface] = {}
+_llm_interface_lock = threading.Lock()
+
+def _get_shared_llm_interface(prompt_file_path: str) -> LLMInterface:
+    with _llm_interface_lock:
+        llm_interface = _llm_interfaces.get(prompt_file_path)
+        if llm_interface is None:
+            settings = Settings()
+            llm_interface = LLMInterface(
+                api_key=settings.OPENAI_API_KEY,
+                model_name=settings.OPENAI_MODEL_NAME,
+                prompt_template_str=LLMInterface.load_prompt_from_file(prompt_file_path)
+            )
+            _llm_interfaces[prompt_file_path] = llm_interface
+        return llm_interface
 
 def run_wbs_agent(project_id: int, 
-                        wbs_file_path: str):
+                        wbs_file_path: str,
+                        wbs_file_hash: Optional[str] = None):
     
 
     print("--- WBS 적재 에이전트 실행 ---")
@@ -33,7 +54,9 @@ def run_wbs_agent(project_id: int,
         agent = WBSAnalysisAgent(
             project_id=project_id,
             wbs_file_path=wbs_file_abs,
-            prompt_file_path=prompt_file_abs
+            prompt_file_path=prompt_file_abs,
+            wbs_file_hash=wbs_file_hash,
+            llm_interface=_get_shared_llm_interface(prompt_file_abs)
         )
         
         success = agent.run_ingestion_pipeline()
@@ -56,7 +79,58 @@ def run_wbs_agent(project_id: int,
         print(traceback.format_exc())
         return False
 
+def measure_reingest_availability(project_id: int, wbs_file_path: str, poll_interval: float = 0.05) -> dict:
+    """
+    전체 재적재를 실행하는 동안 프로젝트의 WBS 포인트 수를 계속 조회하여,
+    적재 중 데이터가 비는 구간(포인트 0건)이 있었는지 측정합니다.
+    """
+    import threading
+    import time
+    from qdrant_client import models
+    from ai.utils.qdrant_client_factory import get_qdrant_client
+
+    client = get_qdrant_client()
+    project_filter = models.Filter(must=[
+        models.FieldCondition(key="project_id", match=models.MatchValue(value=project_id))
+    ])
+
+    agent = WBSAnalysisAgent(
+        project_id=project_id,
+        wbs_file_path=os.path.abspath(wbs_file_path),
+        prompt_file_path=os.path.join(config.PROMPTS_BASE_DIR, "wbs_prompt.md")
+    )
+    result = {}
+    worker = threading.Thread(target=lambda: result.update(success=agent.run_ingestion_pipeline(force_full=True)))
+
+    counts = []
+    started_at = time.perf_counter()
+    worker.start()
+    while worker.is_alive():
+        counts.append(client.count(collection_name=config.COLLECTION_WBS_DATA, count_filter=project_filter, exact=True).count)
+        time.sleep(poll_interval)
+    worker.join()
+
+    report = {
+        "success": result.get("success", False),
+        "seconds": round(time.perf_counter() - started_at, 2),
+        "polls": len(counts),
+        "min_points": min(counts) if counts else None,
+        "empty_polls": sum(1 for count in counts if count == 0),
+    }
+    print(f"재적재 중 가용성 측정 결과: {report}")
+    return report
+
 if __name__ == "__main__":
+    # 사용법: python -m service.run_wbs_analyzer --check-availability <project_id> <wbs_file_path>
+    if len(sys.argv) == 4 and sys.argv[1] == "--check-availability":
+        try:
+            check_project_id = int(sys.argv[2])
+        except ValueError:
+            print(f"project_id는 정수여야 합니다: {sys.argv[2]}")
+            sys.exit(2)
+        # payload의 project_id는 정수로 저장되므로 문자열로 조회하면 항상 0건이 되어 측정이 무의미해짐
+        availability = measure_reingest_availability(check_project_id, sys.argv[3])
+        sys.exit(0 if availability["success"] and availability["empty_polls"] == 0 else 1)
     
     # 예시: 기본값 사용
     project_id_example = "project_sample_001"
@@ -0,0 +1,104 @@
+import socket
+import zlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+import requests
+
+from core import config
+
+T = TypeVar("T")
+
+# 여러 레플리카가 같은 보고서 배치를 나눠 처리하기 위한 샤딩 설정
+# - off  : 요청을 받은 레플리카가 모든 항목을 처리합니다.
+# - hash : 요청을 받은 레플리카(코디네이터)가 헤드리스 서비스(SHARD_PEERS_HOST)로 살아 있는 레플리카 목록을 조회하고,
+#          각 레플리카에 샤드 번호를 지정해 같은 요청을 전달(fan-out)합니다. 각 레플리카는 항목 키의 CRC32 값이
+#          자기 샤드 번호에 해당하는 항목만 처리하며, 전달에 실패한 레플리카의 샤드는 코디네이터가 대신 처리합니다.
+#          샤드 번호를 요청에 명시하므로 파드 이름 순번(StatefulSet)이 필요 없습니다.
+
+SHARD_MODE_OFF = "off"
+SHARD_MODE_HASH = "hash"
+
+# (처리할 샤드 번호 목록, 전체 샤드 수)
+ShardSpec = Tuple[List[int], int]
+
+def shard_of(item_key: str, shard_count: int) -> int:
+    """프로세스/레플리카와 무관하게 항상 같은 값을 내는 항목 키의 샤드 번호"""
+    return zlib.crc32(item_key.encode("utf-8")) % shard_count
+
+def select_shard(batch_key: str, items: Dict[str, T], shard: Optional[ShardSpec] = None) -> Dict[str, T]:
+    """shard가 주어지면 해당 샤드 번호들의 항목만 남기고, 없으면 전체 항목을 반환합니다."""
+    if shard is None:
+        return items
+    shard_indexes, shard_count = shard
+    selected = {key: item for key, item in items.items() if shard_of(key, shard_count) in shard_indexes}
+    print(f"[샤딩] {batch_key}: 샤드 {sorted(shard_indexes)}/{shard_count} - 전체 {len(items)}개 중 {len(selected)}개 처리")
+    return selected
+
+def _discover_peers() -> List[str]:
+    """헤드리스 서비스가 돌려주는 레플리카 IP 목록 (모든 레플리카에서 같은 순서가 되도록 정렬)"""
+    infos = socket.getaddrinfo(config.SHARD_PEERS_HOST, config.SHARD_PEER_PORT, proto=socket.IPPROTO_TCP)
+    return sorted({info[4][0] for info in infos})
+
+def fan_out_shards(path: str, params: Dict[str, Any]) -> Tuple[Optional[ShardSpec], List[Dict[str, Any]]]:
+    """
+    hash 모드에서 같은 요청을 다른 레플리카들에 샤드 번호와 함께 전달합니다.
+    (이 레플리카가 처리할 ShardSpec, 레플리카별 전달 결과)를 반환합니다. off 모드이거나 레플리카가 하나뿐이면 (None, []).
+    """
+    if config.SHARD_MODE != SHARD_MODE_HASH:
+        return None, []
+
+    try:
+        peers = _discover_peers()
+    except OSError as e:
+        print(f"[샤딩] 레플리카 목록 조회 실패({config.SHARD_PEERS_HOST}), 이 레플리카에서 전체 항목을 처리합니다: {e}")
+        return None, []
+    own_ip = socket.gethostbyname(socket.gethostname())
+    if own_ip not in peers:
+        peers = sorted(peers + [own_ip])
+    shard_count = len(peers)
+    if shard_count == 1:
+        return None, []
+
+    own_indexes = [peers.index(own_ip)]
+    results: List[Dict[str, Any]] = []
+    query = {key: value for key, value in params.items() if value is not None}
+    for shard_index, peer_ip in enumerate(peers):
+        if peer_ip == own_ip:
+            continue
+        url = f"http://{peer_ip}:{config.SHARD_PEER_PORT}{path}"
+        try:
+            response = requests.get(
+                url, params={**query, "shard_index": shard_index, "shard_count": shard_count},
+                timeout=config.SHARD_FANOUT_TIMEOUT_SECONDS
+            )
+            response.raise_for_status()
+            results.append({"shard_index": shard_index, "peer": peer_ip, "job_id": response.json().get("job_id")})
+        except (requests.RequestException, ValueError) as e:
+            # 전달에 실패한 샤드는 코디네이터가 대신 처리하여 항목이 누락되지 않도록 합니다.
+            print(f"[샤딩] 레플리카 {peer_ip}(샤드 {shard_index})에 요청 전달 실패, 이 레플리카에서 대신 처리합니다: {e}")
+            own_indexes.append(shard_index)
+            results.append({"shard_index": shard_index, "peer": peer_ip, "error": str(e)})
+
+    print(f"[샤딩] {path}: 레플리카 {shard_count}개로 분할, 이 레플리카 담당 샤드 {sorted(own_indexes)}")
+    return (own_indexes, shard_count), results
+
+def requested_shard(shard_index: Optional[int], shard_count: Optional[int]) -> Optional[ShardSpec]:
+    """코디네이터가 전달한 요청의 샤드 파라미터를 ShardSpec으로 변환합니다. 잘못된 값이면 ValueError."""
+    if shard_index is None and shard_count is None:
+        return None
+    if shard_index is None or shard_count is None or shard_count < 1 or not 0 <= shard_index < shard_count:
+        raise ValueError(f"잘못된 샤드 파라미터: shard_index={shard_index}, shard_count={shard_count}")
+    return [shard_index], shard_count
+
+def shard_params(shard: Optional[ShardSpec]) -> Dict[str, Any]:
+    """서비스 함수에 넘길 샤드 인자"""
+    if shard is None:
+        return {}
+    shard_indexes, shard_count = shard
+    return {"shard_indexes": shard_indexes, "shard_count": shard_count}
+
+def to_shard_spec(shard_indexes: Optional[Sequence[int]], shard_count: Optional[int]) -> Optional[ShardSpec]:
+    """서비스 함수의 샤드 인자를 run_work_items에 넘길 ShardSpec으로 변환합니다."""
+    if shard_indexes is None or shard_count is None:
+        return None
+    return list(shard_indexes), shard_count
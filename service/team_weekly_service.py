@@ -1,12 +1,18 @@
 from datetime import date, timedelta
-from typing import List
+from typing import List, Optional
 from dotenv import load_dotenv
 
+import requests
+
 from ai.graphs.state_definition import TeamWeeklyLangGraphState
-from ai.graphs.team_weekly_graph import create_team_weekly_graph
+from ai.graphs.graph_registry import GRAPH_TEAM_WEEKLY, get_compiled_graph
 from api.api_client import APIClient
 from schemas.project_info import ProjectInfo
 from schemas.team_info import TeamInfo
+from service.job_manager import ITEM_FAILED, ITEM_SUCCESS, JobProgress
+from service.job_store import run_work_items
+from service.sharding import to_shard_spec
+from service.report_scope import filter_teams
 
 def run_team_weekly_workflow(team_info: TeamInfo, weekly_reports: List[str], start_date: str, end_date: str):
     """
@@ -30,7 +36,7 @@ def run_team_weekly_workflow(team_info: TeamInfo, weekly_reports: List[str], sta
     
     # --- 실행 ---
     try:
-        app = create_team_weekly_graph()
+        app = get_compiled_graph(GRAPH_TEAM_WEEKLY)
 
         print("\n--- LangGraph 워크플로우 실행 시작 ---")
         final_state = app.invoke(initial_state)
@@ -44,26 +50,38 @@ def run_team_weekly_workflow(team_info: TeamInfo, weekly_reports: List[str], sta
     except Exception as e:
         print(f"\n[오류] 예기치 않은 오류가 발생했습니다: {e}")
 
-def team_weekly_report_service():
+def team_weekly_report_service(
+    team_id: Optional[int] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    shard_indexes: Optional[List[int]] = None,
+    shard_count: Optional[int] = None,
+    force: bool = False,
+    progress: Optional[JobProgress] = None
+):
+    """
+    팀 주간 보고서를 생성하여 제출합니다.
+    team_id / 기간으로 실행 범위를 제한할 수 있으며, progress가 주어지면 팀별 진행률을 기록합니다.
+    force=True이면 이전 실행에서 완료된 팀도 다시 생성합니다.
+    """
     load_dotenv()
     print("환경 변수 로드 시도 완료.")
     
-    end_date = date.today()
-    start_date = end_date - timedelta(days=6)
+    if start_date is None or end_date is None:
+        end_date = date.today()
+        start_date = end_date - timedelta(days=6)
 
-    end_date_str = end_date.isoformat()
-    start_date_str = start_date.isoformat()
-    
-    start_date_str = "2025-06-13"
-    end_date_str = "2025-06-19"
+        end_date_str = end_date.isoformat()
+        start_date_str = start_date.isoformat()
+    else:
+        start_date_str, end_date_str = start_date, end_date
     
     client = APIClient()
-    response = client.get_teams_info()
+    response = filter_teams(client.get_teams_info(), team_id)
     print(response)
     
+    team_infos = {}
     for team in response:
-        print(team.name)
-        
         projects = [
             ProjectInfo(
                     id = proj.id,
@@ -76,7 +94,7 @@ def team_weekly_report_service():
                 for proj in team.projects
         ]
         
-        team_info = TeamInfo(
+        team_infos[f"team:{team.id}"] = TeamInfo(
             id = team.id,
             name = team.name,
             description = team.description,
@@ -84,19 +102,39 @@ def team_weekly_report_service():
             projects = projects,
             weekly_template = team.weekly_template
         )
-        
-        weekly_reports = client.get_team_user_weekly_reports(
-            team_id=team_info.id,
-            start_date=start_date_str,
-            end_date=end_date_str
-        )
-        
-        team_weekly_report = run_team_weekly_workflow(team_info, weekly_reports, start_date_str, end_date_str)
-        
-        if team_weekly_report:
-            client.submit_team_weekly_report(
+
+    def process_team(item_key: str, team_info: TeamInfo) -> str:
+        print(team_info.name)
+        try:
+            weekly_reports = client.get_team_user_weekly_reports(
                 team_id=team_info.id,
                 start_date=start_date_str,
-                end_date=end_date_str,
-                report_content=team_weekly_report
-            )
\ No newline at end of file
+                end_date=end_date_str
+            )
+            
+            team_weekly_report = run_team_weekly_workflow(team_info, weekly_reports, start_date_str, end_date_str)
+            
+            if team_weekly_report:
+                response = client.submit_team_weekly_report(
+                    team_id=team_info.id,
+                    start_date=start_date_str,
+                    end_date=end_date_str,
+                    report_content=team_weekly_report
+                )
+                if response.ok:
+                    return ITEM_SUCCESS
+        except requests.RequestException as e:
+            print(f"[에러] {team_info.name} 팀 주간 보고서 처리 중 API 오류: {e}")
+        return ITEM_FAILED
+
+    # 영속 작업 큐(job_store)를 통해 처리하므로 중단 후 같은 기간으로 다시 실행하면 이미 제출한 팀은 건너뜁니다.
+    counts = run_work_items(
+        f"team-weekly:{start_date_str}:{end_date_str}",
+        team_infos,
+        process_team,
+        progress=progress,
+        shard=to_shard_spec(shard_indexes, shard_count),
+        force=force
+    )
+
+    return {"start_date": start_date_str, "end_date": end_date_str, "teams": len(team_infos), **counts}
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+import requests
+
+from api.dto.response.team_info_response import FileInfo
+from ai.tools.wbs_retriever_tool import get_stored_wbs_hash
+from core import config
+
+# 파일별 마지막 다운로드/적재 상태 (updated_at, file_size, ETag, Last-Modified, sha256)
+# 매일 배치에서 변경되지 않은 WBS 파일은 HTTP 요청 없이, 또는 304 응답만으로 건너뛰기 위해 사용합니다.
+_state_lock = threading.Lock()
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class FetchedWBS:
+    """적재가 필요한 것으로 판단되어 디스크에 기록된 WBS 파일"""
+
+    def __init__(self, path: str, sha256: str, state_key: str, state_entry: Dict[str, Any]):
+        self.path = path
+        self.sha256 = sha256
+        self.state_key = state_key
+        self.state_entry = state_entry
+
+    def cleanup(self):
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+            print(f"[삭제 완료] {self.path}")
+
+
+def _state_key(project_id: int, file: FileInfo) -> str:
+    return f"{project_id}:{file.id}"
+
+def _load_state() -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(config.WBS_DOWNLOAD_STATE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def _save_state_entry(key: str, entry: Dict[str, Any]):
+    """상태 파일의 항목 하나를 갱신합니다. 임시 파일에 쓴 뒤 교체하여 중간에 깨진 파일이 남지 않도록 합니다."""
+    with _state_lock:
+        state = _load_state()
+        state[key] = entry
+        os.makedirs(os.path.dirname(config.WBS_DOWNLOAD_STATE_PATH), exist_ok=True)
+        tmp_path = f"{config.WBS_DOWNLOAD_STATE_PATH}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, config.WBS_DOWNLOAD_STATE_PATH)
+
+def get_state_entry(project_id: int, file: FileInfo) -> Dict[str, Any]:
+    with _state_lock:
+        return dict(_load_state().get(_state_key(project_id, file), {}))
+
+def mark_ingested(fetched: FetchedWBS):
+    """적재에 성공한 파일의 해시를 상태에 기록합니다. 다음 실행에서 같은 파일은 건너뜁니다."""
+    entry = dict(fetched.state_entry, sha256=fetched.sha256, ingested=True)
+    _save_state_entry(fetched.state_key, entry)
+
+def fetch_wbs_if_changed(project_id: int, file: FileInfo, project_file_count: int = 1) -> Optional[FetchedWBS]:
+    """
+    WBS 파일이 마지막 적재 이후 바뀐 경우에만 디스크에 기록하여 반환합니다. 바뀌지 않았으면 None.
+    상태 파일의 적재 기록은 Qdrant에 저장된 해시가 기록된 SHA256과 같을 때만 믿습니다. (컬렉션 초기화, 다른 경로의 재적재 등)
+    Qdrant의 해시는 프로젝트 단위(마지막으로 적재한 파일)이므로, 프로젝트의 WBS 파일이 여럿이면(project_file_count > 1)
+    Qdrant 해시와 비교하지 않고 파일별 적재 기록만 사용합니다.
+    1) FileInfo의 updated_at / file_size가 마지막 적재 때와 같으면 HTTP 요청 없이 건너뜁니다.
+    2) ETag / Last-Modified로 조건부 요청을 보내 304 응답이면 건너뜁니다.
+    3) 본문을 메모리(일정 크기 이상은 임시 디스크)로 스트리밍하면서 SHA256을 계산하고,
+       해시가 마지막 적재 또는 Qdrant에 저장된 해시와 같으면 파일을 만들지 않고 건너뜁니다.
+    """
+    file_ext = os.path.splitext(file.original_file_name)[-1].lower()
+    if file_ext not in [".xls", ".xlsx"]:
+        return None
+
+    key = _state_key(project_id, file)
+    entry = get_state_entry(project_id, file)
+    single_file = project_file_count <= 1
+    if single_file and entry.get("ingested") and get_stored_wbs_hash(project_id) != entry.get("sha256"):
+        print(f"[재확인] Qdrant에 저장된 해시가 마지막 적재 기록과 달라 파일을 다시 내려받습니다 - 파일: {file.original_file_name}")
+        entry = dict(entry, ingested=False)
+    updated_at = str(file.updated_at)
+    file_size = str(file.file_size)
+
+    if entry.get("ingested") and entry.get("updated_at") == updated_at and entry.get("file_size") == file_size:
+        print(f"[건너뜀] 변경 없음 (updated_at/file_size 동일) - 파일: {file.original_file_name}")
+        return None
+
+    headers = {}
+    if entry.get("ingested"):
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    with requests.get(file.file_url, headers=headers, stream=True, timeout=config.WBS_DOWNLOAD_TIMEOUT_SECONDS) as response:
+        if response.status_code == 304:
+            print(f"[건너뜀] 변경 없음 (HTTP 304) - 파일: {file.original_file_name}")
+            _save_state_entry(key, dict(entry, updated_at=updated_at, file_size=file_size))
+            return None
+        response.raise_for_status()
+
+        new_entry = dict(
+            entry,
+            updated_at=updated_at,
+            file_size=file_size,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            ingested=False,
+        )
+
+        hasher = hashlib.sha256()
+        with tempfile.SpooledTemporaryFile(max_size=config.WBS_DOWNLOAD_SPOOL_BYTES) as spooled:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                if chunk:
+                    hasher.update(chunk)
+                    spooled.write(chunk)
+            sha256 = hasher.hexdigest()
+
+            if entry.get("ingested"):
+                known_hash = entry.get("sha256")
+            else:
+                known_hash = get_stored_wbs_hash(project_id) if single_file else None
+            if sha256 == known_hash:
+                print(f"[건너뜀] 변경 없음 (SHA256 동일: {sha256[:10]}) - 파일: {file.original_file_name}")
+                _save_state_entry(key, dict(new_entry, sha256=sha256, ingested=True))
+                return None
+
+            # 적재가 필요한 경우에만 디스크에 기록합니다. (엑셀 리더가 파일 경로를 요구)
+            spooled.seek(0)
+            with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as tmp_file:
+                shutil.copyfileobj(spooled, tmp_file)
+                tmp_path = tmp_file.name
+
+    print(f"[다운로드 완료] 임시 파일 경로: {tmp_path} (SHA256: {sha256[:10]})")
+    return FetchedWBS(tmp_path, sha256, key, new_entry)
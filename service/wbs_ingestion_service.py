@@ -0,0 +1,174 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+from dotenv import load_dotenv
+
+from api.api_client import APIClient
+from api.dto.response.team_info_response import FileInfo
+from core import config
+from service.job_manager import ITEM_FAILED, ITEM_SKIPPED, ITEM_SUCCESS, JobProgress
+from service.run_wbs_analyzer import run_wbs_agent
+from service.wbs_file_fetcher import fetch_wbs_if_changed, mark_ingested
+
+# WBS 적재는 보고서 생성과 분리된 독립 단계입니다. (wbs_main.py 스케줄러 또는 /wbs-ingest 엔드포인트로 실행)
+# 보고서 생성은 이미 적재된 WBS 데이터만 읽으며, 워터마크로 마지막 적재 시점을 확인할 수 있습니다.
+
+INGEST_INGESTED = "ingested"
+INGEST_UNCHANGED = "unchanged"
+INGEST_FAILED = "failed"
+
+# 스케줄러와 엔드포인트가 동시에 적재를 실행하지 않도록 프로세스 내에서 한 번에 하나만 실행합니다.
+_ingestion_lock = threading.Lock()
+_watermark_lock = threading.Lock()
+
+def download_wbs(project_id: int, files: List[FileInfo]) -> List[str]:
+    """
+    WBS 파일을 스트리밍으로 받으면서 해시를 계산하고, 마지막 적재 이후 바뀐 파일만 적재합니다.
+    (updated_at/file_size, ETag/Last-Modified 조건부 요청, SHA256 순으로 변경 여부 확인)
+    파일별 결과(ingested / unchanged / failed) 목록을 반환합니다.
+    """
+    results: List[str] = []
+    for file in files:
+        fetched = None
+        status = INGEST_FAILED
+        try:
+            fetched = fetch_wbs_if_changed(project_id, file, project_file_count=len(files))
+            if fetched is None:
+                status = INGEST_UNCHANGED
+                continue
+
+            # Agent 실행 (다운로드 중 계산한 해시를 넘겨 파일을 다시 읽지 않음)
+            success_status = run_wbs_agent(
+                project_id=project_id,
+                wbs_file_path=fetched.path,
+                wbs_file_hash=fetched.sha256
+            )
+
+            if success_status:
+                mark_ingested(fetched)
+                status = INGEST_INGESTED
+                print(f"[성공] WBS agent 실행 성공 - 파일: {file.original_file_name}")
+            else:
+                print(f"[실패] WBS agent 실행 실패 - 파일: {file.original_file_name}")
+
+        except requests.RequestException as e:
+            print(f"[에러] 파일 다운로드 중 오류 발생 - 파일: {file.original_file_name} | 에러: {e}")
+        except Exception as e:
+            print(f"[에러] 예기치 못한 오류 발생 - 파일: {file.original_file_name} | 에러: {e}")
+        finally:
+            results.append(status)
+            # 임시 파일 삭제
+            if fetched:
+                fetched.cleanup()
+    return results
+
+def collect_wbs_files(teams) -> Dict[int, List[FileInfo]]:
+    """여러 팀에 연결된 같은 프로젝트/파일이 한 번만 적재되도록 (프로젝트, 파일) 조합을 중복 없이 모읍니다."""
+    files_by_project: Dict[int, List[FileInfo]] = {}
+    seen = set()
+    for team in teams:
+        for proj in team.projects:
+            for file in proj.files:
+                key = (proj.id, file.id)
+                if key in seen:
+                    continue
+                seen.add(key)
+                files_by_project.setdefault(proj.id, []).append(file)
+    return files_by_project
+
+_PROGRESS_STATUS = {INGEST_INGESTED: ITEM_SUCCESS, INGEST_UNCHANGED: ITEM_SKIPPED, INGEST_FAILED: ITEM_FAILED}
+
+def ingest_wbs_files(
+    files_by_project: Dict[int, List[FileInfo]],
+    max_workers: Optional[int] = None,
+    progress: Optional[JobProgress] = None
+) -> Dict[str, int]:
+    """
+    프로젝트별 WBS 파일을 워커 풀에서 병렬로 적재하고 결과별 파일 수를 반환합니다.
+    같은 프로젝트의 파일들은 같은 Qdrant 데이터를 갱신하므로 한 워커에서 순서대로 처리합니다.
+    """
+    counts = {INGEST_INGESTED: 0, INGEST_UNCHANGED: 0, INGEST_FAILED: 0}
+    if not files_by_project:
+        print("적재할 WBS 파일이 없습니다.")
+        return counts
+
+    max_workers = max(1, min(max_workers or config.WBS_INGESTION_MAX_WORKERS, len(files_by_project)))
+    file_count = sum(len(files) for files in files_by_project.values())
+    if progress:
+        progress.set_total(file_count)
+    print(f"WBS 적재 시작: 프로젝트 {len(files_by_project)}개, 파일 {file_count}개, 동시 실행 수 {max_workers}")
+    started_at = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="wbs-ingest") as executor:
+        futures = {
+            executor.submit(download_wbs, project_id, files): project_id
+            for project_id, files in files_by_project.items()
+        }
+        for future in as_completed(futures):
+            project_id = futures[future]
+            try:
+                statuses = future.result()
+            except Exception as e:
+                statuses = [INGEST_FAILED] * len(files_by_project[project_id])
+                print(f"[에러] 프로젝트 {project_id} WBS 적재 중 오류 발생: {e}")
+            for status in statuses:
+                counts[status] += 1
+                if progress:
+                    progress.item_done(_PROGRESS_STATUS[status])
+
+    print(f"WBS 적재 완료: {time.perf_counter() - started_at:.1f}초, 결과: {counts}")
+    return counts
+
+def get_wbs_ingestion_watermark() -> Dict[str, Any]:
+    """마지막 WBS 적재 실행 정보를 반환합니다. 적재된 적이 없으면 빈 dict."""
+    with _watermark_lock:
+        try:
+            with open(config.WBS_INGESTION_WATERMARK_PATH, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+def _save_watermark(watermark: Dict[str, Any]):
+    with _watermark_lock:
+        os.makedirs(os.path.dirname(config.WBS_INGESTION_WATERMARK_PATH), exist_ok=True)
+        tmp_path = f"{config.WBS_INGESTION_WATERMARK_PATH}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(watermark, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, config.WBS_INGESTION_WATERMARK_PATH)
+
+def wbs_ingestion_service(max_workers: Optional[int] = None, progress: Optional[JobProgress] = None) -> Dict[str, Any]:
+    """
+    모든 팀의 WBS 파일을 적재하고 워터마크를 갱신합니다.
+    이미 다른 적재가 실행 중이면 기다리지 않고 {"status": "already_running"}을 반환합니다.
+    """
+    if not _ingestion_lock.acquire(blocking=False):
+        print("WBS 적재가 이미 실행 중입니다. 이번 요청은 건너뜁니다.")
+        return {"status": "already_running", "watermark": get_wbs_ingestion_watermark()}
+
+    try:
+        load_dotenv()
+        started_at = datetime.now().isoformat(timespec="seconds")
+        teams = APIClient().get_teams_info()
+        files_by_project = collect_wbs_files(teams)
+        counts = ingest_wbs_files(files_by_project, max_workers, progress)
+
+        watermark = get_wbs_ingestion_watermark()
+        watermark.update(
+            last_started_at=started_at,
+            last_completed_at=datetime.now().isoformat(timespec="seconds"),
+            projects=len(files_by_project),
+            files=counts,
+        )
+        # 실패 없이 끝난 실행만 "모든 WBS가 이 시점 기준으로 최신"임을 나타냅니다.
+        if counts[INGEST_FAILED] == 0:
+            watermark["last_success_at"] = watermark["last_completed_at"]
+        _save_watermark(watermark)
+        return {"status": "completed", "watermark": watermark}
+    finally:
+        _ingestion_lock.release()
@@ -1,11 +1,17 @@
 from datetime import date, timedelta
-from typing import List
+from typing import List, Optional
 from dotenv import load_dotenv
 
+import requests
+
 from ai.graphs.state_definition import WeeklyLangGraphState
-from ai.graphs.weekly_graph import create_weekly_graph
+from ai.graphs.graph_registry import GRAPH_WEEKLY, get_compiled_graph
 from api.api_client import APIClient
 from schemas.user_info import ProjectInfo, UserInfo
+from service.job_manager import ITEM_FAILED, ITEM_SUCCESS, JobProgress
+from service.job_store import run_work_items
+from service.sharding import to_shard_spec
+from service.report_scope import filter_teams, filter_users
 
 def run_weekly_workflow(user_info: UserInfo, daily_reports: List[str], start_date: str, end_date: str):
     print("--- 주간 보고서 생성 시작 ---")
@@ -24,7 +30,7 @@ def run_weekly_workflow(user_info: UserInfo, daily_reports: List[str], start_dat
     
     # --- 실행 ---
     try:
-        app = create_weekly_graph()
+        app = get_compiled_graph(GRAPH_WEEKLY)
 
         print("\n--- LangGraph 워크플로우 실행 시작 ---")
         final_state = app.invoke(initial_state)
@@ -39,22 +45,37 @@ def run_weekly_workflow(user_info: UserInfo, daily_reports: List[str], start_dat
         print(f"\n[오류] 예기치 않은 오류가 발생했습니다: {e}")
 
 
-def weekly_report_service():
+def weekly_report_service(
+    team_id: Optional[int] = None,
+    user_ids: Optional[List[int]] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    shard_indexes: Optional[List[int]] = None,
+    shard_count: Optional[int] = None,
+    force: bool = False,
+    progress: Optional[JobProgress] = None
+):
+    """
+    팀별 멤버의 주간 보고서를 생성하여 제출합니다.
+    team_id / user_ids / 기간으로 실행 범위를 제한할 수 있으며, progress가 주어지면 사용자별 진행률을 기록합니다.
+    force=True이면 이전 실행에서 완료된 사용자도 다시 생성합니다.
+    """
     load_dotenv()
     print("환경 변수 로드 시도 완료.")
 
-    end_date = date.today()
-    start_date = end_date - timedelta(days=6)
+    if start_date is None or end_date is None:
+        end_date = date.today()
+        start_date = end_date - timedelta(days=6)
 
-    end_date_str = end_date.isoformat()
-    start_date_str = start_date.isoformat()
-    
-    start_date_str = "2025-06-13"
-    end_date_str = "2025-06-19"
+        end_date_str = end_date.isoformat()
+        start_date_str = start_date.isoformat()
+    else:
+        start_date_str, end_date_str = start_date, end_date
     
     client = APIClient()
-    team_info = client.get_teams_info()
+    team_info = filter_teams(client.get_teams_info(), team_id)
     
+    user_infos: List[UserInfo] = []
     for team in team_info:
         print(team.name)
 
@@ -71,18 +92,39 @@ def weekly_report_service():
         ]
         for member in team.members:
             if not member.id == 0:
-                user_info = UserInfo(
+                user_infos.append(UserInfo(
                     id=member.id,
                     name=member.name,
                     email=member.email,
                     team_id=team.id,
                     team_name=team.name,
                     projects=projects
-                )
-                
-                daily_reports = client.get_user_daily_reports(user_id=user_info.id, start_date=start_date_str, end_date=end_date_str)
-                
-                weekly_report = run_weekly_workflow(user_info, daily_reports, start_date_str, end_date_str)
-                
-                if weekly_report:
-                    client.submit_user_weekly_report(user_id=member.id, start_date=start_date_str, end_date=end_date_str, report_content=weekly_report)
+                ))
+
+    user_infos = filter_users(user_infos, user_ids)
+
+    def process_member(item_key: str, user_info: UserInfo) -> str:
+        try:
+            daily_reports = client.get_user_daily_reports(user_id=user_info.id, start_date=start_date_str, end_date=end_date_str)
+            
+            weekly_report = run_weekly_workflow(user_info, daily_reports, start_date_str, end_date_str)
+            
+            if weekly_report:
+                response = client.submit_user_weekly_report(user_id=user_info.id, start_date=start_date_str, end_date=end_date_str, report_content=weekly_report)
+                if response.ok:
+                    return ITEM_SUCCESS
+        except requests.RequestException as e:
+            print(f"[에러] {user_info.name} 주간 보고서 처리 중 API 오류: {e}")
+        return ITEM_FAILED
+
+    # 영속 작업 큐(job_store)를 통해 처리하므로 중단 후 같은 기간으로 다시 실행하면 이미 제출한 사용자는 건너뜁니다.
+    counts = run_work_items(
+        f"weekly:{start_date_str}:{end_date_str}",
+        {f"user:{user_info.id}": user_info for user_info in user_infos},
+        process_member,
+        progress=progress,
+        shard=to_shard_spec(shard_indexes, shard_count),
+        force=force
+    )
+
+    return {"start_date": start_date_str, "end_date": end_date_str, "users": len(user_infos), **counts}
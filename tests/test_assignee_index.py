@@ -0,0 +1,70 @@
+import os
+import random
+
+import pytest
+
+os.environ.setdefault("QDRANT_PORT", "6333")
+
+pytest.importorskip("qdrant_client")
+pytest.importorskip("sentence_transformers")
+
+from ai.tools.wbs_retriever_tool import AssigneeIndex, ProjectTaskEntry, _filter_tasks_by_assignee_linear
+
+TASKS = [
+    {"task_id": "T1", "assignee": "홍길동"},
+    {"task_id": "T2", "assignee": "홍길동, 김철수"},
+    {"task_id": "T3", "assignee": "김철수/이영희; 박민수\n홍길동"},
+    {"task_id": "T4", "assignee": ["홍길동", "이영희"]},
+    {"task_id": "T5", "assignee": ["김철수"]},
+    {"task_id": "T6", "assignee": "홍길동2"},
+    {"task_id": "T7", "assignee": None},
+    {"task_id": "T8", "assignee": 42},
+    {"task_id": "T9"},
+    {"task_id": "T10", "assignee": ["a,b"]},
+]
+
+
+def _ids(tasks):
+    return [task["task_id"] for task in tasks]
+
+
+@pytest.mark.parametrize("name", ["홍길동", "김철수", "이영희", "박민수", "길동", "철수/이영", "a,b", "없는사람", ""])
+def test_index_matches_linear_filter(name):
+    # 문자열(단일/쉼표/슬래시/세미콜론/줄바꿈 혼합), 구분자 없는 리스트, 부분 문자열 이름 모두 기존 필터와 같은 결과
+    entry = ProjectTaskEntry("hash", TASKS)
+    assert _ids(entry.tasks_for_assignee(name)) == _ids(_filter_tasks_by_assignee_linear(TASKS, name))
+
+
+def test_index_is_superset_of_linear_filter_for_random_tasks():
+    members = ["홍길동", "김철수", "이영희", "박민수", "최지우"]
+    rng = random.Random(7)
+    tasks = []
+    for i in range(300):
+        picked = rng.sample(members, rng.randint(1, 3))
+        form = i % 4
+        if form == 0:
+            assignee = picked[0]
+        elif form == 1:
+            assignee = picked
+        elif form == 2:
+            assignee = rng.choice([", ", "/", ";", "\n"]).join(picked)
+        else:
+            assignee = [", ".join(picked)] # 구분자를 포함한 리스트 원소
+        tasks.append({"task_id": f"T{i}", "assignee": assignee})
+
+    entry = ProjectTaskEntry("hash", tasks)
+    for name in members + ["길동", "김"]:
+        linear = set(_ids(_filter_tasks_by_assignee_linear(tasks, name)))
+        indexed = _ids(entry.tasks_for_assignee(name))
+        assert indexed == sorted(indexed, key=lambda task_id: int(task_id[1:])) # 원래 순서 유지
+        assert linear <= set(indexed)
+
+
+def test_list_elements_are_split_into_tokens_unlike_linear_filter():
+    # 의도된 차이: 리스트 원소 안의 구분자/공백도 분리하므로 기존 필터가 놓치던 작업을 찾음
+    tasks = [{"task_id": "T1", "assignee": ["홍길동, 김철수"]}, {"task_id": "T2", "assignee": [" 김철수 "]}]
+    index = AssigneeIndex(tasks)
+    assert _filter_tasks_by_assignee_linear(tasks, "김철수") == []
+    assert index.lookup("김철수") == [0, 1]
+    assert index.lookup(" 김철수 ") == [0, 1]
+    assert index.lookup("김철수") is index.lookup("김철수") # 이름별 결과 메모이즈
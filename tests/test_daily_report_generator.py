@@ -0,0 +1,46 @@
+import asyncio
+import os
+
+import pytest
+
+os.environ.setdefault("QDRANT_PORT", "6333")
+
+pytest.importorskip("langchain_openai")
+pytest.importorskip("sentence_transformers")
+
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import RunnableLambda
+
+from ai.agents.daily_report_generator import DailyReportGenerator
+
+
+def _failing_llm(_):
+    raise RuntimeError("LLM 호출 실패")
+
+
+@pytest.fixture
+def generator():
+    # LLM 클라이언트 없이 체인 실패 처리만 검증
+    generator = DailyReportGenerator.__new__(DailyReportGenerator)
+    generator.prompt = PromptTemplate.from_template("{user_name}")
+    generator.llm = RunnableLambda(_failing_llm)
+    generator.parser = JsonOutputParser()
+    return generator
+
+
+def _state():
+    return {"user_name": "홍길동", "user_id": 1, "target_date": "2025-06-19", "error_message": ""}
+
+
+def test_generate_daily_report_returns_error_report_when_chain_raises(generator):
+    update = generator.generate_daily_report(_state())
+    assert update["comprehensive_report"]["error"] == "보고서 생성 실패"
+    assert "LLM 호출 실패" in update["comprehensive_report"]["message"]
+    assert "LLM 호출 실패" in update["error_message"]
+
+
+def test_agenerate_daily_report_returns_error_report_when_chain_raises(generator):
+    update = asyncio.run(generator.agenerate_daily_report(_state()))
+    assert update["comprehensive_report"]["error"] == "보고서 생성 실패"
+    assert "LLM 호출 실패" in update["error_message"]
@@ -0,0 +1,105 @@
+import os
+import threading
+import time
+
+import pytest
+
+os.environ.setdefault("QDRANT_PORT", "6333")
+
+from service.job_manager import ITEM_FAILED, ITEM_SKIPPED, ITEM_SUCCESS, JobProgress
+from service.job_store import STATE_DONE, STATE_FAILED, JobStore, _lease_heartbeat, run_work_items
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / "job_store.sqlite3"), lease_seconds=60, max_attempts=2)
+
+
+def test_claim_takes_each_item_once_in_key_order(store):
+    store.enqueue("b", ["user:2", "user:1", "user:3"])
+    claimed = [store.claim("b", "w1") for _ in range(4)]
+    assert claimed == ["user:1", "user:2", "user:3", None]
+
+
+def test_claim_only_from_allowed_keys_across_chunks(store):
+    keys = [f"user:{i:04d}" for i in range(1200)]
+    store.enqueue("b", keys)
+    # IN (...) 조회를 여러 묶음으로 나누는 경우에도 뒤쪽 묶음의 키를 찾아야 함
+    assert store.claim("b", "w1", keys[1100:1101]) == keys[1100]
+    assert store.claim("b", "w1", ["user:9999"]) is None
+
+
+def test_expired_lease_is_reclaimed_and_old_owner_cannot_overwrite(store):
+    store.enqueue("b", ["user:1"])
+    store.lease_seconds = -1 # 가져가자마자 임대 만료
+    assert store.claim("b", "w1") == "user:1"
+    store.lease_seconds = 60
+    assert store.claim("b", "w2") == "user:1"
+
+    assert not store.complete("b", "user:1", "w1") # 임대를 잃은 워커의 결과는 기록되지 않음
+    assert not store.renew("b", "user:1", "w1")
+    assert store.fail("b", "user:1", "w2", "new owner failed")
+    # 두 번 가져가 시도 횟수가 max_attempts에 도달했으므로 재시도 한도 초과로 집계
+    assert store.summary("b") == {STATE_FAILED: 1, "exhausted": 1}
+
+
+def test_renew_keeps_item_from_being_reclaimed(store):
+    store.enqueue("b", ["user:1"])
+    store.lease_seconds = -1
+    assert store.claim("b", "w1") == "user:1"
+    store.lease_seconds = 60
+    assert store.renew("b", "user:1", "w1")
+    assert store.claim("b", "w2") is None
+    assert store.complete("b", "user:1", "w1")
+    assert not store.renew("b", "user:1", "w1") # 완료된 항목은 연장 대상 아님
+
+
+def test_heartbeat_renews_lease_while_handler_runs(tmp_path):
+    store = JobStore(str(tmp_path / "heartbeat.sqlite3"), lease_seconds=3, max_attempts=1)
+    store.enqueue("b", ["user:1"])
+    assert store.claim("b", "w1") == "user:1"
+    stolen = []
+
+    def try_steal():
+        for _ in range(7):
+            time.sleep(0.5)
+            stolen.append(store.claim("b", "w2"))
+
+    thief = threading.Thread(target=try_steal)
+    thief.start()
+    with _lease_heartbeat(store, "b", "user:1", "w1"):
+        time.sleep(3.6) # 임대 시간보다 오래 처리
+    thief.join()
+    assert stolen == [None] * 7
+
+
+def test_resume_skips_done_items_and_reports_exhausted_failures(store):
+    items = {"user:1": 1, "user:2": 2, "user:3": 3}
+    calls = []
+
+    def handler(item_key, item):
+        calls.append(item_key)
+        if item_key == "user:2":
+            raise RuntimeError("생성 실패")
+        return ITEM_SUCCESS
+
+    assert run_work_items("daily:d", items, handler, store=store) == {ITEM_SUCCESS: 2, ITEM_SKIPPED: 0, ITEM_FAILED: 1}
+
+    # 재개: 완료 항목은 건너뛰고 실패 항목만 재시도 (max_attempts=2)
+    calls.clear()
+    progress = JobProgress("job", "daily", {})
+    assert run_work_items("daily:d", items, handler, store=store, progress=progress) == {ITEM_SUCCESS: 0, ITEM_SKIPPED: 2, ITEM_FAILED: 1}
+    assert calls == ["user:2"]
+    assert progress.resumed == 2
+    assert store.summary("daily:d") == {STATE_DONE: 2, STATE_FAILED: 1, "exhausted": 1}
+
+    # 재시도 한도를 넘은 항목은 다시 실행하지 않지만 결과에는 실패로 집계
+    calls.clear()
+    progress = JobProgress("job", "daily", {})
+    assert run_work_items("daily:d", items, handler, store=store, progress=progress) == {ITEM_SUCCESS: 0, ITEM_SKIPPED: 2, ITEM_FAILED: 1}
+    assert calls == []
+    assert progress.resumed == 3
+
+    # force 실행은 모든 항목을 처음부터 다시 처리
+    assert run_work_items("daily:d", items, handler, store=store, force=True) == {ITEM_SUCCESS: 2, ITEM_SKIPPED: 0, ITEM_FAILED: 1}
+    assert sorted(calls) == ["user:1", "user:2", "user:3"]
@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QDRANT_PORT", "6333")
+
+pytest.importorskip("langchain_core")
+
+from langchain.globals import set_llm_cache
+from langchain_core.exceptions import OutputParserException
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.prompts import PromptTemplate
+
+from ai.utils.llm_cache import SQLiteLLMCache
+from ai.utils.rate_limiter import PROVIDER_OPENAI, invoke_chain
+
+
+@pytest.fixture
+def llm_cache(tmp_path):
+    cache = SQLiteLLMCache(str(tmp_path / "llm_cache.sqlite3"), ttl_seconds=0, max_entries=100)
+    set_llm_cache(cache)
+    yield cache
+    set_llm_cache(None)
+
+
+def test_unparsable_response_is_not_cached(llm_cache):
+    # 첫 응답은 파싱 불가, 두 번째 응답은 올바른 JSON
+    llm = FakeListChatModel(responses=["not json", '{"ok": true}'])
+    chain = PromptTemplate.from_template("보고서: {text}") | llm | JsonOutputParser()
+
+    with pytest.raises(OutputParserException):
+        invoke_chain(chain, {"text": "a"}, PROVIDER_OPENAI)
+    assert llm_cache.stats()["writes"] == 0
+    assert llm_cache.stats()["discarded"] == 1
+
+    # 재시도는 캐시된 실패 응답이 아니라 LLM의 새 응답을 받아야 함
+    assert invoke_chain(chain, {"text": "a"}, PROVIDER_OPENAI) == {"ok": True}
+    assert llm_cache.stats()["writes"] == 1
+
+    # 이후 호출은 성공한 응답을 캐시에서 재사용
+    assert invoke_chain(chain, {"text": "a"}, PROVIDER_OPENAI) == {"ok": True}
+    assert llm_cache.stats()["hits"] == 1
+    assert llm_cache.stats()["writes"] == 1
+
+
+def test_cached_response_failing_to_parse_is_evicted(llm_cache):
+    # 캐시 밖에서(파서 없이) 기록된 파싱 불가 응답은 적중 후 파싱에 실패하면 삭제됨
+    llm = FakeListChatModel(responses=["not json", '{"ok": true}'])
+    llm.invoke("보고서: b")
+    assert llm_cache.stats()["writes"] == 1
+
+    chain = PromptTemplate.from_template("보고서: {text}") | llm | JsonOutputParser()
+    with pytest.raises(OutputParserException):
+        invoke_chain(chain, {"text": "b"}, PROVIDER_OPENAI)
+    assert llm_cache.stats()["invalidated"] == 1
+
+    assert invoke_chain(chain, {"text": "b"}, PROVIDER_OPENAI) == {"ok": True}
@@ -0,0 +1,98 @@
+import os
+import socket
+
+import pytest
+import requests
+
+os.environ.setdefault("QDRANT_PORT", "6333")
+
+from service import sharding
+
+
+def test_shard_of_is_stable_crc32():
+    # 파이썬 hash()와 달리 프로세스/레플리카가 달라도 값이 같아야 함
+    assert [sharding.shard_of(key, 3) for key in ["user:1", "user:2", "project:42", "홍길동"]] == [0, 1, 0, 1]
+    assert sharding.shard_of("user:1", 1) == 0
+
+
+def test_shards_partition_items_exactly_once():
+    items = {f"user:{i}": i for i in range(100)}
+    selected = [sharding.select_shard("b", items, ([index], 4)) for index in range(4)]
+    assert sorted(key for shard in selected for key in shard) == sorted(items)
+    assert sharding.select_shard("b", items, None) is items
+
+
+class _Response:
+    def __init__(self, job_id):
+        self.job_id = job_id
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"job_id": self.job_id}
+
+
+@pytest.fixture
+def hash_mode(monkeypatch):
+    monkeypatch.setattr(sharding.config, "SHARD_MODE", sharding.SHARD_MODE_HASH)
+    monkeypatch.setattr(sharding.config, "SHARD_PEERS_HOST", "report-peers")
+    monkeypatch.setattr(sharding.config, "SHARD_PEER_PORT", 8000)
+    monkeypatch.setattr(sharding.socket, "gethostname", lambda: "pod-b")
+    monkeypatch.setattr(sharding.socket, "gethostbyname", lambda host: "10.0.0.2")
+
+
+def _peers(*ips):
+    def getaddrinfo(host, port, proto=0):
+        assert host == "report-peers"
+        return [(socket.AF_INET, socket.SOCK_STREAM, proto, "", (ip, port)) for ip in ips]
+    return getaddrinfo
+
+
+def test_failed_peer_shard_is_reassigned_to_coordinator(monkeypatch, hash_mode):
+    monkeypatch.setattr(sharding.socket, "getaddrinfo", _peers("10.0.0.3", "10.0.0.1", "10.0.0.2", "10.0.0.3"))
+    calls = []
+
+    def fake_get(url, params, timeout):
+        calls.append((url, params))
+        if url.startswith("http://10.0.0.3"):
+            raise requests.ConnectionError("connection refused")
+        return _Response("job-a")
+
+    monkeypatch.setattr(sharding.requests, "get", fake_get)
+    spec, results = sharding.fan_out_shards("/reports/daily", {"target_date": "2026-10-16", "project_id": None})
+
+    # 정렬된 IP 순서로 샤드 번호 부여: 10.0.0.1=0, 10.0.0.2(자신)=1, 10.0.0.3=2
+    assert spec == ([1, 2], 3)
+    assert calls == [
+        ("http://10.0.0.1:8000/reports/daily", {"target_date": "2026-10-16", "shard_index": 0, "shard_count": 3}),
+        ("http://10.0.0.3:8000/reports/daily", {"target_date": "2026-10-16", "shard_index": 2, "shard_count": 3}),
+    ]
+    assert results[0] == {"shard_index": 0, "peer": "10.0.0.1", "job_id": "job-a"}
+    assert results[1]["shard_index"] == 2 and "connection refused" in results[1]["error"]
+
+
+def test_unresolvable_peers_host_processes_everything_locally(monkeypatch, hash_mode):
+    def getaddrinfo(host, port, proto=0):
+        raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+
+    def fail_get(*args, **kwargs):
+        raise AssertionError("레플리카 목록이 없으면 요청을 전달하지 않아야 함")
+
+    monkeypatch.setattr(sharding.socket, "getaddrinfo", getaddrinfo)
+    monkeypatch.setattr(sharding.requests, "get", fail_get)
+    assert sharding.fan_out_shards("/reports/daily", {}) == (None, [])
+
+
+def test_single_replica_does_not_shard(monkeypatch, hash_mode):
+    monkeypatch.setattr(sharding.socket, "getaddrinfo", _peers("10.0.0.2"))
+    assert sharding.fan_out_shards("/reports/daily", {}) == (None, [])
+
+
+def test_requested_shard_validates_parameters():
+    assert sharding.requested_shard(None, None) is None
+    assert sharding.requested_shard(1, 3) == ([1], 3)
+    with pytest.raises(ValueError):
+        sharding.requested_shard(3, 3)
+    with pytest.raises(ValueError):
+        sharding.requested_shard(0, None)
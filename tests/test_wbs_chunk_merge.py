@@ -0,0 +1,61 @@
+import json
+import os
+
+import pytest
+
+os.environ.setdefault("QDRANT_PORT", "6333")
+
+pytest.importorskip("langchain_openai")
+
+from ai.utils.llm_interface import estimate_tokens, merge_wbs_results, split_records_by_token_budget
+
+
+def _tokens(records):
+    return sum(estimate_tokens(json.dumps(record, ensure_ascii=False)) for record in records)
+
+
+def test_split_keeps_order_and_token_budget():
+    records = [{"row_number": i, "작업명": f"작업 {i}", "담당자": "홍길동"} for i in range(50)]
+    budget = _tokens(records[:5])
+
+    chunks = split_records_by_token_budget(records, budget)
+
+    assert [record for chunk in chunks for record in chunk] == records
+    assert len(chunks) > 1
+    assert all(_tokens(chunk) <= budget for chunk in chunks)
+
+
+def test_split_puts_oversized_record_in_its_own_chunk():
+    records = [{"a": "짧음"}, {"a": "긴 내용 " * 200}, {"a": "짧음2"}]
+    chunks = split_records_by_token_budget(records, 20)
+    assert chunks == [[records[0]], [records[1]], [records[2]]]
+
+
+def test_split_empty_records():
+    assert split_records_by_token_budget([], 100) == []
+
+
+def test_merge_keeps_different_tasks_with_same_task_id():
+    merged, chunk_indexes = merge_wbs_results([
+        {"project_summary": None, "task_list": [{"task_id": "1.1", "task_name": "설계"}]},
+        {"project_summary": "요약", "task_list": [{"task_id": "1.1", "task_name": "테스트"}]},
+    ])
+    assert merged["task_list"] == [{"task_id": "1.1", "task_name": "설계"}, {"task_id": "1.1", "task_name": "테스트"}]
+    assert chunk_indexes == [0, 1]
+    assert merged["project_summary"] == "요약"
+
+
+def test_merge_collapses_exact_duplicates_and_keeps_first_chunk():
+    task = {"task_id": "2.1", "task_name": "구현", "assignee": "김철수"}
+    merged, chunk_indexes = merge_wbs_results([
+        {"project_summary": "첫 요약", "task_list": [task]},
+        {"project_summary": "두 번째 요약", "task_list": [dict(task), {"task_name": "검수"}]},
+    ])
+    assert merged["task_list"] == [task, {"task_name": "검수"}]
+    assert chunk_indexes == [0, 1]
+    assert merged["project_summary"] == "첫 요약"
+
+
+def test_merge_is_deterministic_for_same_input():
+    results = [{"task_list": [{"task_id": str(i)} for i in range(chunk, chunk + 3)]} for chunk in range(3)]
+    assert merge_wbs_results(results) == merge_wbs_results(results)
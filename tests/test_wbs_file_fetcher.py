@@ -0,0 +1,137 @@
+import hashlib
+import os
+from datetime import datetime
+
+import pytest
+
+os.environ.setdefault("QDRANT_PORT", "6333")
+
+pytest.importorskip("qdrant_client")
+pytest.importorskip("sentence_transformers")
+
+from api.dto.response.team_info_response import FileInfo
+from service import wbs_file_fetcher as fetcher
+
+PROJECT_ID = 7
+
+
+class _Response:
+    def __init__(self, body: bytes, status_code: int = 200):
+        self.body = body
+        self.status_code = status_code
+        self.headers = {"ETag": f'"{hashlib.md5(body).hexdigest()}"'}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        yield self.body
+
+
+class _Server:
+    """파일 URL별 본문을 돌려주는 가짜 다운로드 서버 (요청 기록 포함)"""
+
+    def __init__(self, bodies):
+        self.bodies = bodies
+        self.requests = []
+
+    def get(self, url, headers, stream, timeout):
+        self.requests.append((url, headers))
+        body = self.bodies[url]
+        if headers.get("If-None-Match") == f'"{hashlib.md5(body).hexdigest()}"':
+            return _Response(b"", status_code=304)
+        return _Response(body)
+
+
+def _file(file_id: int, updated_at: str = "2026-10-01T00:00:00") -> FileInfo:
+    return FileInfo(
+        id=file_id, created_at=datetime(2026, 1, 1), updated_at=datetime.fromisoformat(updated_at),
+        original_file_name=f"wbs_{file_id}.xlsx", file_url=f"http://files/{file_id}", file_size="100"
+    )
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    monkeypatch.setattr(fetcher.config, "WBS_DOWNLOAD_STATE_PATH", str(tmp_path / "state" / "wbs_download_state.json"))
+    server = _Server({"http://files/1": b"wbs-one", "http://files/2": b"wbs-two"})
+    monkeypatch.setattr(fetcher.requests, "get", server.get)
+    stored = {"hash": None}
+    monkeypatch.setattr(fetcher, "get_stored_wbs_hash", lambda project_id: stored["hash"])
+    return server, stored
+
+
+def _ingest(fetched, stored):
+    """적재 성공을 흉내냅니다. Qdrant의 프로젝트 해시는 마지막으로 적재한 파일의 해시가 됩니다."""
+    stored["hash"] = fetched.sha256
+    fetcher.mark_ingested(fetched)
+    fetched.cleanup()
+
+
+def test_single_file_skips_until_file_or_stored_hash_changes(env):
+    server, stored = env
+    fetched = fetcher.fetch_wbs_if_changed(PROJECT_ID, _file(1))
+    assert fetched is not None and fetched.sha256 == hashlib.sha256(b"wbs-one").hexdigest()
+    _ingest(fetched, stored)
+
+    # updated_at/file_size가 같으면 HTTP 요청 없이 건너뜀
+    assert fetcher.fetch_wbs_if_changed(PROJECT_ID, _file(1)) is None
+    assert len(server.requests) == 1
+
+    # updated_at만 바뀌고 내용이 같으면 조건부 요청(304)으로 건너뜀
+    assert fetcher.fetch_wbs_if_changed(PROJECT_ID, _file(1, "2026-10-02T00:00:00")) is None
+    assert "If-None-Match" in server.requests[-1][1]
+
+    # Qdrant 데이터가 사라지면(컬렉션 초기화 등) 적재 기록을 믿지 않고 다시 내려받음
+    stored["hash"] = None
+    fetched = fetcher.fetch_wbs_if_changed(PROJECT_ID, _file(1, "2026-10-02T00:00:00"))
+    assert fetched is not None
+    assert server.requests[-1][1] == {}
+    fetched.cleanup()
+
+
+def test_multi_file_project_skips_every_unchanged_file(env):
+    server, stored = env
+    files = [_file(1), _file(2)]
+    for file in files:
+        fetched = fetcher.fetch_wbs_if_changed(PROJECT_ID, file, project_file_count=len(files))
+        assert fetched is not None
+        _ingest(fetched, stored)
+    assert len(server.requests) == 2
+
+    # 프로젝트 해시는 마지막 파일(2)의 해시지만, 파일 1도 다시 내려받지 않아야 함
+    assert stored["hash"] == hashlib.sha256(b"wbs-two").hexdigest()
+    for file in files:
+        assert fetcher.fetch_wbs_if_changed(PROJECT_ID, file, project_file_count=len(files)) is None
+    assert len(server.requests) == 2
+
+
+def test_changed_content_is_refetched(env):
+    server, stored = env
+    _ingest(fetcher.fetch_wbs_if_changed(PROJECT_ID, _file(1)), stored)
+
+    server.bodies["http://files/1"] = b"wbs-one-v2"
+    fetched = fetcher.fetch_wbs_if_changed(PROJECT_ID, _file(1, "2026-10-03T00:00:00"))
+    assert fetched is not None and fetched.sha256 == hashlib.sha256(b"wbs-one-v2").hexdigest()
+    with open(fetched.path, "rb") as f:
+        assert f.read() == b"wbs-one-v2"
+    fetched.cleanup()
+
+
+def test_unrecorded_file_matching_stored_hash_is_skipped_only_for_single_file_projects(env):
+    server, stored = env
+    stored["hash"] = hashlib.sha256(b"wbs-one").hexdigest() # 상태 파일 없이 이미 적재된 데이터
+
+    assert fetcher.fetch_wbs_if_changed(PROJECT_ID, _file(1)) is None
+    assert fetcher.get_state_entry(PROJECT_ID, _file(1))["ingested"] is True
+
+    # 파일이 여럿이면 프로젝트 해시가 어느 파일의 것인지 알 수 없으므로, 해시가 같아도 적재 기록이 없는 파일은 적재
+    stored["hash"] = hashlib.sha256(b"wbs-two").hexdigest()
+    fetched = fetcher.fetch_wbs_if_changed(PROJECT_ID, _file(2), project_file_count=2)
+    assert fetched is not None
+    fetched.cleanup()
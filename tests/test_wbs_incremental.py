@@ -0,0 +1,175 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QDRANT_PORT", "6333")
+
+from ai.utils import wbs_diff
+
+
+def _record(row_number, **fields):
+    return {"sheet_name": "WBS", **fields, "row_number": row_number}
+
+
+def _rows(*records):
+    return wbs_diff.build_rows(records)
+
+
+def _hash(**fields):
+    return wbs_diff.compute_row_hash(_record(0, **fields))
+
+
+def test_build_rows_suffixes_duplicate_rows_and_ignores_row_number():
+    rows = _rows(_record(2, 작업명="설계"), _record(3, 작업명="설계"), _record(4, 작업명="설계"))
+    base = _hash(작업명="설계")
+    assert [row["row_hash"] for row in rows] == [base, f"{base}:1", f"{base}:2"]
+    assert [row["row_number"] for row in rows] == [2, 3, 4]
+
+
+def test_plan_keeps_unchanged_rewrites_changed_and_deletes_removed():
+    stored = {
+        "p-unchanged": [_hash(작업명="설계")],
+        "p-changed": [_hash(작업명="구현", 담당자="홍길동")],
+        "p-removed": [_hash(작업명="폐기된 작업")],
+    }
+    rows = _rows(
+        _record(2, 작업명="설계"),
+        _record(3, 작업명="구현", 담당자="김철수"), # 변경된 행
+        _record(4, 작업명="테스트"), # 추가된 행
+    )
+
+    plan = wbs_diff.plan_incremental_update(rows, stored)
+
+    assert plan.kept_point_ids == ["p-unchanged"]
+    assert sorted(plan.stale_point_ids) == ["p-changed", "p-removed"]
+    assert [row["record"]["작업명"] for row in plan.rows_to_analyze] == ["구현", "테스트"]
+    assert plan.total_rows == 3
+    assert plan.change_ratio == pytest.approx(2 / 3)
+    assert plan.has_changes
+
+
+def test_plan_moved_rows_are_not_changes():
+    stored = {"p1": [_hash(작업명="설계")], "p2": [_hash(작업명="구현")]}
+    # 위에 행이 삽입되어 행 번호가 밀려도 내용이 같으면 변경이 아님
+    rows = _rows(_record(10, 작업명="구현"), _record(11, 작업명="설계"))
+    plan = wbs_diff.plan_incremental_update(rows, stored)
+    assert sorted(plan.kept_point_ids) == ["p1", "p2"]
+    assert plan.stale_point_ids == [] and plan.rows_to_analyze == []
+    assert not plan.has_changes
+
+
+def test_plan_removing_one_of_duplicate_rows_deletes_only_its_point():
+    base = _hash(작업명="점검")
+    stored = {"p-first": [base], "p-second": [f"{base}:1"]}
+    rows = _rows(_record(2, 작업명="점검"))
+    plan = wbs_diff.plan_incremental_update(rows, stored)
+    assert plan.kept_point_ids == ["p-first"]
+    assert plan.stale_point_ids == ["p-second"]
+    assert plan.rows_to_analyze == []
+
+
+def test_plan_point_spanning_a_changed_row_is_rewritten_with_all_its_rows():
+    stored = {"p-group": [_hash(작업명="설계"), _hash(비고="설계 세부")]}
+    rows = _rows(_record(2, 작업명="설계"), _record(3, 비고="설계 세부 (수정)"))
+    plan = wbs_diff.plan_incremental_update(rows, stored)
+    assert plan.stale_point_ids == ["p-group"]
+    assert len(plan.rows_to_analyze) == 2
+
+
+def test_plan_requires_row_hashes_on_every_point():
+    assert wbs_diff.plan_incremental_update(_rows(_record(2, 작업명="설계")), {"legacy": None}) is None
+
+
+def test_attribute_tasks_to_rows():
+    rows = _rows(
+        _record(2, 구분="1. 설계"), # 어떤 작업과도 일치하지 않는 구분 행 → 다음 작업에 연결
+        _record(3, 작업ID="1.1", 작업명="요구사항 정의"),
+        _record(4, 작업ID="1.2", 작업명="화면 설계"),
+    )
+    tasks = [
+        {"task_id": "1.1", "task_name": "요구사항 정의"},
+        {"task_id": "1.2", "task_name": "화면 설계"},
+        {"task_id": "9.9", "task_name": "LLM이 만든 작업"}, # 일치하는 행 없음 → 모든 행
+    ]
+    attributed = wbs_diff.attribute_tasks_to_rows(tasks, rows)
+    hashes = [row["row_hash"] for row in rows]
+    assert attributed == [hashes[0:2], hashes[2:3], hashes]
+
+
+@pytest.fixture
+def agent_module():
+    pytest.importorskip("qdrant_client")
+    pytest.importorskip("sentence_transformers")
+    from ai.agents import wbs_analysis_agent
+    return wbs_analysis_agent
+
+
+class _FakeDBHandler:
+    def __init__(self, stored_row_hashes):
+        self.stored_row_hashes = stored_row_hashes
+        self.deleted = []
+        self.store_calls = []
+        self.updated_hash = None
+
+    def get_stored_row_hashes(self):
+        return self.stored_row_hashes
+
+    def initialize_embedding_model(self):
+        pass
+
+    def store_llm_analysis_results(self, result, wbs_hash, task_row_hashes=None, reserved_ids=None):
+        self.store_calls.append({"reserved_ids": list(reserved_ids or []), "tasks": result["task_list"]})
+        return ["p-changed"] # 변경된 작업은 같은 task_id로 제자리 갱신
+
+    def delete_points(self, point_ids):
+        self.deleted.extend(point_ids)
+
+    def update_wbs_hash(self, wbs_hash):
+        self.updated_hash = wbs_hash
+
+
+def _agent(agent_module, db_handler):
+    agent = agent_module.WBSAnalysisAgent.__new__(agent_module.WBSAnalysisAgent)
+    agent.project_id = 7
+    agent.db_handler = db_handler
+    return agent
+
+
+def test_incremental_plan_falls_back_to_full_ingestion(agent_module, monkeypatch):
+    stored = {"p1": [_hash(작업명="설계")], "p2": [_hash(작업명="구현")]}
+    rows = _rows(_record(2, 작업명="설계"), _record(3, 작업명="구현 (변경)"))
+    agent = _agent(agent_module, _FakeDBHandler(stored))
+
+    monkeypatch.setattr(agent_module.config, "WBS_INCREMENTAL_MAX_CHANGE_RATIO", 0.5)
+    assert agent._choose_incremental_plan(rows, "old-hash", force_full=False) is not None # 1/2 = 기준과 같음
+    monkeypatch.setattr(agent_module.config, "WBS_INCREMENTAL_MAX_CHANGE_RATIO", 0.4)
+    assert agent._choose_incremental_plan(rows, "old-hash", force_full=False) is None
+    assert agent._choose_incremental_plan(rows, None, force_full=False) is None # 첫 적재
+    assert agent._choose_incremental_plan(rows, "old-hash", force_full=True) is None
+    assert _agent(agent_module, _FakeDBHandler({"legacy": None}))._choose_incremental_plan(rows, "old-hash", False) is None
+
+
+def test_incremental_update_reserves_kept_ids_and_deletes_only_unwritten_stale_points(agent_module, monkeypatch):
+    stored = {
+        "p-unchanged": [_hash(작업명="설계")],
+        "p-changed": [_hash(작업명="구현")],
+        "p-removed": [_hash(작업명="폐기")],
+    }
+    rows = _rows(_record(2, 작업명="설계"), _record(3, 작업명="구현 (변경)"))
+    db_handler = _FakeDBHandler(stored)
+    agent = _agent(agent_module, db_handler)
+    plan = wbs_diff.plan_incremental_update(rows, stored)
+
+    analyzed_rows = []
+
+    def analyze(rows_to_analyze):
+        analyzed_rows.extend(rows_to_analyze)
+        return {"task_list": [{"task_id": "2", "task_name": "구현 (변경)"}]}, [[row["row_hash"] for row in rows_to_analyze]]
+
+    monkeypatch.setattr(agent, "_analyze_rows", analyze)
+    assert agent._run_incremental_update(plan, "new-hash")
+
+    assert [row["record"]["작업명"] for row in analyzed_rows] == ["구현 (변경)"]
+    assert db_handler.store_calls[0]["reserved_ids"] == ["p-unchanged"]
+    assert db_handler.deleted == ["p-removed"] # p-changed는 제자리 갱신되어 삭제하지 않음
+    assert db_handler.updated_hash == "new-hash"
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QDRANT_PORT", "6333")
+
+numpy = pytest.importorskip("numpy")
+pytest.importorskip("qdrant_client")
+pytest.importorskip("sentence_transformers")
+
+from ai.utils.vector_db import VectorDBHandler
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    # Qdrant/임베딩 모델 없이 포인트 ID 결정 로직만 검증
+    handler = VectorDBHandler.__new__(VectorDBHandler)
+    handler.project_id = 7
+    handler.collection_name = "WBSData"
+    handler.embedding_model_name = "test"
+    handler.embedding_dim = 4
+    handler.upserted_ids = []
+    monkeypatch.setattr(handler, "_get_embedding_matrix", lambda texts: numpy.zeros((len(texts), 4), dtype=numpy.float32))
+
+    def upsert(ids, matrix, payloads):
+        handler.upserted_ids.extend(ids)
+        return True
+
+    monkeypatch.setattr(handler, "_upsert_in_batches", upsert)
+    return handler
+
+
+def test_changed_row_does_not_overwrite_kept_point_with_same_task_id(handler):
+    # 변경되지 않은 행에서 온 작업 T1 포인트는 증분 적재에서 유지됨
+    kept_point_id = handler._deterministic_point_id({"task_id": "T1"}, set())
+
+    # 변경된 행의 분석 결과에도 같은 task_id가 나옴 (중복 task_id)
+    result = {"task_list": [{"task_id": "T1", "task_name": "변경된 작업", "assignee": "홍길동"}]}
+    written_ids = handler.store_llm_analysis_results(result, "hash", [["row-b"]], reserved_ids=[kept_point_id])
+
+    assert written_ids and kept_point_id not in written_ids
+    assert kept_point_id not in handler.upserted_ids
+
+
+def test_point_ids_are_stable_without_reserved_ids(handler):
+    # 예약이 없으면 같은 작업은 같은 포인트를 제자리에서 덮어씀 (전체 재적재)
+    result = {"task_list": [{"task_id": "T1", "task_name": "작업"}]}
+    assert handler.store_llm_analysis_results(result, "hash") == handler.store_llm_analysis_results(result, "hash")
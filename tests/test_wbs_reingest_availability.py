@@ -0,0 +1,97 @@
+import os
+import threading
+import time
+
+import pytest
+
+os.environ.setdefault("QDRANT_PORT", "6333")
+
+numpy = pytest.importorskip("numpy")
+pytest.importorskip("qdrant_client")
+pytest.importorskip("sentence_transformers")
+
+from qdrant_client import QdrantClient, models
+
+from ai.agents.wbs_analysis_agent import WBSAnalysisAgent
+from ai.utils import vector_db
+from ai.utils.vector_db import VectorDBHandler
+
+PROJECT_ID = 7
+COLLECTION = "WBSData"
+
+
+def _tasks(names):
+    return {"project_summary": "요약", "task_list": [{"task_id": name, "task_name": f"작업 {name}"} for name in names]}
+
+
+def _project_filter():
+    return models.Filter(must=[models.FieldCondition(key="project_id", match=models.MatchValue(value=PROJECT_ID))])
+
+
+@pytest.fixture
+def client():
+    client = QdrantClient(":memory:")
+    client.create_collection(COLLECTION, vectors_config=models.VectorParams(size=4, distance=models.Distance.COSINE))
+    return client
+
+
+@pytest.fixture
+def agent(client, monkeypatch):
+    # 인메모리 Qdrant + 고정 임베딩으로 적재 경로만 실행 (업서트는 배치마다 지연시켜 조회와 겹치게 함)
+    monkeypatch.setattr(vector_db, "QDRANT_UPSERT_BATCH_SIZE", 2)
+    monkeypatch.setattr(vector_db, "QDRANT_UPSERT_PARALLEL", 1)
+    handler = VectorDBHandler.__new__(VectorDBHandler)
+    handler.project_id = PROJECT_ID
+    handler.collection_name = COLLECTION
+    handler.client = client
+    handler.embedding_model_name = "test"
+    handler.embedding_model = object()
+    handler.embedding_dim = 4
+    monkeypatch.setattr(handler, "_get_embedding_matrix", lambda texts: numpy.ones((len(texts), 4), dtype=numpy.float32))
+
+    real_upsert = client.upsert
+
+    def slow_upsert(*args, **kwargs):
+        time.sleep(0.02)
+        return real_upsert(*args, **kwargs)
+
+    monkeypatch.setattr(client, "upsert", slow_upsert)
+
+    agent = WBSAnalysisAgent.__new__(WBSAnalysisAgent)
+    agent.project_id = PROJECT_ID
+    agent.db_handler = handler
+    return agent
+
+
+def test_full_reingest_never_empties_project_and_sweeps_stale_points(agent, client, monkeypatch):
+    # 이전 적재: T0..T19 + 이번 파일에서 사라진 작업 OLD
+    agent.db_handler.store_llm_analysis_results(_tasks([f"T{i}" for i in range(20)] + ["OLD"]), "old-hash")
+    old_point_id = agent.db_handler._deterministic_point_id({"task_id": "OLD"}, set())
+
+    new_result = _tasks([f"T{i}" for i in range(20)] + ["NEW"])
+    monkeypatch.setattr(agent, "_analyze_rows", lambda rows: (new_result, [[row["row_hash"]] for row in rows]))
+    rows = [{"row_hash": f"r{i}", "row_number": i + 2, "record": {}} for i in range(len(new_result["task_list"]))]
+
+    counts = []
+    done = threading.Event()
+
+    def poll():
+        while not done.is_set():
+            counts.append(client.count(COLLECTION, count_filter=_project_filter(), exact=True).count)
+            time.sleep(0.005)
+
+    poller = threading.Thread(target=poll)
+    poller.start()
+    try:
+        assert agent._run_full_ingestion(rows, "new-hash")
+    finally:
+        done.set()
+        poller.join()
+
+    assert len(counts) > 5
+    assert min(counts) > 0
+
+    points, _ = client.scroll(COLLECTION, scroll_filter=_project_filter(), limit=100, with_payload=True)
+    assert len(points) == 21
+    assert {point.payload["wbs_hash"] for point in points} == {"new-hash"}
+    assert old_point_id not in {str(point.id) for point in points}
@@ -1,19 +1,65 @@
-from service.run_wbs_analyzer import run_wbs_agent 
+from service.run_wbs_analyzer import run_wbs_agent
+from service.wbs_ingestion_service import wbs_ingestion_service
+from core import config
 from core.settings import Settings
+from datetime import datetime
 import sys
+import time
+
+
+def run_scheduler_auto():
+    """WBS_INGESTION_SCHEDULE_TIMES에 지정된 시각마다 WBS 적재 단계를 실행하는 스케줄러"""
+    import schedule
+
+    print("="*50)
+    print("WBS 적재 자동 스케줄러")
+    print(f"실행 시간: 매일 {', '.join(config.WBS_INGESTION_SCHEDULE_TIMES)}")
+    print(f"현재 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("="*50)
+    print("Ctrl+C로 중지할 수 있습니다.\n")
+
+    for at_time in config.WBS_INGESTION_SCHEDULE_TIMES:
+        schedule.every().day.at(at_time).do(wbs_ingestion_service)
+
+    next_run = schedule.next_run()
+    if next_run:
+        print(f"⏰ 다음 실행: {next_run.strftime('%Y-%m-%d %H:%M:%S')}")
+
+    try:
+        while True:
+            schedule.run_pending()
+            time.sleep(60)  # 1분마다 체크
+    except KeyboardInterrupt:
+        print(f"\n🛑 스케줄러 중지됨: {datetime.now().strftime('%H:%M:%S')}")
+
+
 if __name__ == "__main__":
-    
+    if len(sys.argv) > 1:
+        if sys.argv[1] == "ingest":
+            # 모든 팀의 WBS 적재 한 번만 실행
+            result = wbs_ingestion_service()
+            sys.exit(0 if result["status"] == "completed" and not result["watermark"]["files"]["failed"] else 1)
+        elif sys.argv[1] == "auto":
+            run_scheduler_auto()
+            sys.exit(0)
+        else:
+            print("사용법:")
+            print("  python wbs_main.py           # 예시 WBS 파일 단일 적재")
+            print("  python wbs_main.py ingest    # 모든 팀의 WBS 적재 한 번만 실행")
+            print("  python wbs_main.py auto      # 자동 스케줄러 (WBS_INGESTION_SCHEDULE_TIMES)")
+            sys.exit(1)
+
     # 예시: 기본값 사용
     project_id_example = "project_sample_003"
     wbs_file_example = "./[yAXim]_300. WBS_v0.4.xlsx" # 실제 파일 경로로 수정 필요
     # wbs_file_example = "data/wbs/WBS_스마트팩토리챗봇1.xlsx" # 실제 파일 경로로 수정 필요
 
     print(f"예시 실행: 프로젝트 ID '{project_id_example}'")
-    
+
     # 필요한 경우 .env 파일이 올바르게 로드되었는지 확인
     # (Settings 클래스 초기화 시 OPENAI_API_KEY 등이 필요할 수 있음)
     try:
-        Settings() 
+        Settings()
         print(".env 설정 로드 확인됨 (또는 OPENAI_API_KEY가 환경 변수에 직접 설정됨).")
     except ValueError as e:
         print(f"주의: .env 파일 또는 OPENAI_API_KEY 환경 변수 설정 문제 가능성 - {e}")